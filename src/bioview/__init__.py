@@ -1,16 +1,26 @@
 import logging
+import time
+
+# Moment the package was first imported, the start of the startup timeline
+STARTED = time.perf_counter()
 
-logging.basicConfig(
-    filename='readme_manager.log',
-    filemode='a',
-    format='%(asctime)s %(levelname)-8s %(message)s',
-    level=logging.INFO,
-    datefmt='%Y-%m-%d %H:%M:%S')
 log = logging.getLogger(__name__)
-logFormatter = logging.Formatter(
-    "%(asctime)s [%(levelname)s]  %(message)s")
-logFormatter.datefmt = "%Y-%m-%d %H:%M:%S"
-ch = logging.StreamHandler()
-ch.setFormatter(logFormatter)
-ch.setLevel(logging.INFO)
-log.addHandler(ch)
+
+
+def setup_logging() -> None:
+    '''Log to readme_manager.log and the console. Called by the entry points,
+       importing the package does not configure logging.
+    '''
+    logging.basicConfig(
+        filename='readme_manager.log',
+        filemode='a',
+        format='%(asctime)s %(levelname)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S')
+    logFormatter = logging.Formatter(
+        "%(asctime)s [%(levelname)s]  %(message)s")
+    logFormatter.datefmt = "%Y-%m-%d %H:%M:%S"
+    ch = logging.StreamHandler()
+    ch.setFormatter(logFormatter)
+    ch.setLevel(logging.INFO)
+    log.addHandler(ch)
@@ -0,0 +1,203 @@
+from dataclasses import asdict, dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import tempfile
+import time
+import zlib
+from typing import Iterable
+from bioview.readme_index import content_hash
+
+BACKUP_FOLDER = '.bioview_backups'
+DEFAULT_RETENTION = 20
+# Objects younger than this are kept by the garbage collection, a save may be
+# writing the revision that refers to them
+GC_GRACE_SECONDS = 3600
+LEGACY_BACKUP = re.compile(r'\.(\d+)$')
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Revision:
+    time: float     # seconds since the epoch
+    hash: str
+    size: int
+
+
+class BackupStore:
+    '''Earlier versions of the readme files of a project, in one folder below the
+       project folder instead of numbered copies next to every readme.
+
+       The contents are stored once per distinct content, compressed, in
+       objects/<first two characters of the hash>/<hash>. Every readme file has a
+       revision log, logs/<hash of its path>.jsonl, to which a line is appended per
+       revision. Only the last `retention` revisions are kept; objects that no
+       revision refers to any more are removed by `collect_garbage`.
+       Readme files are identified by their path relative to the project folder.
+    '''
+
+    def __init__(self, root: Path, retention: int = DEFAULT_RETENTION):
+        self.root = root
+        self.folder = root / BACKUP_FOLDER
+        self.retention = retention
+
+    def _key(self, readme: Path) -> str:
+        try:
+            return Path(readme).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(readme).as_posix()
+
+    def _log_file(self, readme: Path) -> Path:
+        return self.folder / 'logs' / f"{content_hash(self._key(readme).encode('utf-8'))}.jsonl"
+
+    def _object_file(self, digest: str) -> Path:
+        return self.folder / 'objects' / digest[:2] / digest
+
+    def revisions(self, readme: Path) -> list[Revision]:
+        '''The revisions of the readme file, the oldest first'''
+        try:
+            with open(self._log_file(readme), 'r', encoding='utf-8') as file:
+                lines = [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [Revision(line['time'], line['hash'], line['size']) for line in lines]
+
+    def read(self, revision: Revision) -> bytes:
+        with open(self._object_file(revision.hash), 'rb') as file:
+            return zlib.decompress(file.read())
+
+    def _write_object(self, data: bytes) -> str:
+        digest = content_hash(data)
+        object_file = self._object_file(digest)
+        if object_file.exists():
+            os.utime(object_file)   # keep it from the garbage collection
+            return digest
+        object_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=object_file.parent, delete=False) as file:
+            file.write(zlib.compress(data))
+        os.replace(file.name, object_file)
+        return digest
+
+    def add(self, readme: Path, data: bytes, timestamp: float | None = None) -> Revision | None:
+        '''Add a revision with the contents, unless they equal the latest revision.
+           Return the new revision.
+        '''
+        revisions = self.revisions(readme)
+        digest = self._write_object(data)
+        if revisions and revisions[-1].hash == digest:
+            return None
+        revision = Revision(time.time() if timestamp is None else timestamp, digest, len(data))
+        log_file = self._log_file(readme)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        line = {'path': self._key(readme), **asdict(revision)}
+        with open(log_file, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(line) + '\n')
+        if len(revisions) + 1 > self.retention:
+            self._prune(readme, revisions[len(revisions) + 1 - self.retention:] + [revision])
+        return revision
+
+    def _prune(self, readme: Path, keep: list[Revision]) -> None:
+        '''Rewrite the log with only the revisions to keep'''
+        log_file = self._log_file(readme)
+        key = self._key(readme)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=log_file.parent,
+                                         delete=False) as file:
+            for revision in keep:
+                file.write(json.dumps({'path': key, **asdict(revision)}) + '\n')
+        os.replace(file.name, log_file)
+
+    def backup(self, readme: Path) -> Revision | None:
+        '''Add the current contents of the readme file as a revision, before it is
+           overwritten. Nothing is added for a new file.
+        '''
+        try:
+            with open(readme, 'rb') as file:
+                st = os.fstat(file.fileno())
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        return self.add(readme, data, st.st_mtime)
+
+    def restore(self, readme: Path, revision: Revision) -> None:
+        '''Replace the readme file by the revision; its current contents are kept
+           as a revision first
+        '''
+        data = self.read(revision)
+        self.backup(readme)
+        with open(readme, 'wb') as file:
+            file.write(data)
+
+    def collect_garbage(self) -> int:
+        '''Remove the objects no revision refers to. Return the number removed.'''
+        started = time.time()
+        referenced = set()
+        for log_file in (self.folder / 'logs').glob('*.jsonl'):
+            with open(log_file, 'r', encoding='utf-8') as file:
+                referenced.update(json.loads(line)['hash'] for line in file if line.strip())
+        removed = 0
+        for object_file in (self.folder / 'objects').glob('*/*'):
+            if object_file.name in referenced:
+                continue
+            try:
+                if object_file.stat().st_mtime < started - GC_GRACE_SECONDS:
+                    object_file.unlink()
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Unable to remove backup {object_file}: {e}")
+        return removed
+
+    def migrate_legacy_backups(self, readmes: Iterable[str]) -> int:
+        '''Move the numbered backups of the old rotation (readme.txt.1 to readme.txt.5,
+           1 is the newest) into the store, and remove them. Every folder is listed once.
+           Return the number of backups moved.
+        '''
+        by_folder: dict[str, list[str]] = {}
+        for readme in readmes:
+            folder, name = os.path.split(readme)
+            by_folder.setdefault(folder, []).append(name)
+        moved = 0
+        for folder, names in by_folder.items():
+            try:
+                with os.scandir(folder) as entries:
+                    listing = [entry.name for entry in entries]
+            except OSError:
+                continue
+            for name in names:
+                backups = []
+                for other in listing:
+                    match = LEGACY_BACKUP.search(other)
+                    if match and other[:match.start()] == name:
+                        backups.append((int(match.group(1)), os.path.join(folder, other)))
+                for _, backup in sorted(backups, reverse=True):   # the oldest first
+                    try:
+                        with open(backup, 'rb') as file:
+                            self.add(Path(folder) / name, file.read(), os.stat(backup).st_mtime)
+                        os.remove(backup)
+                        moved += 1
+                    except OSError as e:
+                        logger.warning(f"Unable to move backup {backup}: {e}")
+        if moved:
+            logger.info(f"Moved {moved} backup files into {self.folder}")
+        return moved
+
+    def maintain(self, readmes: Iterable[str]) -> None:
+        '''Migrate the numbered backups once per project, and remove unused objects.
+           The backups are only migrated given the readme files of the project. The
+           store folder is not created just to mark the migration as done: without
+           a store the migration is tried again, until the first backup is stored.
+           Meant to run in a background thread when a project is opened or scanned.
+        '''
+        readmes = list(readmes)
+        marker = self.folder / 'migrated'
+        try:
+            if readmes and not marker.exists():
+                self.migrate_legacy_backups(readmes)
+                if self.folder.exists():
+                    marker.touch()
+            if (self.folder / 'objects').exists():
+                self.collect_garbage()
+        except OSError as e:
+            logger.warning(f"Unable to maintain the backups in {self.folder}: {e}")
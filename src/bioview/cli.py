@@ -0,0 +1,211 @@
+'''Command line interface, for scans and reports without a display, for instance from cron.
+
+    bioview scan [FOLDER]          find the readme files, update the list file and the index
+    bioview search WORD...         full text search in the readme files
+    bioview coverage [FOLDER]      documentation coverage per folder
+    bioview export [FOLDER]        the readme index
+    bioview generate [FOLDER]      readme files for the folders without one
+
+Results are written to stdout as JSON lines, one object per line; logging goes to
+stderr. Without a command the viewer is started. This module does not import tkinter.
+'''
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+from typing import Iterable, TextIO
+from bioview.config import LIST_FILE, get_config
+from bioview.doc_coverage import check_coverage, write_report
+from bioview.load_readme import load_readme_file
+from bioview.readme_index import ReadmeIndex, content_hash
+from bioview.readme_template import load_template
+from bioview.readme_writer import ReadmeContent, folders_without_readme, generate_readmes
+from bioview.scan_readmefiles import DEFAULT_JOBS, scan_readme_files
+from bioview.search_index import MAX_RESULTS, SearchIndex, query_terms
+
+logger = logging.getLogger(__name__)
+
+
+def write_lines(objects: Iterable[dict], out: TextIO) -> None:
+    for obj in objects:
+        out.write(json.dumps(obj, ensure_ascii=False) + '\n')
+
+
+def _folder(args: argparse.Namespace) -> Path:
+    return Path(args.folder) if args.folder else get_config().WorkFolder
+
+
+def scan(args: argparse.Namespace, out: TextIO) -> int:
+    '''Scan for readme files, print them while they are found, and update
+       the list file and the readme index when the scan completes
+    '''
+    folder = _folder(args)
+    list_file = folder / LIST_FILE
+    profile = get_config().get_scan_profile(folder)
+    if not scan_readme_files(folder, list_file, jobs=args.jobs, incremental=not args.full,
+                             on_batch=lambda batch: write_lines(({'path': path}
+                                                                 for path in batch), out),
+                             profile=profile):
+        return 1
+    with ReadmeIndex.open_for(list_file):
+        pass
+    return 0
+
+
+def search(args: argparse.Namespace, out: TextIO) -> int:
+    '''Print the readme files containing all words, the most relevant first'''
+    list_file = _folder(args) / LIST_FILE
+    if not list_file.exists():
+        logger.error(f"No list of readme files in {list_file.parent}, run a scan first")
+        return 1
+    with ReadmeIndex.open_for(list_file) as index:
+        search_index = SearchIndex(index.db_file)
+        try:
+            if not args.no_update:
+                search_index.update_all(index.paths(), jobs=args.jobs)
+            hits = search_index.search(query_terms(' '.join(args.words)), args.limit)
+        finally:
+            search_index.close()
+    write_lines(({'path': hit.path, 'rank': hit.rank} for hit in hits), out)
+    return 0
+
+
+def coverage(args: argparse.Namespace, out: TextIO) -> int:
+    '''Print the documentation coverage of every folder with datasets or dangling
+       references, and optionally write the report like the viewer does
+    '''
+    folder = _folder(args)
+    report = check_coverage(folder, args.jobs, get_config().get_scan_profile(folder))
+    write_lines(({'folder': f.folder, 'readmes': f.readmes, 'datasets': f.datasets,
+                  'documented': f.documented, 'percentage': f.percentage,
+                  'undocumented': f.undocumented, 'dangling': f.dangling}
+                 for f in report.folders if f.datasets or f.dangling), out)
+    if args.output:
+        write_report(report, Path(args.output))
+    return 0
+
+
+def _read_record(path: str) -> tuple | None:
+    '''Size, modification time, encoding and hash of a readme file, None if unreadable'''
+    try:
+        st = os.stat(path)
+        text, encoding = load_readme_file(Path(path))
+    except OSError as e:
+        logger.warning(f"Unable to read {path}: {e}")
+        return None
+    return st.st_size, st.st_mtime, encoding, content_hash(text.encode('utf-8'))
+
+
+def _is_current(record) -> bool:
+    try:
+        st = os.stat(record.path)
+    except OSError:
+        return False
+    return (record.size, record.mtime) == (st.st_size, st.st_mtime)
+
+
+def export(args: argparse.Namespace, out: TextIO) -> int:
+    '''Print the records of the readme index. With --refresh the files that changed
+       since they were last read are read again first, with `jobs` threads.
+    '''
+    list_file = _folder(args) / LIST_FILE
+    if not list_file.exists():
+        logger.error(f"No list of readme files in {list_file.parent}, run a scan first")
+        return 1
+    with ReadmeIndex.open_for(list_file) as index:
+        if args.refresh:
+            stale = [path for path in index.paths() if not _is_current(index.get(path))]
+            with ThreadPoolExecutor(args.jobs) as pool:
+                for path, record in zip(stale, pool.map(_read_record, stale)):
+                    if record is not None:
+                        index.record_content(path, *record)
+        write_lines((vars(index.get(path)) for path in index.paths()), out)
+    return 0
+
+
+CONTENTS = {'empty': ReadmeContent.EMPTY, 'list': ReadmeContent.WITH_FILE_LIST,
+            'template': ReadmeContent.TEMPLATE,
+            'template-list': ReadmeContent.TEMPLATE_WITH_FILE_LIST}
+
+
+def generate(args: argparse.Namespace, out: TextIO) -> int:
+    '''Create readme files for the folders in a file, or for all folders with data
+       files but without a readme file. Existing readme files are never overwritten.
+    '''
+    if args.folders:
+        with open(args.folders, 'r', encoding='utf-8') as file:
+            folders = [line.rstrip('\n') for line in file if line.strip()]
+    else:
+        folder = _folder(args)
+        folders = folders_without_readme(folder, args.jobs,
+                                         get_config().get_scan_profile(folder))
+    content = CONTENTS[args.content]
+    template = load_template(args.template) if 'template' in args.content else None
+    results = generate_readmes(folders, content, template, args.jobs, args.dry_run,
+                               on_result=lambda result: write_lines([asdict(result)], out))
+    return 1 if any(result.status == 'error' for result in results) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='bioview', description=__doc__.splitlines()[0])
+    parser.add_argument('-v', '--verbose', action='store_true', help='log progress to stderr')
+    commands = parser.add_subparsers(dest='command')
+
+    def add_command(name: str, function, help: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help, description=help)
+        command.set_defaults(function=function)
+        command.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                             help=f'number of threads (default {DEFAULT_JOBS})')
+        return command
+
+    command = add_command('scan', scan, 'find the readme files below a folder')
+    command.add_argument('folder', nargs='?', help='the work folder (default from the config)')
+    command.add_argument('--full', action='store_true', help='do not reuse the previous scan')
+
+    command = add_command('search', search, 'full text search in the readme files')
+    command.add_argument('words', nargs='+', help='all words must occur, as word or prefix')
+    command.add_argument('-f', '--folder', help='the work folder (default from the config)')
+    command.add_argument('-n', '--limit', type=int, default=MAX_RESULTS,
+                         help=f'maximum number of results (default {MAX_RESULTS})')
+    command.add_argument('--no-update', action='store_true',
+                         help='search the index as is, without reading changed files')
+
+    command = add_command('coverage', coverage, 'documentation coverage of the datasets')
+    command.add_argument('folder', nargs='?', help='the work folder (default from the config)')
+    command.add_argument('-o', '--output', help='also write the report (.csv or .json)')
+
+    command = add_command('export', export, 'the records of the readme index')
+    command.add_argument('folder', nargs='?', help='the work folder (default from the config)')
+    command.add_argument('--refresh', action='store_true',
+                         help='read the readme files that changed first')
+
+    command = add_command('generate', generate, 'readme files for the folders without one')
+    command.add_argument('folder', nargs='?', help='the work folder (default from the config)')
+    command.add_argument('--folders', help='file with the folders, one per line '
+                         '(default: the folders with data files but without a readme file)')
+    command.add_argument('--content', choices=list(CONTENTS), default='template-list',
+                         help='the contents of the readme files (default template-list)')
+    command.add_argument('--template', help='the template (default the active template)')
+    command.add_argument('-n', '--dry-run', action='store_true',
+                         help='only show which readme files would be created')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from bioview.gui import main as gui_main
+        gui_main()
+        return 0
+    logging.basicConfig(stream=sys.stderr, format='%(asctime)s %(levelname)-8s %(message)s',
+                        level=logging.INFO if args.verbose else logging.WARNING,
+                        datefmt='%Y-%m-%d %H:%M:%S')
+    return args.function(args, sys.stdout)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
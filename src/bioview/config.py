@@ -1,10 +1,37 @@
 from dataclasses import dataclass, field, asdict
+import fnmatch
+import functools
 from importlib.resources import files
 import json
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 CONFIG_FILE = Path.home() / 'bioview.json'
+CACHE_FOLDER = Path.home() / '.bioview'
+LIST_FILE = Path('all_readme_files.lst')      # the readme files of a work folder
+DEFAULT_EXCLUDES = ['.git', '.svn', '__pycache__', '*.bak', 'backup', 'backups',
+                    '.bioview_backups']
+
+
+@dataclass
+class ScanProfile:
+    '''Rules to limit the scan for readme files in a work folder.
+       Exclude patterns are matched against the names of folders and files,
+       patterns containing a '/' against the path relative to the work folder.
+       A maximum depth of None means no limit, depth 0 is the work folder itself.
+    '''
+    exclude: List[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDES))
+    max_depth: int | None = None
+    follow_symlinks: bool = False
+
+    def is_excluded(self, name: str, rel: str) -> bool:
+        for pattern in self.exclude:
+            if '/' in pattern:
+                if fnmatch.fnmatch(rel.replace('\\', '/'), pattern):
+                    return True
+            elif fnmatch.fnmatch(name, pattern):
+                return True
+        return False
 
 
 @dataclass
@@ -15,6 +42,13 @@ class Config:
     all_templates: List[str] = field(
         default_factory=lambda: [f.name for f in files(
             'animations').iterdir() if f.suffix == '.txt'])
+    scan_jobs: int = 8
+    scan_profiles: Dict[str, ScanProfile] = field(default_factory=dict)
+    watch_mode: str = 'native'      # 'off', 'native' or 'polling'
+    poll_interval: float = 5.0      # seconds between polls
+    poll_budget: int = 2000         # folders checked per poll
+    persist_listings: bool = True   # keep the folder listings between sessions
+    backup_retention: int = 20      # revisions kept per readme file
 
     def __post_init__(self):
         self.load()
@@ -26,6 +60,14 @@ class Config:
                 self.WorkFolder = Path(data.get('WorkFolder'))
                 self.MRU = [Path(p) for p in data.get('MRU')]
                 self.active_template = data.get('active_template')
+                self.scan_jobs = data.get('scan_jobs', self.scan_jobs)
+                self.scan_profiles = {folder: ScanProfile(**profile) for folder, profile
+                                      in data.get('scan_profiles', {}).items()}
+                self.watch_mode = data.get('watch_mode', self.watch_mode)
+                self.poll_interval = data.get('poll_interval', self.poll_interval)
+                self.poll_budget = data.get('poll_budget', self.poll_budget)
+                self.persist_listings = data.get('persist_listings', self.persist_listings)
+                self.backup_retention = data.get('backup_retention', self.backup_retention)
                 if not self.active_template:
                     self.set_active_template(self.all_templates[0])
 
@@ -42,9 +84,27 @@ class Config:
         self.active_template = Path(template).name  # strip the path
         self.save()
 
+    def get_scan_profile(self, folder: Path) -> ScanProfile:
+        '''Return the scan profile of the folder, or the default profile'''
+        return self.scan_profiles.get(str(folder), ScanProfile())
+
+    def set_scan_profile(self, folder: Path, profile: ScanProfile):
+        self.scan_profiles[str(folder)] = profile
+        self.save()
+
+    def set_watch_mode(self, mode: str):
+        self.watch_mode = mode
+        self.save()
+
     def add_to_mru(self, path: Path):
         if path in self.MRU:
             self.MRU.remove(path)
         self.MRU.insert(0, path)
         self.MRU = self.MRU[:5]  # Keep only the 5 most recent entries
         self.save()
+
+
+@functools.cache
+def get_config() -> Config:
+    '''The configuration of the application, loaded once and shared by all modules'''
+    return Config(WorkFolder=Path.home())
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import os
+from pathlib import Path
+import sys
+import threading
+from typing import Callable, Iterable
+from bioview.load_readme import read_file_contents
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+PREFETCH_WORKERS = 2
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, int, int]     # path, mtime_ns, size
+
+
+class ContentCache:
+    '''Cache of the decoded contents of readme files, with a memory limit.
+
+       Entries are keyed on path, mtime and size, so a changed file is read
+       again. When the total size exceeds `max_bytes` the least recently used
+       entries are evicted. Files can be prefetched in the background; a file
+       that is requested while it is being prefetched is not read twice.
+       The cache can be used from any thread.
+    '''
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 loader: Callable[[Path], str] = read_file_contents):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.size = 0
+        self.hits = self.misses = 0
+        self._entries: OrderedDict[CacheKey, str] = OrderedDict()
+        self._keys: dict[str, CacheKey] = {}    # the cached version of a path
+        self._loading: dict[CacheKey, Future] = {}
+        self._wanted: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def _key(path: Path) -> CacheKey:
+        st = os.stat(path)
+        return str(path), st.st_mtime_ns, st.st_size
+
+    def get(self, path: Path) -> str:
+        '''Return the contents of the file, from the cache if it did not change'''
+        key = self._key(path)
+        with self._lock:
+            contents = self._entries.get(key)
+            if contents is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return contents
+            self.misses += 1
+            future = self._loading.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass    # read it again, to report the error to the caller
+        return self._load(path, key)
+
+    def _load(self, path: Path, key: CacheKey) -> str:
+        contents = self.loader(path)
+        self._put(key, contents)
+        return contents
+
+    def _put(self, key: CacheKey, contents: str) -> None:
+        size = sys.getsizeof(contents)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._drop(key[0])      # an older version of the file
+            self._entries[key] = contents
+            self._keys[key[0]] = key
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                del self._keys[evicted_key[0]]
+                self.size -= sys.getsizeof(evicted)
+
+    def invalidate(self, path: str) -> None:
+        '''Remove all cached versions of a file'''
+        with self._lock:
+            self._drop(path)
+
+    def _drop(self, path: str) -> None:
+        key = self._keys.pop(path, None)
+        if key is not None:
+            self.size -= sys.getsizeof(self._entries.pop(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self.size = 0
+
+    def prefetch(self, paths: Iterable[Path]) -> None:
+        '''Read the files in the background. A new call replaces the previous
+           request: files that are not read yet and are not requested again are skipped.
+        '''
+        paths = list(paths)
+        with self._lock:
+            self._wanted = {str(path) for path in paths}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(PREFETCH_WORKERS,
+                                                thread_name_prefix='prefetch')
+        for path in paths:
+            self._executor.submit(self._prefetch, path)
+
+    def _prefetch(self, path: Path) -> None:
+        try:
+            key = self._key(path)
+        except OSError:
+            return
+        with self._lock:
+            if key[0] not in self._wanted or key in self._entries or key in self._loading:
+                return
+            future = self._loading[key] = Future()
+        try:
+            future.set_result(self._load(path, key))
+        except Exception as e:
+            logger.debug(f"Prefetch of {path} failed: {e}")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._loading[key]
+
+    def shutdown(self, wait: bool = False) -> None:
+        '''Stop prefetching; without waiting, pending prefetches are cancelled'''
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
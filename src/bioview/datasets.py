@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class DatasetRule:
+    '''Recognize a dataset that consists of several files with the same stem.
+       A dataset is found when a file with one of the primary extensions exists,
+       together with all required extensions; the first primary extension found
+       names the dataset. Files with the other extensions are included when present.
+       An empty extension stands for the file named by the stem itself.
+    '''
+    kind: str
+    primary: tuple[str, ...]
+    members: tuple[str, ...] = ()
+    required: tuple[str, ...] = ()
+
+    @property
+    def extensions(self) -> tuple[str, ...]:
+        return self.primary + self.members + self.required
+
+
+# Checked in order, add rules here to recognize other datasets
+DATASET_RULES = [
+    DatasetRule('shapefile', ('.shp',),
+                members=('.shx', '.dbf', '.prj', '.cpg', '.sbn', '.sbx', '.qix', '.fix',
+                         '.shp.xml', '.atx', '.ain', '.aih')),
+    DatasetRule('ENVI raster', ('.img', '.dat', '.bsq', '.bil', '.bip', '.raw', ''),
+                members=('.sta', '.img.aux.xml', '.dat.aux.xml', '.aux.xml', '.enp'),
+                required=('.hdr',)),
+    DatasetRule('ERDAS Imagine', ('.img',),
+                members=('.rrd', '.rde', '.aux', '.img.aux.xml', '.img.xml', '.ige')),
+    DatasetRule('GeoTIFF', ('.tif', '.tiff'),
+                members=('.tfw', '.tifw', '.tif.aux.xml', '.tiff.aux.xml', '.tif.ovr',
+                         '.tif.xml', '.aux.xml', '.ovr', '.prj')),
+    DatasetRule('ASCII grid', ('.asc',), members=('.prj', '.asc.aux.xml')),
+    DatasetRule('MapInfo table', ('.tab',), members=('.dat', '.map', '.id', '.ind')),
+]
+
+
+@dataclass
+class Dataset:
+    '''One logical dataset in a folder: a single file, or the files of a multi-file
+       dataset. The name is the name of the main file, `kind` is None for single files.
+    '''
+    name: str
+    stem: str
+    kind: str | None = None
+    files: list[str] = field(default_factory=list)
+
+    @property
+    def is_multi_file(self) -> bool:
+        return len(self.files) > 1
+
+
+def dataset_extensions(rules: list[DatasetRule] | None = None) -> list[str]:
+    '''The extensions of the rules, the longest first,
+       so '.tif.aux.xml' wins over '.aux.xml'
+    '''
+    rules = DATASET_RULES if rules is None else rules
+    return sorted({ext for rule in rules for ext in rule.extensions if ext},
+                  key=len, reverse=True)
+
+
+def split_name(name: str, extensions: list[str]) -> tuple[str, str]:
+    '''Split the name into the stem and the (lower case) extension of `extensions`;
+       names with the same lower case stem can belong to the same dataset
+    '''
+    lower = name.lower()
+    for extension in extensions:
+        if lower.endswith(extension) and len(name) > len(extension):
+            return name[:len(name) - len(extension)], extension
+    return name, ''
+
+
+def _split_names(names: Iterable[str], extensions: list[str]) -> dict[str, dict[str, str]]:
+    '''Group the names by stem: stem -> {extension (lower case): name}'''
+    groups: dict[str, dict[str, str]] = {}
+    for name in names:
+        stem, extension = split_name(name, extensions)
+        groups.setdefault(stem.lower(), {})[extension] = name
+    return groups
+
+
+def group_datasets(names: Iterable[str],
+                   rules: list[DatasetRule] | None = None) -> list[Dataset]:
+    '''Group the names of the files in a folder into datasets, in one pass over the names.
+       Return the datasets sorted by name.
+    '''
+    rules = DATASET_RULES if rules is None else rules
+    datasets = []
+    for group in _split_names(names, dataset_extensions(rules)).values():
+        for rule in rules:
+            primary = next((ext for ext in rule.primary if ext in group), None)
+            if primary is None or not all(ext in group for ext in rule.required):
+                continue
+            main = group.pop(primary)
+            files = [main] + [group.pop(ext) for ext in rule.required + rule.members
+                              if ext in group]
+            stem = main[:len(main) - len(primary)] if primary else main
+            datasets.append(Dataset(main, stem, rule.kind, files))
+        datasets.extend(Dataset(name, name, None, [name]) for name in group.values())
+    return sorted(datasets, key=lambda dataset: dataset.name)
+
+
+def dataset_patterns(datasets: Iterable[Dataset], min_stem: int = 2) -> dict[str, Dataset]:
+    '''Names to look for in a readme file: the name of every dataset,
+       and for multi-file datasets also the stem
+    '''
+    patterns = {}
+    for dataset in datasets:
+        patterns[dataset.name] = dataset
+        if dataset.is_multi_file and len(dataset.stem) >= min_stem:
+            patterns.setdefault(dataset.stem, dataset)
+    return patterns
+
+
+def describe(dataset: Dataset) -> str:
+    '''Line for a file list: the name, and the kind and size of a multi-file dataset'''
+    if not dataset.is_multi_file:
+        return dataset.name
+    return f"{dataset.name} ({dataset.kind}, {len(dataset.files)} files)"
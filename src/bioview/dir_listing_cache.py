@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import functools
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import NamedTuple
+from bioview.config import CACHE_FOLDER
+
+CACHE_VERSION = 2
+LISTING_CACHE_FILE = CACHE_FOLDER / 'dir_listings.json'
+MAX_FOLDERS = 50000
+
+logger = logging.getLogger(__name__)
+
+
+class ListingEntry(NamedTuple):
+    name: str
+    is_dir: bool
+
+
+def scan_folder(folder: str) -> list[ListingEntry]:
+    '''List the folder with a single scandir. The type comes with the directory
+       listing on most file systems, so there is no stat per entry; an entry whose
+       type cannot be read is listed as a file.
+    '''
+    entries = []
+    with os.scandir(folder) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append(ListingEntry(entry.name, is_dir))
+    return entries
+
+
+class DirListingCache:
+    '''Listings of folders, shared by the directory tree and the marking of file
+       names in a readme. The readme creation lists the folder itself, as it needs
+       the size and date of the files. A listing is used as long as the
+       modification time of the folder does not change; the watcher and the
+       readme creation also invalidate the folders they change, for file systems
+       with a coarse modification time. The least recently used folders are
+       dropped when there are more than `max_folders`.
+       The cache can be used from several threads.
+    '''
+
+    def __init__(self, max_folders: int = MAX_FOLDERS):
+        self.max_folders = max_folders
+        self._listings: OrderedDict[str, tuple[int, list[ListingEntry]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def entries(self, folder: Path | str) -> list[ListingEntry]:
+        '''Return the entries of the folder, listing it only when it changed.
+           Raises OSError when the folder cannot be listed.
+        '''
+        key = str(folder)
+        mtime_ns = os.stat(key).st_mtime_ns
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached is not None and cached[0] == mtime_ns:
+                self._listings.move_to_end(key)
+                return cached[1]
+        entries = scan_folder(key)
+        self._store(key, mtime_ns, entries)
+        return entries
+
+    def _store(self, key: str, mtime_ns: int, entries: list[ListingEntry]) -> None:
+        with self._lock:
+            self._listings[key] = (mtime_ns, entries)
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_folders:
+                self._listings.popitem(last=False)
+
+    def invalidate(self, folder: Path | str) -> None:
+        with self._lock:
+            self._listings.pop(str(folder), None)
+
+    def invalidate_tree(self, folder: Path | str) -> None:
+        '''Invalidate the folder and all folders below it'''
+        key = str(folder)
+        prefix = os.path.join(key, '')
+        with self._lock:
+            for path in [path for path in self._listings
+                         if path == key or path.startswith(prefix)]:
+                del self._listings[path]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+    def load(self, cache_file: Path) -> None:
+        '''Add the listings saved in a previous session; they are checked against
+           the modification time of the folder like any other listing
+        '''
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            if cache_file.exists():
+                logger.warning(f"Ignoring unreadable listing cache {cache_file}: {e}")
+            return
+        if data.get('version') != CACHE_VERSION:
+            return
+        for key, (mtime_ns, entries) in data['folders'].items():
+            self._store(key, mtime_ns, [ListingEntry(*entry) for entry in entries])
+
+    def save(self, cache_file: Path) -> None:
+        with self._lock:
+            data = {'version': CACHE_VERSION, 'folders': dict(self._listings)}
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as file:
+            json.dump(data, file, separators=(',', ':'))
+
+
+@functools.cache
+def get_listing_cache() -> DirListingCache:
+    '''The listing cache of the application, shared by all modules'''
+    return DirListingCache()
@@ -1,17 +1,42 @@
-from importlib.resources import files
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import queue
 import sys
 import tkinter as tk
 from pathlib import Path
 from tkinter import ttk, Menu
-from PIL import ImageTk
+from typing import Callable
+from bioview.dir_listing_cache import get_listing_cache
+from bioview.icons import load_icon
+from bioview.readme_tree_filter import ReadmeTreeFilter
 from bioview.tree_follower import Tree
 
 CONTEXT_BUTTON = '<Button-3>'
+PLACEHOLDER_TEXT = 'Loading...'
+LISTING_JOBS = 4        # folders listed at the same time
+LISTING_POLL_MS = 50
+INSERT_BATCH = 200      # items inserted per Tk callback
 
 logger = logging.getLogger(__name__)
 
 
+def list_directory(path: Path) -> list[tuple[str, bool]]:
+    """
+    Return the name of every entry in the folder and whether it is a folder,
+    from the shared listing cache. Errors are logged and give an empty list.
+    """
+    entries = []
+    try:
+        entries = [(entry.name, entry.is_dir) for entry in get_listing_cache().entries(path)]
+    except FileNotFoundError:
+        logger.warning(f"Could not locate folder: {path}")
+    except PermissionError:
+        logger.error(f"You don't have permission to read {path}")
+    except OSError as e:
+        logger.error(f"Unable to read {path}: {e}")
+    return entries
+
+
 class DirTree(ttk.Frame, Tree):
 
     def __init__(self, window: tk.Tk | tk.Toplevel, root_path: Path = None) -> None:
@@ -36,13 +61,27 @@ class DirTree(ttk.Frame, Tree):
         # This dictionary maps the treeview items IDs with the
         # path of the file or folder.
         self.fsobjects: dict[str, Path] = {}
-        self.file_image = ImageTk.PhotoImage(
-            file=files('animations').joinpath('file.ico'))
-        self.folder_image = ImageTk.PhotoImage(
-            file=files('animations').joinpath('folder.ico'))
+        # The reverse mapping, and the items below each parent by name,
+        # to find items without searching the tree.
+        self.path_ids: dict[Path, str] = {}
+        self.child_ids: dict[str, dict[str, str]] = {}
+        # Folders are listed in the background when they are opened: the placeholder
+        # child of every folder that is not listed yet, and the folders being listed
+        # with the callbacks waiting for them.
+        self.placeholders: dict[str, str] = {}
+        self.listing: dict[str, list[Callable[[], None]]] = {}
+        self.listed: queue.Queue = queue.Queue()
+        self.generation = 0     # increased when the tree is cleared
+        self.polling = False
+        self.executor = ThreadPoolExecutor(LISTING_JOBS, thread_name_prefix='dirtree')
+        # In the readme-only view the folders are listed from the filter
+        self.tree_filter: ReadmeTreeFilter | None = None
+        self.file_image = load_icon('file.ico')
+        self.folder_image = load_icon('folder.ico')
         # Load the root directory.
         if root_path is None:
             root_path = Path(Path(sys.executable).anchor)
+        self.root_path = root_path
         self.load_tree(root_path)
 
     def set_context_menu(self, context_menu: Menu):
@@ -53,7 +92,7 @@ class DirTree(ttk.Frame, Tree):
     def _show_context_menu(self, event):
         # Select the item under the cursor
         iid = self.treeview.identify_row(event.y)
-        if iid:
+        if iid in self.fsobjects:
             self.treeview.selection_set(iid)
             selected_path = self.fsobjects[iid]
             if selected_path.is_dir():
@@ -68,10 +107,7 @@ class DirTree(ttk.Frame, Tree):
 
     def get_item_id(self, path: Path) -> str:
         """Get the Treeview item ID corresponding to the given path."""
-        for k, v in self.fsobjects.items():
-            if v == path:
-                return k
-        return ''
+        return self.path_ids.get(path, '')
 
     def highlight_filenames(self, folder: Path, filenames: list[str]) -> None:
         """Highlight or select all names in the open Treeview branch where the current file is located."""
@@ -83,11 +119,15 @@ class DirTree(ttk.Frame, Tree):
             return
 
         self.treeview.item(folder_id, open=True)
+        # The folder content may still have to be loaded
+        self.expand_item(folder_id, lambda: self._highlight_children(folder_id, filenames))
 
+    def _highlight_children(self, folder_id: str, filenames: list[str]) -> None:
         # Highlight or select matching items
-        for child_id in self.treeview.get_children(folder_id):
-            item_text = self.treeview.item(child_id, 'text')
-            if item_text in filenames:
+        children = self.child_ids.get(folder_id, {})
+        for name in set(filenames):
+            child_id = children.get(name)
+            if child_id is not None:
                 self.treeview.selection_add(child_id)
                 self.treeview.item(child_id, tags='highlight')
 
@@ -99,93 +139,161 @@ class DirTree(ttk.Frame, Tree):
         for item in self.treeview.selection():
             self.treeview.selection_remove(item)
 
-    def _safe_iterdir(self, path: Path) -> tuple[Path, ...] | tuple[()]:
-        """
-        Like `Path.iterdir()`, but do not stop on permission errors.
-        """
-        try:
-            if path.exists():
-                return tuple(path.iterdir())
-            logger.warning(f"Could not locate folder: {path}")
-            return ()
-        except PermissionError:
-            logger.error(f"You don't have permission to read {path}")
-            return ()
-
-    def _get_icon(self, path: Path) -> tk.PhotoImage:
+    def _get_icon(self, path: Path, is_dir: bool | None = None) -> tk.PhotoImage:
         """
         Return a folder icon if `path` is a directory and
-        a file icon otherwise.
+        a file icon otherwise. Pass `is_dir` when it is known, to avoid a stat.
         """
-        return self.folder_image if path.is_dir() else self.file_image
+        if is_dir is None:
+            is_dir = path.is_dir()
+        return self.folder_image if is_dir else self.file_image
 
-    def insert_item(self, name: str, path: Path, parent: str = "", position=tk.END) -> str:
+    def insert_item(self, name: str, path: Path, parent: str = "", position=tk.END,
+                    is_dir: bool | None = None) -> str:
         """
         Insert a file or folder into the treeview and return the item ID.
-        If position == 0, it means that the item is added manually by the user
-        In that case a check is made whether the item is already in the tree (this
-        can happen only when trying to create a new readme file that already exists)
+        If the parent already has an item with this name, that item is returned.
+        If position == 0, it means that the item is added manually by the user,
+        for instance a new readme file; then observers are notified.
+        A folder gets a placeholder child, replaced by its contents when it is opened.
         """
+        children = self.child_ids.setdefault(parent, {})
+        iid = children.get(name)
+        if iid is not None:
+            return iid
         if position == 0:
-            for child in self.treeview.get_children(parent):
-                if self.fsobjects[child] == path:
-                    return child
             self.notify("item_added", path)
+        if is_dir is None:
+            is_dir = path.is_dir()
         iid = self.treeview.insert(
             parent, position, text=name, tags=("fstag",),
-            image=self._get_icon(path))
+            image=self._get_icon(path, is_dir))
         self.fsobjects[iid] = path
+        self.path_ids[path] = iid
+        children[name] = iid
+        if is_dir:
+            self.placeholders[iid] = self.treeview.insert(
+                iid, tk.END, text=PLACEHOLDER_TEXT, tags=("placeholder",))
         return iid
 
+    def _forget(self, iid: str) -> None:
+        """Remove the item and everything below it from the mappings."""
+        for child in self.child_ids.pop(iid, {}).values():
+            self._forget(child)
+        self.placeholders.pop(iid, None)
+        self.listing.pop(iid, None)
+        path = self.fsobjects.pop(iid, None)
+        if path is not None and self.path_ids.get(path) == iid:
+            del self.path_ids[path]
+
+    def delete_item(self, iid: str) -> None:
+        """Delete the item and everything below it from the treeview."""
+        siblings = self.child_ids.get(self.treeview.parent(iid), {})
+        for name in [name for name, child in siblings.items() if child == iid]:
+            del siblings[name]
+        self._forget(iid)
+        self.treeview.delete(iid)
+
+    def destroy(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        ttk.Frame.destroy(self)
+
     def clear_tree(self) -> None:
         self.fsobjects.clear()
+        self.path_ids.clear()
+        self.child_ids.clear()
+        self.placeholders.clear()
+        self.listing.clear()
+        self.generation += 1
         self.treeview.delete(*self.treeview.get_children())
 
+    def set_filter(self, tree_filter: ReadmeTreeFilter | None) -> None:
+        """Show only the part of the tree in the filter, or everything with None."""
+        self.tree_filter = tree_filter
+        self.clear_tree()
+        self.load_tree(self.root_path)
+
     def load_tree(self, path: Path) -> None:
+        self.root_path = path
         # insert top-level item
-        iid = self.insert_item(path.name, path)
-        self._load_subtree(path, parent=iid)
+        iid = self.insert_item(path.name, path, is_dir=True)
+        self.treeview.item(iid, open=True)
+        self.expand_item(iid)
 
-    def _load_subtree(self, path: Path, parent: str = "") -> None:
+    def expand_item(self, iid: str, on_loaded: Callable[[], None] | None = None) -> None:
         """
-        Load the contents of `path` into the treeview.
+        Load the content of the folder item, if that was not done yet. The folder
+        is listed by a worker thread, or taken from the filter in the readme-only view.
+        The items are inserted in batches by the Tk thread. `on_loaded` is called
+        once the content is in the treeview.
         """
-        if not path.exists():
-            logger.warning(f"Could not locate folder: {path}")
+        if iid not in self.placeholders:
+            if on_loaded is not None:
+                on_loaded()
             return
+        callbacks = self.listing.get(iid)
+        if callbacks is None and self.tree_filter is not None:
+            # the filter lists the folder from memory
+            callbacks = self.listing[iid] = []
+            path = self.fsobjects[iid]
+            self.after_idle(self._insert_batch, self.generation, iid, path,
+                            self.tree_filter.entries(path), 0)
+        elif callbacks is None:
+            callbacks = self.listing[iid] = []
+            future = self.executor.submit(list_directory, self.fsobjects[iid])
+            future.add_done_callback(
+                lambda f, generation=self.generation: self.listed.put((generation, iid, f)))
+            if not self.polling:
+                self.polling = True
+                self.after(LISTING_POLL_MS, self._receive_listings)
+        if on_loaded is not None:
+            callbacks.append(on_loaded)
 
-        for fsobj in self._safe_iterdir(path):
-            fullpath = path / fsobj
-            child = self.insert_item(fsobj.name, fullpath, parent)
-            # Preload the content of each directory within `path`.
-            # This is necessary to make the folder item expandable.
-            # if fullpath.is_dir():
-            #     for sub_fsobj in self._safe_iterdir(fullpath):
-            #         self.insert_item(sub_fsobj.name, fullpath / sub_fsobj, child)
+    def _receive_listings(self) -> None:
+        """Insert the folders listed by the workers; poll while listings are running."""
+        while True:
+            try:
+                generation, iid, future = self.listed.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation and iid in self.listing:
+                self._insert_batch(generation, iid, self.fsobjects[iid], future.result(), 0)
+        if self.listing:
+            self.after(LISTING_POLL_MS, self._receive_listings)
+        else:
+            self.polling = False
 
-    def _load_subitems(self, iid: str) -> None:
-        """
-        Load the content of each folder inside the specified item
-        into the treeview.
-        """
-        for child_iid in self.treeview.get_children(iid):
-            if self.fsobjects[child_iid].is_dir():
-                self._load_subtree(self.fsobjects[child_iid],
-                                   parent=child_iid)
+    def _insert_batch(self, generation: int, iid: str, path: Path,
+                      entries: list[tuple[str, bool]], start: int) -> None:
+        """Insert a batch of the entries of a folder, and schedule the next batch."""
+        if generation != self.generation or iid not in self.listing:
+            return      # the tree was cleared or the item deleted
+        for name, is_dir in entries[start:start + INSERT_BATCH]:
+            self.insert_item(name, path / name, iid, is_dir=is_dir)
+        if start + INSERT_BATCH < len(entries):
+            self.after(1, self._insert_batch, generation, iid, path, entries,
+                       start + INSERT_BATCH)
+            return
+        self.treeview.delete(self.placeholders.pop(iid))
+        for callback in self.listing.pop(iid):
+            callback()
 
     def _item_opened(self, _event: tk.Event) -> None:
         """
         Handler invoked when a folder item is expanded.
         """
-        # Get the expanded item.
-        iid = self.treeview.selection()[0]
-        # If it is a folder, loads its content.
-        self._load_subitems(iid)
+        # The expanded item has the focus, also when opened with the keyboard.
+        iid = self.treeview.focus()
+        if iid in self.fsobjects:
+            self.expand_item(iid)
 
     def _view_readme(self, _event: tk.Event) -> None:
         """
         Handler invoked when a left-click is made on an item.
         """
-        selected_path = self.get_selected_path()
+        selection = self.treeview.selection()
+        if not selection or selection[0] not in self.fsobjects:
+            return      # nothing or a placeholder selected
+        selected_path = self.fsobjects[selection[0]]
         if selected_path.is_file():
             self.notify("readme_clicked", selected_path)
@@ -0,0 +1,196 @@
+import csv
+from dataclasses import asdict, dataclass, field
+import fnmatch
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from bioview.config import ScanProfile
+from bioview.datasets import dataset_patterns, group_datasets
+from bioview.load_readme import read_file_contents
+from bioview.scan_readmefiles import (DEFAULT_JOBS, VisitedFolders, WorkStealingWalker,
+                                      is_readme_name)
+from bioview.text_matcher import TextMatcher
+
+# Files that are not data: backups of readme files, lists made by this application
+IGNORED_PATTERNS = ['*readme*.txt.[0-9]*', 'all_readme_files.*', 'Thumbs.db', 'desktop.ini']
+
+# Words in a readme that look like a file name: a stem of at least two characters
+# and an extension that starts with a letter, not part of a path, url or e-mail address
+FILENAME_TOKEN = re.compile(
+    r'(?<![\w.@/\\-])(?!www\.)([\w-]{2,}(?:\.[\w-]+)*\.[A-Za-z][A-Za-z0-9]{0,4})'
+    r'(?![\w/-]|\.\w)')
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FolderCoverage:
+    '''Documentation of the datasets in one folder by the readme files in it.
+       A dataset is a single file, or the files of a multi-file dataset like a
+       shapefile. Only the number of datasets is kept, the names only of the
+       undocumented datasets.
+    '''
+    folder: str
+    readmes: list[str] = field(default_factory=list)
+    datasets: int = 0
+    undocumented: list[str] = field(default_factory=list)
+    dangling: list[str] = field(default_factory=list)
+
+    @property
+    def documented(self) -> int:
+        return self.datasets - len(self.undocumented)
+
+    @property
+    def percentage(self) -> float | None:
+        '''Percentage of the datasets mentioned in a readme, None for a folder without files'''
+        if not self.datasets:
+            return None
+        return 100.0 * self.documented / self.datasets
+
+
+@dataclass
+class CoverageReport:
+    root: str
+    folders: list[FolderCoverage] = field(default_factory=list)
+
+    @property
+    def datasets(self) -> int:
+        return sum(folder.datasets for folder in self.folders)
+
+    @property
+    def documented(self) -> int:
+        return sum(folder.documented for folder in self.folders)
+
+    @property
+    def percentage(self) -> float | None:
+        datasets = self.datasets
+        return 100.0 * self.documented / datasets if datasets else None
+
+    def summary(self) -> str:
+        percentage = self.percentage
+        return (f"{self.documented} of {self.datasets} datasets documented "
+                f"({0.0 if percentage is None else percentage:.1f}%) in {len(self.folders)} "
+                f"folders, {sum(len(f.dangling) for f in self.folders)} dangling references")
+
+
+def is_ignored(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in IGNORED_PATTERNS)
+
+
+def mentioned_filenames(text: str) -> set[str]:
+    '''Return the words in the text that look like file names'''
+    return set(FILENAME_TOKEN.findall(text))
+
+
+def folder_coverage(folder: str, readmes: list[str], files: list[str],
+                    subfolders: list[str], texts: list[str]) -> FolderCoverage:
+    '''Compare the datasets in a folder with the names mentioned in its readme files'''
+    text = '\n'.join(texts)
+    datasets = group_datasets(files)
+    patterns = dataset_patterns(datasets)
+    _, found = TextMatcher(patterns).find(text)
+    documented = {patterns[pattern].name for pattern in found}
+    existing = set(files) | set(subfolders) | set(readmes)
+    return FolderCoverage(folder, readmes, len(datasets),
+                          undocumented=[dataset.name for dataset in datasets
+                                        if dataset.name not in documented],
+                          dangling=sorted(mentioned_filenames(text) - existing))
+
+
+def _list_folder(path: str, follow_symlinks: bool) -> tuple[list[str], list[str], list[str]]:
+    '''Return the readme files, the data files and the subfolders in the folder'''
+    readmes, files, subfolders = [], [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subfolders.append(entry.name)
+                elif is_readme_name(entry.name):
+                    readmes.append(entry.name)
+                elif not is_ignored(entry.name):
+                    files.append(entry.name)
+    except OSError as e:
+        logger.warning(f"Unable to scan {path}: {e}")
+    return sorted(readmes), sorted(files), subfolders
+
+
+def check_coverage(folder: Path, jobs: int = DEFAULT_JOBS, profile: ScanProfile | None = None,
+                   cancel: threading.Event | None = None) -> CoverageReport:
+    '''Walk the tree below folder with `jobs` threads, and check for every folder
+       which datasets are not mentioned in its readme files, and which file names
+       mentioned in the readme files do not exist. The profile limits the walk,
+       like for the scan for readme files; following links, every folder is
+       checked once.
+    '''
+    profile = profile or ScanProfile(exclude=[])
+    root = str(folder)
+    prefix_len = len(os.path.join(root, ''))
+    results = [[] for _ in range(max(1, jobs))]
+    visited = VisitedFolders()
+
+    def visit(item: tuple[str, int], worker: int) -> list[tuple[str, int]]:
+        path, depth = item
+        rel = path[prefix_len:]
+        if profile.follow_symlinks:
+            try:
+                if not visited.first_visit(path, os.stat(path)):
+                    return []
+            except OSError as e:
+                logger.warning(f"Unable to check {path}: {e}")
+                return []
+        readmes, files, subfolders = _list_folder(path, profile.follow_symlinks)
+        readmes, files, included_subfolders = (
+            [name for name in names if not profile.is_excluded(name, os.path.join(rel, name))]
+            for names in (readmes, files, subfolders))
+        texts = []
+        for name in readmes:
+            try:
+                texts.append(read_file_contents(Path(path) / name))
+            except OSError as e:
+                logger.warning(f"Unable to read {os.path.join(path, name)}: {e}")
+        results[worker].append(folder_coverage(path, readmes, files, subfolders, texts))
+        if profile.max_depth is not None and depth >= profile.max_depth:
+            return []
+        return [(os.path.join(path, name), depth + 1) for name in included_subfolders]
+
+    WorkStealingWalker(visit, jobs, cancel).run((root, 0))
+    report = CoverageReport(root, sorted((coverage for part in results for coverage in part),
+                                         key=lambda coverage: coverage.folder))
+    logger.info(f"Coverage of {root}: {report.summary()}")
+    return report
+
+
+def write_csv(report: CoverageReport, output_file: Path) -> None:
+    '''One row per folder with datasets or dangling references'''
+    with open(output_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['folder', 'readmes', 'datasets', 'documented', 'percentage',
+                         'undocumented', 'dangling'])
+        for folder in report.folders:
+            if not folder.datasets and not folder.dangling:
+                continue
+            percentage = folder.percentage
+            writer.writerow([folder.folder, len(folder.readmes), folder.datasets,
+                             folder.documented,
+                             '' if percentage is None else f'{percentage:.1f}',
+                             ';'.join(folder.undocumented), ';'.join(folder.dangling)])
+
+
+def write_json(report: CoverageReport, output_file: Path) -> None:
+    data = {'root': report.root, 'datasets': report.datasets, 'documented': report.documented,
+            'percentage': report.percentage,
+            'folders': [{**asdict(folder), 'percentage': folder.percentage}
+                        for folder in report.folders if folder.datasets or folder.dangling]}
+    with open(output_file, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2)
+
+
+def write_report(report: CoverageReport, output_file: Path) -> None:
+    '''Write the report as JSON or CSV, depending on the extension of the output file'''
+    if output_file.suffix.lower() == '.json':
+        write_json(report, output_file)
+    else:
+        write_csv(report, output_file)
@@ -1,37 +1,63 @@
 from abc import ABC, abstractmethod
-from importlib.resources import files
 import logging
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog
+from tkinter import messagebox
 from tkinter import WORD, CHAR, NONE
+import queue
+import sqlite3
 import subprocess
+import threading
+import time
 from pathlib import Path
-import pandas as pd
-from PIL import Image, ImageTk
-from bioview.config import Config
-from bioview.load_readme import read_file_contents
-from bioview.load_readme_list import load_list_from_text
+from bioview import setup_logging
+from bioview.backup_store import BackupStore
+from bioview.config import LIST_FILE, ScanProfile, get_config
+from bioview.content_cache import ContentCache
+from bioview.datasets import dataset_patterns, group_datasets
+from bioview.dir_listing_cache import LISTING_CACHE_FILE, get_listing_cache
+from bioview.doc_coverage import check_coverage, write_report
+from bioview.load_readme import known_encoding, remember_encoding
+from bioview.load_readme_list import load_list_from_index, load_list_from_text
+from bioview.path_store import PathStore
 from bioview.pretty_print_paths import pretty_print_name
 from bioview.readme_creation import ReadmeCreator
-from bioview.save_readme_changes import save_readme_changes
-from bioview.scan_readmefiles import scan_readme_files
+from bioview.readme_index import ReadmeIndex, content_hash
+from bioview.readme_tree_filter import ReadmeTreeFilter
+from bioview.readme_writer import ReadmeContent, folders_without_readme, generate_readmes
+from bioview.readme_watcher import ReadmeChanges, ReadmeWatcher
+from bioview.poll_watcher import PollingWatcher
+from bioview.save_worker import SaveWorker
+from bioview.scan_cache import ScanCache
+from bioview.scan_readmefiles import ScanStats, scan_readme_files
+from bioview.scan_profile_dialog import ScanProfileDialog
+from bioview.search_index import SearchIndex, SearchIndexer, query_terms
 from bioview.progress_window import ProgressPopup
 from bioview.calback_thread import CallbackThread
 from bioview.dirtree import DirTree
+from bioview.icons import load_icon
+from bioview.startup_profile import StartupTimeline
+from bioview.text_matcher import TextIndexer, TextMatcher
 from bioview.tooltip import Tooltip
-
-config = Config(WorkFolder=Path.home())
-LIST_FILE = Path('all_readme_files.lst')
-FOLDER_ICON_LOCATION = files('animations').joinpath('folder.ico')
-FILE_ICON_LOCATION = files('animations').joinpath('file.ico')
-WRAP_ENABLED = files('animations').joinpath('wrap-text.png')
-WRAP_DISABLED = files('animations').joinpath('wrap-text-grey.png')
-READONLY = files('animations').joinpath('edit-grey.png')
-READWRITE = files('animations').joinpath('edit.png')
-SAVE_CHANGES = files('animations').joinpath('diskette.png')
-SEARCH_TEXT = files('animations').joinpath('search.png')
-MARK_FILES = files('animations').joinpath('highlighter.png')
+from bioview.virtual_list import VirtualListbox
+
+config = get_config()
+WRAP_ENABLED = 'wrap-text.png'
+WRAP_DISABLED = 'wrap-text-grey.png'
+READONLY = 'edit-grey.png'
+READWRITE = 'edit.png'
+SAVE_CHANGES = 'diskette.png'
+SEARCH_TEXT = 'search.png'
+MARK_FILES = 'highlighter.png'
+BUTTON_SIZE = 32
+TAG_RANGES_PER_CALL = 1000
+PREFETCH_NEIGHBOURS = 2     # readme files before and after the selection
+AUTOSAVE_DELAY_MS = 2000        # save this long after the last key stroke
+SAVE_POLL_MS = 200
+GENERATE_PREVIEW = 15           # folders shown before creating readme files
+WATCH_POLL_MS = 500
+LOAD_POLL_MS = 50
 
 logger = logging.getLogger(__name__)
 
@@ -48,13 +74,36 @@ class MainWindow(TreeFollowerObserver):
     progress = None
     folder_icon = None
     file_icon = None
-    filenames = None
+    filenames: PathStore = None         # the readme files shown in the listbox
+    project_files: PathStore = None     # all readme files of the project
+    search_terms: list[str] = []
+    readme_index: ReadmeIndex = None
+    search_index: SearchIndex = None
+    search_indexer: SearchIndexer = None
+    watcher: ReadmeWatcher | PollingWatcher = None
+    backup_store: BackupStore = None
+    autosave_job: str = None
+    project_generation = 0              # incremented when a project is opened
+    watch_generation = 0                # incremented when watching stops
 
     def onExit(self):
+        self.flush_autosave()
+        self.save_worker.stop()
+        self.stop_watching()
+        self.content_cache.shutdown()
+        self.close_search_index()
+        if config.persist_listings:
+            try:
+                get_listing_cache().save(LISTING_CACHE_FILE)
+            except OSError as e:
+                logger.warning(f"Unable to save the folder listings: {e}")
         exit()
 
     def __init__(self):
-        pass
+        self.content_cache = ContentCache()
+        self.save_worker = SaveWorker()
+        if config.persist_listings:
+            get_listing_cache().load(LISTING_CACHE_FILE)
 
     def build_menu(self):
         self.menubar = tk.Menu(self.top)
@@ -66,6 +115,21 @@ class MainWindow(TreeFollowerObserver):
                                   command=self.open_text_file)
         self.fileMenu.add_command(label='Scan for readme files',
                                   command=self.rescan_readme_files)
+        self.fileMenu.add_command(label='Rescan all folders',
+                                  command=lambda: self.rescan_readme_files(incremental=False))
+        self.fileMenu.add_command(label='Scan settings',
+                                  command=self.edit_scan_profile)
+        self.fileMenu.add_command(label='Documentation coverage report',
+                                  command=self.coverage_report)
+        self.fileMenu.add_command(label='Create missing readme files',
+                                  command=self.generate_missing_readmes)
+        self.watch_mode = tk.StringVar(value=config.watch_mode)
+        watch_menu = tk.Menu(self.fileMenu, tearoff=0)
+        for label, mode in [('Off', 'off'), ('File system events', 'native'),
+                            ('Polling (network shares)', 'polling')]:
+            watch_menu.add_radiobutton(label=label, value=mode, variable=self.watch_mode,
+                                       command=self.change_watch_mode)
+        self.fileMenu.add_cascade(label='Watch for changes', menu=watch_menu)
         self.fileMenu.add_separator()
         # Add "Recent" submenu
         self.recent_menu = tk.Menu(self.fileMenu, tearoff=0)
@@ -88,15 +152,15 @@ class MainWindow(TreeFollowerObserver):
         bottom_frame = tk.Frame(paned_window)
         bottom_frame.pack(fill='both', expand=True)
 
-        self.listbox = tk.Listbox(
-            top_frame, selectmode=tk.EXTENDED, exportselection=False)
-
         self.scrollbar_list = tk.Scrollbar(top_frame, orient="vertical")
         self.scrollbar_list_horizontal = tk.Scrollbar(top_frame, orient="horizontal")
 
-        # Configure the listbox to use scrollbars
-        self.listbox.config(yscrollcommand=self.scrollbar_list.set,
-                            xscrollcommand=self.scrollbar_list_horizontal.set)
+        # The listbox only renders the visible rows, and takes the
+        # vertical scrollbar as argument
+        self.listbox = VirtualListbox(
+            top_frame, formatter=lambda filename: str(pretty_print_name(filename, 50)),
+            yscrollcommand=self.scrollbar_list.set)
+        self.listbox.config(xscrollcommand=self.scrollbar_list_horizontal.set)
         self.scrollbar_list.config(command=self.listbox.yview)
         self.scrollbar_list_horizontal.config(command=self.listbox.xview)
 
@@ -122,27 +186,35 @@ class MainWindow(TreeFollowerObserver):
         self.scrollbar_list_horizontal.pack(side="bottom", fill="x")
         self.dirtree.pack(side="bottom", fill="both", expand=True)
         self.dirtree.attach(self)
+        self.readme_only = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bottom_frame, text='Only folders with readme files',
+                        variable=self.readme_only, command=self.toggle_readme_only).pack(
+            side="top", anchor="w", before=self.dirtree)
+
+    def toggle_readme_only(self) -> None:
+        '''Switch the tree between all files and the readme files with their folders'''
+        tree_filter = None
+        if self.readme_only.get():
+            tree_filter = ReadmeTreeFilter(config.WorkFolder, self.project_files or ())
+        self.dirtree.set_filter(tree_filter)
+
+    def refresh_tree_filter(self) -> None:
+        '''Rebuild the readme-only tree after the list of readme files was replaced'''
+        if self.readme_only.get():
+            self.toggle_readme_only()
 
     def build_edit_button_bar(self, right_frame: tk.Frame):
         self.button_bar = tk.Frame(right_frame)
         self.button_bar.pack(side="top", fill="x")
 
-        # Load images
-        wrap_on_image = Image.open(WRAP_ENABLED).resize((32, 32), Image.Resampling.LANCZOS)
-        wrap_off_image = Image.open(WRAP_DISABLED).resize((32, 32), Image.Resampling.LANCZOS)
-        edit_image = Image.open(READWRITE).resize((32, 32), Image.Resampling.LANCZOS)
-        no_edit_image = Image.open(READONLY).resize((32, 32), Image.Resampling.LANCZOS)
-        save_image = Image.open(SAVE_CHANGES).resize((32, 32), Image.Resampling.LANCZOS)
-        search_image = Image.open(SEARCH_TEXT).resize((32, 32), Image.Resampling.LANCZOS)
-        mark_image = Image.open(MARK_FILES).resize((32, 32), Image.Resampling.LANCZOS)
-
-        self.wrap_on_image = ImageTk.PhotoImage(wrap_on_image)
-        self.wrap_off_image = ImageTk.PhotoImage(wrap_off_image)
-        self.edit_image = ImageTk.PhotoImage(edit_image)
-        self.no_edit_image = ImageTk.PhotoImage(no_edit_image)
-        self.save_image = ImageTk.PhotoImage(save_image)
-        self.search_image = ImageTk.PhotoImage(search_image)
-        self.mark_image = ImageTk.PhotoImage(mark_image)
+        # Load images (resized once, then taken from the icon cache)
+        self.wrap_on_image = load_icon(WRAP_ENABLED, BUTTON_SIZE)
+        self.wrap_off_image = load_icon(WRAP_DISABLED, BUTTON_SIZE)
+        self.edit_image = load_icon(READWRITE, BUTTON_SIZE)
+        self.no_edit_image = load_icon(READONLY, BUTTON_SIZE)
+        self.save_image = load_icon(SAVE_CHANGES, BUTTON_SIZE)
+        self.search_image = load_icon(SEARCH_TEXT, BUTTON_SIZE)
+        self.mark_image = load_icon(MARK_FILES, BUTTON_SIZE)
 
         # Add a button to toggle textfield wrap option
         self.wrap_button = tk.Button(
@@ -151,6 +223,7 @@ class MainWindow(TreeFollowerObserver):
             self.button_bar, image=self.no_edit_image, command=self._toggle_edit_event)
         self.save_changes_button = tk.Button(
             self.button_bar, image=self.save_image, command=self._save_changes_event, state=tk.DISABLED)
+        self.search_entry = tk.Entry(self.button_bar, width=30)
         search_button = tk.Button(
             self.button_bar, image=self.search_image, command=self._perform_search)
         mark_button = tk.Button(
@@ -159,6 +232,7 @@ class MainWindow(TreeFollowerObserver):
         self.wrap_button.pack(side="left")
         self.edit_button.pack(side="left")
         self.save_changes_button.pack(side="left")
+        self.search_entry.pack(side="left", padx=(8, 0))
         search_button.pack(side="left")
         mark_button.pack(side="left")
 
@@ -166,9 +240,12 @@ class MainWindow(TreeFollowerObserver):
         self.wrap_tooltip = Tooltip(self.wrap_button, "Wrapping: Off")
         self.edit_tooltip = Tooltip(self.edit_button, "Edit: Disabled")
         Tooltip(self.save_changes_button, "Save changes")
-        Tooltip(search_button, "Search")
+        Tooltip(search_button, "Search all readme files")
         Tooltip(mark_button, "Mark in tree")
 
+        self.save_status = tk.Label(self.button_bar, text="", anchor="e")
+        self.save_status.pack(side="right", padx=(0, 8))
+
     def build_right_frame(self, right_frame: tk.Frame):
         # Create a label for the filename
         self.filename_label = tk.Label(
@@ -199,9 +276,12 @@ class MainWindow(TreeFollowerObserver):
         self.textfield.bind("<<Modified>>", self._modified_flag_changed)
         self.textfield.bind("<Control-s>", self._save_changes_event)
         self.textfield.bind("<FocusOut>", self._focusout_event)
+        self.textfield.bind("<KeyRelease>", self._schedule_autosave)
         # Bind right-click to show context menu
         self.listbox.bind("<Button-3>", self._show_context_menu)
         self.listbox.bind('<<ListboxSelect>>', self._onListboxSelect)
+        self.search_entry.bind("<Return>", lambda event: self._perform_search())
+        self.search_entry.bind("<Escape>", lambda event: self.clear_search())
 
     def build_gui(self):
         self.top = tk.Tk()
@@ -246,18 +326,244 @@ class MainWindow(TreeFollowerObserver):
         folder = config.WorkFolder
         self.project_folder_label.config(text=folder)
         self.update_recent_menu()
-        if (folder / LIST_FILE).exists():
-            filenames = load_list_from_text(folder / LIST_FILE)
+        self.load_project(folder)
+
+    def load_project(self, folder: Path) -> None:
+        '''Open the readme index of the project folder and show its readme files.
+           In a background thread, the index is brought up to date with the list
+           file and the readme files are read from it; the Tk thread only shows
+           the result. The folder is watched once the readme files are shown.
+        '''
+        self.flush_autosave()
+        self.stop_watching()
+        if self.readme_index is not None:
+            self.readme_index.close()
+            self.readme_index = None
+        self.close_search_index()
+        self.project_generation += 1
+        self.backup_store = BackupStore(folder, config.backup_retention)
+        self.populate_listbox(PathStore())
+        self.clear_editor()
+        list_file = folder / LIST_FILE
+        if list_file.exists() or ReadmeIndex.index_file_for(list_file).exists():
+            # import and read the list in the background, with a connection of its own
+            loaded = queue.Queue()
+            threading.Thread(target=self._load_project_list,
+                             args=(list_file, loaded), daemon=True).start()
+            self.top.after(LOAD_POLL_MS, self._receive_project_list,
+                           self.project_generation, folder, loaded)
+        else:
+            self._project_loaded(folder)
+
+    @staticmethod
+    def _load_project_list(list_file: Path, loaded: queue.Queue) -> None:
+        try:
+            with ReadmeIndex.open_for(list_file) as index:
+                loaded.put(load_list_from_index(index))
+        except (sqlite3.Error, OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Unable to read the readme files of {list_file}: {e}")
+            loaded.put(None)
+
+    def _receive_project_list(self, generation: int, folder: Path, loaded: queue.Queue) -> None:
+        try:
+            filenames = loaded.get_nowait()
+        except queue.Empty:
+            self.top.after(LOAD_POLL_MS, self._receive_project_list, generation, folder, loaded)
+            return
+        if generation != self.project_generation:
+            return      # another project was opened meanwhile
+        if filenames is not None:
+            try:
+                # the index is up to date, so opening it does not import the list
+                self.readme_index = ReadmeIndex(ReadmeIndex.index_file_for(folder / LIST_FILE))
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to open the readme index of {folder}: {e}")
+        if self.readme_index is not None:
+            # keep the readme files created while the list was read
+            created = filenames.missing(self.project_files)
+            filenames.extend(created)
+            try:
+                self.readme_index.add(created)
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to update the readme index: {e}")
             self.populate_listbox(filenames)
-            self.clear_editor()
+            self.open_search_index()
+        self._project_loaded(folder)
+
+    def _project_loaded(self, folder: Path) -> None:
+        self.start_watching(folder)
+        self.maintain_backups()
+
+    def maintain_backups(self) -> None:
+        '''Migrate the old backups and remove unused ones in the background. Without
+           readme files, for instance before the first scan, nothing is migrated.
+        '''
+        threading.Thread(target=self.backup_store.maintain, args=(list(self.project_files),),
+                         daemon=True).start()
+
+    # Full text search
+    # ----------------
+    def open_search_index(self) -> None:
+        '''Open the search index next to the readme index and bring it up to date
+           in the background
+        '''
+        try:
+            self.search_index = SearchIndex(self.readme_index.db_file)
+        except sqlite3.Error as e:
+            logger.warning(f"Full text search is not available: {e}")
+            return
+        self.search_indexer = SearchIndexer(self.readme_index.db_file)
+        self.search_indexer.index_all(self.project_files)
+
+    def close_search_index(self) -> None:
+        if self.search_indexer is not None:
+            self.search_indexer.stop()
+            self.search_indexer = None
+        if self.search_index is not None:
+            self.search_index.close()
+            self.search_index = None
+
+    def _perform_search(self) -> None:
+        '''Show the readme files that contain all words in the search box,
+           the most relevant first. An empty search box shows all readme files again.
+        '''
+        terms = query_terms(self.search_entry.get())
+        if not terms:
+            self.clear_search()
+            return
+        self.search_terms = terms
+        if self.search_index is not None:
+            hits = self.search_index.search(terms)
+            logger.info(f"Found {len(hits)} readme files with {' '.join(terms)}")
+            self.filenames = PathStore(hit.path for hit in hits)
+            self.listbox.set_model(self.filenames)
+        self.search_text(terms)
+
+    def clear_search(self) -> None:
+        self.search_entry.delete(0, tk.END)
+        self.search_terms = []
+        self.textfield.tag_remove("search", "1.0", tk.END)
+        if self.filenames is not self.project_files:
+            self.filenames = self.project_files
+            self.listbox.set_model(self.filenames)
+
+    # Watching the work folder
+    # ------------------------
+    def start_watching(self, folder: Path) -> None:
+        '''Keep the readme list up to date with changes in the folder,
+           if enabled in the configuration
+        '''
+        self.stop_watching()
+        if config.watch_mode not in ('native', 'polling'):
+            return
+        # a native watcher walks the whole tree when it starts, so it starts in
+        # the background, like the scan
+        started = queue.Queue()
+        threading.Thread(target=self._start_watcher, daemon=True, args=(
+            folder, config.watch_mode, config.get_scan_profile(folder),
+            config.poll_interval, config.poll_budget, started)).start()
+        self.top.after(LOAD_POLL_MS, self._receive_started_watcher,
+                       self.watch_generation, folder, started)
+
+    @staticmethod
+    def _start_watcher(folder: Path, watch_mode: str, profile: ScanProfile,
+                       poll_interval: float, poll_budget: float,
+                       started: queue.Queue) -> None:
+        try:
+            if watch_mode == 'native':
+                watcher = ReadmeWatcher(folder, profile)
+            else:
+                # start from the folders of the last scan, if available
+                cache = ScanCache.load(ScanCache.cache_file_for(folder / LIST_FILE),
+                                       folder, profile.follow_symlinks)
+                watcher = PollingWatcher(folder, profile, cache, poll_interval, poll_budget)
+            watcher.start()
+            started.put(watcher)
+        except Exception as e:
+            started.put(e)
+
+    def _receive_started_watcher(self, generation: int, folder: Path,
+                                 started: queue.Queue) -> None:
+        try:
+            watcher = started.get_nowait()
+        except queue.Empty:
+            self.top.after(LOAD_POLL_MS, self._receive_started_watcher,
+                           generation, folder, started)
+            return
+        if isinstance(watcher, Exception):
+            logger.warning(f"Cannot watch {folder} for changes: {watcher}")
+            return
+        if generation != self.watch_generation:
+            watcher.stop()      # stopped or restarted while it was starting
+            return
+        self.watcher = watcher
+        self.top.after(WATCH_POLL_MS, self._receive_watch_changes, watcher)
+
+    def stop_watching(self) -> None:
+        self.watch_generation += 1
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def change_watch_mode(self) -> None:
+        config.set_watch_mode(self.watch_mode.get())
+        self.start_watching(config.WorkFolder)
+
+    def _receive_watch_changes(self, watcher: ReadmeWatcher | PollingWatcher) -> None:
+        if watcher is not self.watcher:
+            return      # stopped, or replaced by the watcher of another folder
+        while not watcher.changes.empty():
+            self.apply_readme_changes(watcher.changes.get_nowait())
+        self.top.after(WATCH_POLL_MS, self._receive_watch_changes, watcher)
+
+    def apply_readme_changes(self, changes: ReadmeChanges) -> None:
+        '''Update the listbox and the readme index with the changes found by the watcher'''
+        listings = get_listing_cache()
+        for folder in changes.touched_folders:
+            listings.invalidate(folder)
+        for folder in changes.removed_folders:
+            listings.invalidate_tree(folder)
+        removed = list(changes.removed)
+        if changes.removed_folders:
+            removed.extend(path for path in self.project_files if changes.is_removed(path))
+        if self.project_files.remove(removed):
+            self.listbox.selection_clear(0, tk.END)
+        if self.filenames is not self.project_files:
+            self.filenames.remove(removed)      # search results
+        added = self.project_files.missing(changes.added)
+        self.project_files.extend(added)
+        self.listbox.refresh()
+        if self.readme_index is not None:
+            try:
+                self.readme_index.remove(removed)
+                self.readme_index.add(added)
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to update the readme index: {e}")
+        if self.search_indexer is not None:
+            self.search_indexer.index_files(removed + added)
+        if self.dirtree.tree_filter is not None:
+            self.dirtree.tree_filter.remove(removed)
+            self.dirtree.tree_filter.add(added)
 
     # Observer callback
     def update(self, event: str, item_id: Path):
         if event == "item_added":
-            new_readme = pd.Series(str(item_id))
-            filenames = pd.concat([new_readme, self.filenames])
-            self.populate_listbox(filenames)
-            self.listbox.selection_set(0)   # select the new readme file
+            if self.filenames is None:
+                self.populate_listbox(PathStore())
+            self.clear_search()
+            self.append_to_listbox([str(item_id)])
+            # select the new readme file
+            last = len(self.filenames) - 1
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(last)
+            self.listbox.see(last)
+            if self.readme_index is not None:
+                try:
+                    self.readme_index.add([str(item_id)])
+                except sqlite3.Error as e:
+                    logger.warning(f"Unable to update the readme index: {e}")
+            if self.search_indexer is not None:
+                self.search_indexer.index_files([str(item_id)])
 
             logger.info(f"{event}: {item_id}")
         if event == "readme_clicked":
@@ -280,20 +586,158 @@ class MainWindow(TreeFollowerObserver):
         if file_path:
             self.populate_listbox(load_list_from_text(Path(file_path)))
 
-    def reload_readme_list(self) -> None:
-        self.progress.stop_animation()
-        self.populate_listbox(load_list_from_text(config.WorkFolder / LIST_FILE))
-
-    def rescan_readme_files(self) -> None:
-        self.progress = ProgressPopup(self.top)
+    def rescan_readme_files(self, incremental: bool = True) -> None:
+        '''Scan for readme files in a background thread. An incremental scan
+           only lists the folders that changed since the previous scan.
+           The readme files are added to the listbox while the scan runs.
+        '''
+        stats = ScanStats()
+        self.scan_cancel = threading.Event()
+        self.progress = ProgressPopup(self.top, on_cancel=self.scan_cancel.set)
         self.progress.update_text("Scanning for readme files. This can take some time")
+        self.progress.show_stats(stats)
         self.progress.start_animation()
 
+        self.populate_listbox(PathStore())
+        self.clear_editor()
+        self.scan_results = queue.Queue()
+
         # rescan for readme files
-        t = CallbackThread(target=scan_readme_files,
-                           args=(config.WorkFolder, config.WorkFolder / LIST_FILE),
-                           callback=self.reload_readme_list)
+        t = CallbackThread(target=scan_and_index,
+                           args=(config.WorkFolder, config.WorkFolder / LIST_FILE,
+                                 True, config.scan_jobs, incremental,
+                                 self.scan_results.put, stats,
+                                 config.get_scan_profile(config.WorkFolder), self.scan_cancel),
+                           callback=lambda: self.scan_results.put(None))
         t.start()
+        self.top.after(100, self._receive_scan_results)
+
+    def _receive_scan_results(self) -> None:
+        '''Append the batches found by the scan thread to the listbox'''
+        while not self.scan_results.empty():
+            batch = self.scan_results.get_nowait()
+            if batch is None:
+                self.progress.stop_animation(
+                    "Cancelled" if self.scan_cancel.is_set() else "Done!")
+                self.refresh_tree_filter()
+                if self.readme_index is None:
+                    self.readme_index = ReadmeIndex.open_for(config.WorkFolder / LIST_FILE)
+                if self.search_indexer is None:
+                    self.open_search_index()
+                else:
+                    self.search_indexer.index_all(self.project_files)
+                if not self.scan_cancel.is_set():
+                    self.maintain_backups()
+                return
+            self.append_to_listbox(batch)
+        self.top.after(100, self._receive_scan_results)
+
+    def coverage_report(self) -> None:
+        '''Check in the background which files below the work folder are not
+           documented, and save the report as CSV or JSON
+        '''
+        output_file = filedialog.asksaveasfilename(
+            initialfile='documentation_coverage.csv', defaultextension='.csv',
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json")])
+        if not output_file:
+            return
+        self.coverage_cancel = threading.Event()
+        self.progress = ProgressPopup(self.top, on_cancel=self.coverage_cancel.set)
+        self.progress.update_text("Checking the documentation of all files")
+        self.progress.start_animation()
+        self.coverage_result = queue.Queue()
+        threading.Thread(target=lambda: self.coverage_result.put(coverage_to_file(
+            config.WorkFolder, Path(output_file), config.scan_jobs,
+            config.get_scan_profile(config.WorkFolder), self.coverage_cancel)),
+            daemon=True).start()
+        self.top.after(100, self._receive_coverage_result)
+
+    def _receive_coverage_result(self) -> None:
+        try:
+            summary = self.coverage_result.get_nowait()
+        except queue.Empty:
+            self.top.after(100, self._receive_coverage_result)
+            return
+        cancelled = self.coverage_cancel.is_set()
+        self.progress.stop_animation("Cancelled" if cancelled else "Done!")
+        if not cancelled:
+            messagebox.showinfo("Documentation coverage", summary, parent=self.top)
+
+    def generate_missing_readmes(self) -> None:
+        '''Look in the background for folders with data files but without a readme file,
+           and after confirmation create their readme files from the active template
+        '''
+        self.generate_cancel = threading.Event()
+        self.progress = ProgressPopup(self.top, on_cancel=self.generate_cancel.set)
+        self.progress.update_text("Looking for folders without readme files")
+        self.progress.start_animation()
+        self.generate_result = queue.Queue()
+        threading.Thread(target=self._generate_in_background, args=(
+            folders_without_readme, config.WorkFolder, config.scan_jobs,
+            config.get_scan_profile(config.WorkFolder), self.generate_cancel),
+            daemon=True).start()
+        self.top.after(100, self._receive_missing_readmes)
+
+    def _generate_in_background(self, function, *args, **kwargs) -> None:
+        '''Put the result of the function on the generate queue; an empty list when it
+           fails, so the polling always ends
+        '''
+        try:
+            self.generate_result.put(function(*args, **kwargs))
+        except Exception as e:
+            logger.exception(f"Unable to create the readme files: {e}")
+            self.generate_result.put([])
+
+    def _receive_missing_readmes(self) -> None:
+        try:
+            folders = self.generate_result.get_nowait()
+        except queue.Empty:
+            self.top.after(100, self._receive_missing_readmes)
+            return
+        cancelled = self.generate_cancel.is_set()
+        self.progress.stop_animation("Cancelled" if cancelled else "Done!")
+        if cancelled:
+            return
+        if not folders:
+            messagebox.showinfo("Create readme files", "All folders with data files have "
+                                "a readme file", parent=self.top)
+            return
+        preview = '\n'.join(folders[:GENERATE_PREVIEW])
+        if len(folders) > GENERATE_PREVIEW:
+            preview += f"\n... and {len(folders) - GENERATE_PREVIEW} more"
+        question = f"Create {len(folders)} readme files from {config.active_template}?"
+        if not messagebox.askyesno("Create readme files", f"{question}\n\n{preview}",
+                                   parent=self.top):
+            return
+        self.generate_cancel = threading.Event()
+        self.progress = ProgressPopup(self.top, on_cancel=self.generate_cancel.set)
+        self.progress.update_text("Creating readme files")
+        self.progress.start_animation()
+        threading.Thread(target=self._generate_in_background, args=(
+            generate_readmes, folders, ReadmeContent.TEMPLATE_WITH_FILE_LIST),
+            kwargs={'jobs': config.scan_jobs, 'cancel': self.generate_cancel},
+            daemon=True).start()
+        self.top.after(100, self._receive_generated_readmes)
+
+    def _receive_generated_readmes(self) -> None:
+        try:
+            results = self.generate_result.get_nowait()
+        except queue.Empty:
+            self.top.after(100, self._receive_generated_readmes)
+            return
+        self.progress.stop_animation("Cancelled" if self.generate_cancel.is_set() else "Done!")
+        created = [result.readme for result in results if result.status == 'created']
+        self.apply_readme_changes(ReadmeChanges(added=created))
+        errors = sum(result.status == 'error' for result in results)
+        messagebox.showinfo("Create readme files",
+                            f"{len(created)} readme files created, {errors} errors",
+                            parent=self.top)
+
+    def edit_scan_profile(self) -> None:
+        folder = config.WorkFolder
+        dialog = ScanProfileDialog(self.top, folder, config.get_scan_profile(folder))
+        if dialog.result is not None:
+            config.set_scan_profile(folder, dialog.result)
 
     # Textfield event handlers
     # --------------------------
@@ -337,15 +781,55 @@ class MainWindow(TreeFollowerObserver):
             self._save_changes_event()
 
     def _save_changes_event(self, event=None) -> None:
+        '''Hand a snapshot of the text to the save worker; the file is written
+           in the background
+        '''
         logger.info("Save changes event")
+        self._cancel_autosave()
 
         if not self.current_filename:
             return
 
-        save_readme_changes(self.current_filename, self.textfield.get('1.0', tk.END))
+        if not self.save_worker.busy:
+            self.top.after(SAVE_POLL_MS, self._receive_save_results)
+        self.save_worker.submit(self.current_filename, self.textfield.get('1.0', tk.END),
+                                self.backup_store)
         self.textfield.edit_modified(False)
+        self.save_status.config(text="Saving...")
         return
 
+    def _receive_save_results(self) -> None:
+        while not self.save_worker.results.empty():
+            result = self.save_worker.results.get_nowait()
+            if result.error is not None:
+                self.save_status.config(text=f"Not saved: {result.error}")
+                if result.filename == self.current_filename:
+                    self.textfield.edit_modified(True)     # allow to save again
+                continue
+            self.content_cache.invalidate(str(result.filename))
+            if self.search_indexer is not None:
+                self.search_indexer.index_files([str(result.filename)])
+            self.save_status.config(text=f"Saved {time.strftime('%H:%M:%S')}")
+        if self.save_worker.busy or not self.save_worker.results.empty():
+            self.top.after(SAVE_POLL_MS, self._receive_save_results)
+
+    def _schedule_autosave(self, event=None) -> None:
+        '''Save when there were no key strokes for a while'''
+        if not self.textfield.edit_modified():
+            return
+        self._cancel_autosave()
+        self.autosave_job = self.top.after(AUTOSAVE_DELAY_MS, self._save_changes_event)
+
+    def _cancel_autosave(self) -> None:
+        if self.autosave_job is not None:
+            self.top.after_cancel(self.autosave_job)
+            self.autosave_job = None
+
+    def flush_autosave(self) -> None:
+        '''Save the changes now, before switching to another file'''
+        if self.current_filename is not None and self.textfield.edit_modified():
+            self._save_changes_event()
+
     def _toggle_edit_event(self) -> None:
         '''Toggle the state of the textfield between read-only and editable
             Update the tooltip and the image of the edit button
@@ -362,30 +846,20 @@ class MainWindow(TreeFollowerObserver):
         self.edit_tooltip.set_text(text="Edit: Disabled" if new_state ==
                                    "disabled" else "Edit: Enabled")
 
-    def _perform_search(self):
-        # TODO: implement search
-        # search_term = self.search_entry.get()
-        search_term = ['locations', 'pipo', 'raster']
-        self.search_text(search_term)
-
-    def _mark_with_tag(self, items: list[str], tag: str, fg: str, bg: str) -> list[str]:
+    def _mark_with_tag(self, items: list[str], tag: str, fg: str, bg: str,
+                       nocase: bool = False, whole_words: bool = True) -> list[str]:
         '''Mark the items in the textfield with the given tag
               and set the foreground and background colors
               Return a list of the items that were actually found in the text
         '''
         self.textfield.tag_remove(tag, "1.0", tk.END)
 
-        found_items = []
-        for item in items:
-            start_pos = "1.0"
-            while True:
-                start_pos = self.textfield.search(item, start_pos, stopindex=tk.END)
-                if not start_pos:
-                    break
-                found_items.append(item)
-                end_pos = f"{start_pos}+{len(item)}c"
-                self.textfield.tag_add(tag, start_pos, end_pos)
-                start_pos = end_pos
+        # find all items in one pass over the text, then add the tags in bulk
+        text = self.textfield.get("1.0", "end-1c")
+        spans, found_items = TextMatcher(items, nocase, whole_words).find(text)
+        indices = TextIndexer(text).ranges(spans)
+        for start in range(0, len(indices), 2 * TAG_RANGES_PER_CALL):
+            self.textfield.tag_add(tag, *indices[start:start + 2 * TAG_RANGES_PER_CALL])
 
         self.textfield.tag_configure(tag, background=bg, foreground=fg)
 
@@ -397,7 +871,10 @@ class MainWindow(TreeFollowerObserver):
         if not search_terms:
             return
 
-        _ = self._mark_with_tag(search_terms, "search", fg="black", bg="yellow")
+        found = self._mark_with_tag(search_terms, "search", fg="black", bg="yellow",
+                                    nocase=True, whole_words=False)
+        if found:
+            self.textfield.see(self.textfield.tag_ranges("search")[0])
 
     def _mark_filenames(self):
         '''Highlight files in the text: only those filenames that are in the same folder
@@ -408,25 +885,33 @@ class MainWindow(TreeFollowerObserver):
             return
 
         path = self.current_filename.parent
-        filenames = [filename.name for filename in path.iterdir()]
-        found_files = self._mark_with_tag(filenames, "mark", fg="black", bg="lightblue")
+        # look for datasets: a shapefile is found by its name or stem, and all
+        # its files are highlighted in the tree
+        datasets = group_datasets(entry.name for entry in get_listing_cache().entries(path))
+        patterns = dataset_patterns(datasets)
+        found = self._mark_with_tag(list(patterns), "mark", fg="black", bg="lightblue")
+        found_files = [name for pattern in found for name in patterns[pattern].files]
 
         self.dirtree.highlight_filenames(path, found_files)
 
     # Listbox event handlers
     # ------------------------
 
-    def populate_listbox(self, filenames: pd.Series) -> None:
+    def populate_listbox(self, filenames: PathStore) -> None:
         if filenames is None:
             return
 
-        self.filenames = filenames
-        # Clear the listbox first
-        self.listbox.delete(0, tk.END)
+        self.filenames = self.project_files = filenames
+        self.search_terms = []
+        self.search_entry.delete(0, tk.END)
+        self.listbox.set_model(self.filenames)
+        self.refresh_tree_filter()
 
-        # Populate listbox with filenames
-        for filename in self.filenames:
-            self.listbox.insert(tk.END, pretty_print_name(filename, 50))
+    def append_to_listbox(self, filenames: list[str]) -> None:
+        self.project_files.extend(filenames)
+        self.listbox.refresh()
+        if self.dirtree.tree_filter is not None:
+            self.dirtree.tree_filter.add(filenames)
 
     def _onListboxSelect(self, event) -> None:
         self.top.after_idle(self.handle_listbox_select)
@@ -439,20 +924,46 @@ class MainWindow(TreeFollowerObserver):
             return
 
         if len(selection) == 1:
-            self.current_filename = Path(self.filenames.array[selection])
+            self.flush_autosave()
+            self.current_filename = Path(self.filenames[selection[0]])
             if self.current_filename.exists():
                 self.loadReadmeFile(self.current_filename)
             else:
                 self.clear_editor()
                 self.filename_label.config(text=f'''Could not find "{
                                            self.current_filename}"''')
+            self.prefetch_neighbours(selection[0])
+
+    def prefetch_neighbours(self, index: int) -> None:
+        '''Read the readme files around the selected one in the background,
+           the nearest first, to show them without delay when selected next
+        '''
+        neighbours = []
+        for distance in range(1, PREFETCH_NEIGHBOURS + 1):
+            neighbours.extend(i for i in (index + distance, index - distance)
+                              if 0 <= i < len(self.filenames))
+        self.content_cache.prefetch(Path(self.filenames[i]) for i in neighbours)
 
     def loadReadmeFile(self, filename: Path) -> None:
         '''Load the contents of the readme file with name filename into the textfield.
            It is checked for different possible encodings 
         '''
+        self.flush_autosave()
         self.current_filename = filename
-        file_contents = read_file_contents(filename)
+        record = None
+        if self.readme_index is not None:
+            st = filename.stat()
+            try:
+                record = self.readme_index.get(str(filename))
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to read the readme index: {e}")
+            if (record is not None and record.encoding
+                    and (record.size, record.mtime) == (st.st_size, st.st_mtime)):
+                # the encoding found in a previous session is still valid
+                remember_encoding(filename, st, record.encoding)
+        file_contents = self.save_worker.pending_text(filename)
+        if file_contents is None:
+            file_contents = self.content_cache.get(filename)
         current_state = self.textfield.cget("state")
         self.textfield.configure(state='normal')    # allow insert if editor R/O
         self.clear_editor()
@@ -461,6 +972,18 @@ class MainWindow(TreeFollowerObserver):
         self.textfield.configure(state=current_state)
         self.textfield.edit_modified(False)
 
+        if self.search_terms:
+            self.search_text(self.search_terms)
+
+        if self.readme_index is not None:
+            current = (st.st_size, st.st_mtime, known_encoding(filename, st))
+            if record is None or (record.size, record.mtime, record.encoding) != current:
+                try:
+                    self.readme_index.record_content(
+                        str(filename), *current, content_hash(file_contents.encode('utf-8')))
+                except sqlite3.Error as e:
+                    logger.warning(f"Unable to update the readme index: {e}")
+
     # Context menu event handlers
     def _show_context_menu(self, event) -> None:
         selected_items = self.listbox.curselection()
@@ -477,7 +1000,7 @@ class MainWindow(TreeFollowerObserver):
     def open_in_explorer(self) -> None:
         selected_index = self.listbox.curselection()
         if selected_index:
-            selected_filename = self.filenames.array[selected_index]
+            selected_filename = self.filenames[selected_index[0]]
             selected_filename = selected_filename.replace('/', '\\')  # windows specific
             cmd = f'explorer /select,"{selected_filename}"'
             subprocess.Popen(cmd)
@@ -491,7 +1014,7 @@ class MainWindow(TreeFollowerObserver):
         if file_path:
             with open(file_path, 'w', encoding='utf-8') as file:
                 for index in selected_items:
-                    file.write(self.filenames.array[index] + '\n')
+                    file.write(self.filenames[index] + '\n')
 
 
 # file menu event handlers
@@ -508,17 +1031,46 @@ def switch_to_folder(mw: MainWindow, new_folder: Path = None) -> None:
         mw.update_recent_menu()
         mw.dirtree.clear_tree()
         mw.dirtree.load_tree(new_folder)
-        if (new_folder / LIST_FILE).exists():
-            filenames = load_list_from_text(new_folder / LIST_FILE)
-            mw.populate_listbox(filenames)
-            mw.clear_editor()
+        mw.load_project(new_folder)
+
+
+def scan_and_index(folder: Path, list_file: Path, *args) -> None:
+    '''Scan for readme files (see `scan_readme_files`) and update the
+       readme index with the new list file.
+    '''
+    if scan_readme_files(folder, list_file, *args):
+        with ReadmeIndex.open_for(list_file):
+            pass
+
+
+def coverage_to_file(folder: Path, output_file: Path, jobs: int, profile: ScanProfile,
+                     cancel: threading.Event) -> str:
+    '''Check the documentation coverage (see `check_coverage`) and write the report,
+       unless cancelled. Return a summary for the user.
+    '''
+    try:
+        report = check_coverage(folder, jobs, profile, cancel)
+        if cancel.is_set():
+            return "Cancelled"
+        write_report(report, output_file)
+    except OSError as e:
+        logger.error(f"Unable to write the coverage report {output_file}: {e}")
+        return f"Unable to write the coverage report: {e}"
+    return f"{report.summary()}\n\nReport saved in {output_file}"
 
 
 def main():
+    setup_logging()
+    timeline = StartupTimeline()
+    timeline.mark("imports")
     mw = MainWindow()
     mw.build_gui()
+    timeline.mark("build gui")
     mw.top.wait_visibility()
+    timeline.mark("window visible")
     mw.initialize()
+    timeline.mark("initialize")
+    timeline.report()
     mw.top.mainloop()
 
 
@@ -0,0 +1,54 @@
+from importlib.resources import files
+import logging
+from pathlib import Path
+import tempfile
+import tkinter as tk
+from bioview.config import CACHE_FOLDER
+
+ICON_CACHE = CACHE_FOLDER / 'icons'
+# Used when the icon cache cannot be written, like with a read-only home folder
+FALLBACK_ICON_CACHE = Path(tempfile.gettempdir()) / 'bioview_icons'
+
+logger = logging.getLogger(__name__)
+
+
+def _render(source: Path, target: Path, size: int | None) -> None:
+    '''Convert an image to PNG, resized to size x size pixels.
+       This is the only place that needs PIL, so it is imported here.
+    '''
+    from PIL import Image
+
+    image = Image.open(source)
+    if size is not None:
+        image = image.resize((size, size), Image.Resampling.LANCZOS)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    image.save(target, format='PNG')
+    logger.info(f"Rendered icon {target}")
+
+
+def icon_file(name: str, size: int | None = None) -> Path:
+    '''Return a PNG version of the image `name` from the animations folder,
+       resized to size x size pixels. Rendered images are cached, they are
+       only rendered again when the source image is newer. When the icon cache
+       cannot be written, the image is rendered in the temporary folder.
+    '''
+    source = Path(str(files('animations').joinpath(name)))
+    for cache in [ICON_CACHE, FALLBACK_ICON_CACHE]:
+        target = cache / f"{source.stem}-{size or 'full'}.png"
+        try:
+            if target.stat().st_mtime >= source.stat().st_mtime:
+                return target
+        except OSError:
+            pass
+        try:
+            _render(source, target, size)
+            return target
+        except OSError as e:
+            logger.warning(f"Unable to write icon {target}: {e}")
+            error = e
+    raise error
+
+
+def load_icon(name: str, size: int | None = None) -> tk.PhotoImage:
+    '''Load the image `name` from the animations folder, see `icon_file`'''
+    return tk.PhotoImage(file=icon_file(name, size))
@@ -1,32 +1,97 @@
+import codecs
 import locale
 import logging
+import os
 from pathlib import Path
 from bioview.charset_detector import CharsetDetector
 
+MAX_KNOWN_ENCODINGS = 10000
+
 log = logging.getLogger(__name__)
 
+# Encoding that decoded a file, per (path, mtime_ns, size)
+_known_encodings: dict[tuple[str, int, int], str] = {}
 
-def read_file_contents(filename: Path) -> str:
-    '''Read the contents of the file with name filename.
-       Check for different possible encodings.
-    '''
-    encod = None
-    if filename.stat().st_size == 0:
-        return ''
 
-    with open(filename, 'rb') as file:
-        encod = CharsetDetector.get_charset(file)
+def _file_key(filename: Path, st: os.stat_result) -> tuple[str, int, int]:
+    return str(filename), st.st_mtime_ns, st.st_size
+
+
+def known_encoding(filename: Path, st: os.stat_result) -> str | None:
+    '''Return the encoding found when the file was last loaded, if it did not change'''
+    return _known_encodings.get(_file_key(filename, st))
+
+
+def remember_encoding(filename: Path, st: os.stat_result, encoding: str) -> None:
+    '''Remember the encoding of a file, for instance from the readme index'''
+    if len(_known_encodings) >= MAX_KNOWN_ENCODINGS:
+        _known_encodings.clear()
+    _known_encodings[_file_key(filename, st)] = encoding
+
+
+def detect_encoding(data: bytes) -> str:
+    '''Detect the encoding from the byte order mark at the start of the data'''
+    return CharsetDetector.get_encoding_name(data[:4], min(len(data), 4))
+
+
+def _has_codec(encoding: str | None) -> bool:
+    '''Check if Python has a codec for the encoding'''
+    try:
+        codecs.lookup(encoding or '')
+        return True
+    except LookupError:
+        return False
+
 
-    if not encod:
-        log.error(f'Unable to decode file "{filename}".')
-        return "Error: Unable to decode file."
-    else:
+def normalize_newlines(text: str) -> str:
+    '''Convert Windows and old Mac line ends to '\\n', like reading in text mode'''
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def decode_contents(data: bytes, hint: str | None = None) -> tuple[str, str]:
+    '''Decode the data in memory. Try the hint, the detected encoding, utf-8 and the
+       encoding of the system locale, in that order. If none of them works, undecodable
+       bytes are replaced. Return the text, with '\\n' line ends, and the encoding used.
+    '''
+    detected = detect_encoding(data)
+    candidates = [hint, detected, 'utf-8', locale.getencoding()]
+    tried = set()
+    for encoding in candidates:
+        if not encoding:
+            continue
+        try:
+            name = codecs.lookup(encoding).name
+        except LookupError:
+            continue
+        if name in tried:
+            continue
+        tried.add(name)
         try:
-            with open(filename, 'r', encoding=encod) as file:
-                return file.read()
+            return normalize_newlines(data.decode(encoding)), encoding
         except UnicodeDecodeError:
-            log.warning(
-                f'File "{filename}" is not utf-8 encoded. Defaulting to system locale.')
-            encod = locale.getencoding()
-            with open(filename, 'r', encoding=encod) as file:
-                return file.read()
+            continue
+    # the detector can name an encoding that Python has no codec for
+    fallback = detected if _has_codec(detected) else 'utf-8'
+    log.warning(f'Unable to decode with {", ".join(sorted(tried))}, '
+                f'replacing invalid {fallback} characters')
+    return normalize_newlines(data.decode(fallback, errors='replace')), fallback
+
+
+def load_readme_file(filename: Path, encoding: str | None = None) -> tuple[str, str]:
+    '''Read the file with name filename, with a single read, and decode it.
+       The encoding is a hint, by default the encoding found when the file
+       was last loaded. Return the text and the encoding that was used.
+    '''
+    with open(filename, 'rb') as file:
+        st = os.fstat(file.fileno())
+        data = file.read()
+    text, encoding = decode_contents(data, encoding or known_encoding(filename, st))
+    remember_encoding(filename, st, encoding)
+    return text, encoding
+
+
+def read_file_contents(filename: Path) -> str:
+    '''Read the contents of the file with name filename.
+       Check for different possible encodings.
+    '''
+    return load_readme_file(filename)[0]
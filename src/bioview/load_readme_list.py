@@ -1,8 +1,9 @@
 from pathlib import Path
-import pandas as pd
+from bioview.path_store import PathStore
+from bioview.readme_index import ReadmeIndex
 
 
-def load_list_from_text(file_path: Path) -> pd.Series:
+def load_list_from_text(file_path: Path) -> PathStore:
     """
     Load a list readme file locations from a text file.
 
@@ -10,11 +11,20 @@ def load_list_from_text(file_path: Path) -> pd.Series:
         file_path (str): The path to the text file.
 
     Returns:
-        series: a pandas Series containing the file locations of all readme files.
+        PathStore: the file locations of all readme files.
     """
-    # Load the text file
-    lines = None
     with open(file_path, 'r') as file:
-        lines = file.read().splitlines()
+        return PathStore(line.rstrip('\n') for line in file if line.strip())
 
-    return pd.Series(lines)
+
+def load_list_from_index(index: ReadmeIndex) -> PathStore:
+    """
+    Load the readme file locations from the readme index of a project.
+
+    Args:
+        index (ReadmeIndex): The opened readme index.
+
+    Returns:
+        PathStore: the file locations of all readme files.
+    """
+    return PathStore(index.paths())
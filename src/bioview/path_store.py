@@ -0,0 +1,182 @@
+from array import array
+import itertools
+import operator
+import os
+from typing import Iterable, Iterator
+
+ENCODING = ('utf-8', 'surrogatepass')    # round trips every str, also undecodable names
+MAX_MEMO = 10000        # folder paths remembered while iterating
+MAX_DELETES = 16        # above this, remove rebuilds the arrays instead of deleting
+
+
+if os.name == 'nt':
+    def _name_starts(paths: list[str]) -> list[int]:
+        return [max(path.rfind('\\'), path.rfind('/')) + 1 for path in paths]
+
+    def _parents(folders: list[str]) -> list[str]:
+        '''The parent of every folder, a folder ends with a separator'''
+        return [folder[:max(folder.rfind('\\', 0, -1), folder.rfind('/', 0, -1)) + 1]
+                for folder in folders]
+else:
+    def _name_starts(paths: list[str]) -> list[int]:
+        return [path.rfind('/') + 1 for path in paths]
+
+    def _parents(folders: list[str]) -> list[str]:
+        '''The parent of every folder, a folder ends with a separator'''
+        return [folder[:folder.rfind('/', 0, -1) + 1] for folder in folders]
+
+
+class PathStore:
+    '''Compact list of file paths.
+
+       Folders are kept in a table of (parent folder, last component), so the
+       start that folders share is stored once; the components are stored as
+       UTF-8 in a single bytearray. The file names, of which there are few,
+       are interned. A path is stored as the id of its folder, the id of its
+       name and its hash, in arrays. In the usual layout of one readme file per
+       folder a path takes the bytes of its folder name plus about 30 bytes,
+       instead of a str object of about 100 bytes.
+
+       Parent folders are always shared. The folder of a path is shared with the
+       paths before it in the same `extend`, as they come from a scan or from the
+       sorted index; a folder that returns later gets another entry, which only
+       costs a little memory. This keeps building from a million paths fast.
+       Getting a path joins the components of its folder, O(depth); the folders
+       that were looked up recently are remembered, so drawing the visible rows
+       of a list joins each folder once.
+       `index` and `in` compare the hashes in a linear scan, O(n) but in C;
+       `remove` and `missing` handle many paths in a single scan.
+       Paths are returned exactly as added.
+    '''
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._chars = bytearray()           # the folder components, encoded
+        self._start = array('I', [0])       # component i is _chars[_start[i]:_start[i + 1]]
+        self._parent = array('i')           # parent folder of a folder, -1 for none
+        self._ancestor_ids: dict[str, int] = {'': -1}   # the folders that are a parent
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self._folder_of = array('i')        # per path: its folder, -1 for none
+        self._name_of = array('I')
+        self._hash_of = array('q')
+        self._memo: dict[int, str] = {}     # recently looked up folders
+        self.extend(paths)
+
+    def _add_folders(self, folders: list[str]) -> None:
+        '''Add the folders, in order, followed by the parent folders that are new'''
+        ancestors = self._ancestor_ids
+        added = list(folders)
+        parents = _parents(folders)
+        pending = [parent for parent in dict.fromkeys(parents) if parent not in ancestors]
+        while pending:
+            first = len(self._parent) + len(added)
+            ancestors.update(zip(pending, range(first, first + len(pending))))
+            added.extend(pending)
+            level = _parents(pending)
+            parents.extend(level)
+            pending = [parent for parent in dict.fromkeys(level) if parent not in ancestors]
+        components = [folder[len(parent):].encode(*ENCODING)
+                      for folder, parent in zip(added, parents)]
+        self._parent.extend(map(ancestors.__getitem__, parents))
+        self._start.extend(itertools.islice(
+            itertools.accumulate(map(len, components), initial=len(self._chars)), 1, None))
+        self._chars += b''.join(components)
+
+    def append(self, path: str) -> None:
+        self.extend([path])
+
+    def extend(self, paths: Iterable[str]) -> None:
+        '''Add the paths. The work is done in bulk: per path only C loops run,
+           the Python code runs per folder.
+        '''
+        paths = list(paths)
+        if not paths:
+            return
+        starts = _name_starts(paths)
+        folders = [path[:i] for path, i in zip(paths, starts)]
+        names = [path[i:] for path, i in zip(paths, starts)]
+        new_folder = [True] + list(map(operator.ne, folders, folders[1:]))
+        self._folder_of.extend(itertools.islice(
+            itertools.accumulate(new_folder, initial=len(self._parent) - 1), 1, None))
+        self._add_folders(list(itertools.compress(folders, new_folder)))
+        for name in dict.fromkeys(names):
+            if name not in self._name_ids:
+                self._name_ids[name] = len(self._names)
+                self._names.append(name)
+        self._name_of.extend(map(self._name_ids.__getitem__, names))
+        self._hash_of.extend(map(hash, paths))
+
+    def _folder(self, folder_id: int, memo: dict[int, str]) -> str:
+        if folder_id < 0:
+            return ''
+        folder = memo.get(folder_id)
+        if folder is None:
+            if len(memo) >= MAX_MEMO:
+                memo.clear()
+            component = self._chars[self._start[folder_id]:self._start[folder_id + 1]]
+            folder = memo[folder_id] = (self._folder(self._parent[folder_id], memo)
+                                        + component.decode(*ENCODING))
+        return folder
+
+    def __len__(self) -> int:
+        return len(self._folder_of)
+
+    def __getitem__(self, index: int) -> str:
+        return (self._folder(self._folder_of[index], self._memo)
+                + self._names[self._name_of[index]])
+
+    def __iter__(self) -> Iterator[str]:
+        memo: dict[int, str] = {}
+        names = self._names
+        for folder_id, name_id in zip(self._folder_of, self._name_of):
+            yield self._folder(folder_id, memo) + names[name_id]
+
+    def index(self, path: str) -> int:
+        '''Return the position of path in the list, raise ValueError if not found'''
+        digest = hash(path)
+        start = 0
+        while True:
+            try:
+                start = self._hash_of.index(digest, start)
+            except ValueError:
+                raise ValueError(f"{path} is not in the list") from None
+            if self[start] == path:
+                return start
+            start += 1
+
+    def __contains__(self, path: str) -> bool:
+        try:
+            self.index(path)
+            return True
+        except ValueError:
+            return False
+
+    def _positions(self, paths: set[str]) -> list[int]:
+        '''The positions of the paths that are in the list, ascending'''
+        digests = {hash(path) for path in paths}
+        return [i for i, digest in enumerate(self._hash_of)
+                if digest in digests and self[i] in paths]
+
+    def missing(self, paths: Iterable[str]) -> list[str]:
+        '''Return the paths that are not in the list, in order and without duplicates'''
+        paths = list(dict.fromkeys(paths))
+        present = {self[i] for i in self._positions(set(paths))}
+        return [path for path in paths if path not in present]
+
+    def remove(self, paths: Iterable[str]) -> list[int]:
+        '''Remove the paths from the list. Return the old positions of
+           the removed paths, in descending order.
+        '''
+        positions = self._positions(set(paths))
+        if len(positions) <= MAX_DELETES:
+            for position in reversed(positions):
+                del self._folder_of[position]
+                del self._name_of[position]
+                del self._hash_of[position]
+        else:
+            removed = set(positions)
+            for name in ['_folder_of', '_name_of', '_hash_of']:
+                values = getattr(self, name)
+                setattr(self, name, array(values.typecode, (
+                    value for i, value in enumerate(values) if i not in removed)))
+        return positions[::-1]
@@ -0,0 +1,173 @@
+from collections import deque
+import logging
+import os
+from pathlib import Path
+import queue
+import sys
+import threading
+from bioview.config import ScanProfile
+from bioview.readme_watcher import ReadmeChanges
+from bioview.scan_cache import CacheEntry, ScanCache
+from bioview.scan_readmefiles import VisitedFolders, list_folder
+
+DEFAULT_INTERVAL = 5.0      # seconds between two polls
+DEFAULT_BUDGET = 2000       # folders checked per poll
+
+logger = logging.getLogger(__name__)
+
+
+class PollingChangeDetector:
+    '''Detect changes to readme files by polling the modification times of folders,
+       for file systems without (reliable) change notifications, like network shares.
+
+       The snapshot holds one entry per folder, in the same form as the ScanCache:
+       the folder mtime and the names of its readme files and subfolders. Files
+       that are not readme files are not stored at all. A folder is only listed
+       again when its mtime changed, which is the case when entries in it are
+       added, removed or renamed.
+       Every poll checks at most `budget` folders; a sweep over a large tree is
+       spread over several polls and continues where the previous poll stopped.
+    '''
+
+    def __init__(self, root: Path, profile: ScanProfile | None = None,
+                 folders: dict[str, CacheEntry] | None = None, budget: int = DEFAULT_BUDGET):
+        self.root = str(root)
+        self.profile = profile or ScanProfile(exclude=[])
+        self.folders = folders if folders is not None else {}
+        self.budget = max(1, budget)
+        self.sweeps = 0
+        self._visited = VisitedFolders()     # following links, every folder is polled once
+        # folders to check in the current sweep: (rel, new folder)
+        self._pending: deque[tuple[str, bool]] = deque()
+        # without a snapshot, the first sweep builds it without reporting changes
+        self._building = not self.folders
+        if self._building:
+            self._pending.append(('', True))
+
+    @classmethod
+    def from_cache(cls, cache: ScanCache, profile: ScanProfile | None = None,
+                   budget: int = DEFAULT_BUDGET) -> 'PollingChangeDetector':
+        '''Start from the folders of a previous scan'''
+        return cls(cache.root, profile, dict(cache.folders), budget)
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _depth(self, rel: str) -> int:
+        return rel.count(os.sep) + 1 if rel else 0
+
+    def _included(self, rel: str, names: list[str]) -> set[str]:
+        return {name for name in names
+                if not self.profile.is_excluded(name, os.path.join(rel, name))}
+
+    def _subfolders(self, rel: str, names: list[str]) -> set[str]:
+        max_depth = self.profile.max_depth
+        if max_depth is not None and self._depth(rel) >= max_depth:
+            return set()
+        return self._included(rel, names)
+
+    def _forget(self, rel: str, changes: ReadmeChanges) -> None:
+        '''Remove a folder and its subfolders from the snapshot, report their readme files'''
+        self._visited.release(rel)
+        entry = self.folders.pop(rel, None)
+        if entry is None:
+            return
+        _, readmes, subfolders = entry
+        path = self._path(rel)
+        changes.removed.extend(os.path.join(path, name)
+                               for name in self._included(rel, readmes))
+        for name in self._subfolders(rel, subfolders):
+            self._forget(os.path.join(rel, name), changes)
+
+    def _check(self, rel: str, changes: ReadmeChanges) -> None:
+        path = self._path(rel)
+        old = self.folders.get(rel)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._forget(rel, changes)
+            return
+        except OSError as e:
+            logger.warning(f"Unable to check {path}: {e}")
+            return
+        if self.profile.follow_symlinks and not self._visited.first_visit(rel, st):
+            return      # reached before through another link, or a loop
+        mtime = st.st_mtime_ns
+        if old is not None and old[0] == mtime:
+            return
+
+        readmes, subfolders = list_folder(path, self.profile.follow_symlinks)
+        readmes = [sys.intern(name) for name in readmes]
+        subfolders = [sys.intern(name) for name in subfolders]
+        self.folders[rel] = (mtime, readmes, subfolders)
+        old_readmes, old_subfolders = (set(), set()) if old is None else (
+            self._included(rel, old[1]), self._subfolders(rel, old[2]))
+        new_readmes = self._included(rel, readmes)
+        new_subfolders = self._subfolders(rel, subfolders)
+
+        if not self._building:
+            changes.touched_folders.add(path)
+            changes.added.extend(os.path.join(path, name)
+                                 for name in sorted(new_readmes - old_readmes))
+            changes.removed.extend(os.path.join(path, name)
+                                   for name in sorted(old_readmes - new_readmes))
+        for name in old_subfolders - new_subfolders:
+            self._forget(os.path.join(rel, name), changes)
+        # new folders are listed first, in this poll if the budget allows it
+        for name in sorted(new_subfolders - old_subfolders, reverse=True):
+            self._pending.appendleft((os.path.join(rel, name), True))
+
+    def poll(self) -> ReadmeChanges:
+        '''Check the next `budget` folders of the sweep, start a new sweep when
+           the previous one is complete. Return the changes found.
+        '''
+        changes = ReadmeChanges()
+        if not self._pending:
+            self._pending.extend((rel, False) for rel in self.folders)
+            if not self._pending:       # the work folder did not exist (yet)
+                self._pending.append(('', True))
+        for _ in range(self.budget):
+            rel, new = self._pending.popleft()
+            if new or rel in self.folders:     # skip folders removed earlier in the sweep
+                self._check(rel, changes)
+            if not self._pending:
+                self.sweeps += 1
+                self._building = False
+                break
+        return changes
+
+
+class PollingWatcher:
+    '''Poll a work folder for changes to readme files in a background thread,
+       every `interval` seconds. Same interface as the ReadmeWatcher: the
+       changes are put on the `changes` queue, to be applied by the GUI.
+    '''
+
+    def __init__(self, folder: Path, profile: ScanProfile | None = None,
+                 cache: ScanCache | None = None, interval: float = DEFAULT_INTERVAL,
+                 budget: int = DEFAULT_BUDGET):
+        if cache is not None and cache.folders:
+            self.detector = PollingChangeDetector.from_cache(cache, profile, budget)
+        else:
+            self.detector = PollingChangeDetector(folder, profile, budget=budget)
+        self.folder = folder
+        self.interval = interval
+        self.changes: queue.Queue[ReadmeChanges] = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Polling {self.folder} for changes every {self.interval} seconds")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            changes = self.detector.poll()
+            if changes:
+                logger.info(f"Readme files changed: {len(changes.added)} added, "
+                            f"{len(changes.removed)} removed")
+                self.changes.put(changes)
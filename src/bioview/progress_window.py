@@ -10,12 +10,14 @@ SPINNER = files('animations').joinpath('spinner_earth_50x50.gif')
 class ProgressPopup(tk.Toplevel):
     progress_text = ""
     elapsed = 0  # Time elapsed in seconds
+    stats = None  # Optional ScanStats of a running scan
 
-    def __init__(self, parent):
+    def __init__(self, parent, on_cancel=None):
         super().__init__(parent)
         self.title("Scanning")
-        self.geometry("350x100")
+        self.geometry("350x100" if on_cancel is None else "350x130")
         self.resizable(False, False)
+        self.on_cancel = on_cancel
 
         # Create a frame to hold the canvas and text widget
         self.frame = ttk.Frame(self)
@@ -24,27 +26,41 @@ class ProgressPopup(tk.Toplevel):
         self.canvas = tk.Canvas(self.frame, width=50, height=50)
         self.canvas.grid(row=0, column=0, padx=10)
 
-        self.text = tk.Text(self.frame, width=30, height=2, wrap=tk.CHAR,
+        self.text = tk.Text(self.frame, width=30, height=3, wrap=tk.CHAR,
                             state=tk.DISABLED, bg=self.cget('bg'), relief='flat', borderwidth=0)
         self.text.grid(row=0, column=1, sticky=tk.W)
 
         self.text.config(state=tk.NORMAL)
         self.text.config(state=tk.DISABLED)
 
+        if on_cancel is not None:
+            self.cancel_button = ttk.Button(self.frame, text="Cancel", command=self.cancel)
+            self.cancel_button.grid(row=1, column=1, sticky=tk.E, padx=10)
+            self.protocol("WM_DELETE_WINDOW", self.cancel)
+
         self.frames = [tk.PhotoImage(file=SPINNER,
                                      format='gif -index %i' % i) for i in range(62)]
         self.current_frame = 0
         self.animation_running = False
 
+    def show_stats(self, stats) -> None:
+        '''Show the progress counters of a scan instead of only the elapsed time'''
+        self.stats = stats
+
     def start_animation(self):
         self.elapsed = 0
         self.animation_running = True
         self.update_animation()
         self.update_progress()
 
-    def stop_animation(self):
+    def cancel(self):
+        '''Ask the running task to stop; the popup closes when it has stopped'''
+        self.cancel_button.config(state=tk.DISABLED)
+        self.on_cancel()
+
+    def stop_animation(self, text: str = "Done!"):
         self.animation_running = False
-        self.update_text("Done!")
+        self.update_text(text)
         self.text.config(state=tk.DISABLED)
 
         self.after(1000, self.destroy)
@@ -64,6 +80,12 @@ class ProgressPopup(tk.Toplevel):
     def update_progress(self):
         if self.animation_running:
             # Update the text or any other progress indicator here
+            if self.stats is not None:
+                self.update_text(f"Folders visited: {self.stats.folders}\n"
+                                 f"Readme files found: {self.stats.readmes}\n"
+                                 f"{self.stats.rate:.0f} folders per second")
+                self.after(250, self.update_progress)
+                return
             self.update_text(f"Scanning...\nTime elapsed: {self.elapsed} seconds")
             self.after(1000, self.update_progress)
             self.elapsed += 1
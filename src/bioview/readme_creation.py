@@ -1,33 +1,21 @@
-from datetime import date
-from enum import Enum
-from importlib.resources import files
 import logging
-import os
 from pathlib import Path
-from tkinter import Menu, filedialog
-from typing import TextIO
-from bioview.config import Config
+import queue
+import threading
+from tkinter import Menu, filedialog, messagebox
+from bioview.dir_listing_cache import get_listing_cache
 from bioview.dirtree import DirTree
+from bioview.readme_writer import ReadmeContent, create_readme_file
 
-
-class ReadmeContent(Enum):
-    EMPTY = 1
-    WITH_FILE_LIST = 2
-    TEMPLATE = 3
-    TEMPLATE_WITH_FILE_LIST = 4
-
+CREATE_POLL_MS = 50
 
 logger = logging.getLogger(__name__)
-config = Config(WorkFolder=Path.home())
 
 
 class ReadmeCreator:
     def __init__(self, directory_tree: DirTree):
         self.dir_tree = directory_tree
 
-    def create_file_list(self, folder: Path) -> list[Path]:
-        return folder.iterdir()
-
     def create_readme_context_menu(self):
         # Create the create-readme context menu
         self.context_menu = Menu(self.dir_tree.treeview, tearoff=0)
@@ -62,41 +50,40 @@ class ReadmeCreator:
 
         return Path(file.name)
 
-    def write_header(self, file: TextIO) -> None:
-        user = os.getlogin()
-        file.write(f"This {file.name} file was generated on {
-            date.today().strftime('%Y-%m-%d')} by {user}\n\n")
-
-    def write_file_list(self, file: TextIO, file_list: list[Path]) -> None:
-        for f in file_list:
-            file.write(f"{f.name}\n")
-        file.write("\n")
-
-    def copy_from_template(self, file: TextIO, file_list: list[Path]):
-        template_name = files('animations').joinpath(config.active_template)
-        with open(template_name, 'r') as template:
-            template_content = template.readlines()
-            for line in template_content:
-                file.write(f"{line}")
-                if line.lower().startswith('file list'):
-                    self.write_file_list(file, file_list)
-
     def create_readme(self, content: ReadmeContent) -> None:
+        '''Write the readme file in a background thread; listing a folder with
+           many files for the file list can take a while
+        '''
         file_path = self.init_readme_file()
         if not file_path:
             return
 
-        file_list = []
-        if content in [ReadmeContent.WITH_FILE_LIST, ReadmeContent.TEMPLATE_WITH_FILE_LIST]:
-            file_list = self.create_file_list(self.dir_tree.get_selected_path())
-
-        with open(file_path, 'w') as file:
-            self.write_header(file)
-            if content in [ReadmeContent.TEMPLATE, ReadmeContent.TEMPLATE_WITH_FILE_LIST]:
-                self.copy_from_template(file, file_list)
-            elif content == ReadmeContent.WITH_FILE_LIST:
-                self.write_file_list(file, file_list)
-
+        folder = self.dir_tree.get_selected_path()
         folder_id = self.dir_tree.get_selected_id()
+        result = queue.Queue()
+
+        def write() -> None:
+            try:
+                create_readme_file(file_path, content, folder, mode='w')
+                result.put(None)
+            except Exception as e:
+                result.put(e)
+
+        threading.Thread(target=write, daemon=True).start()
+        self.dir_tree.treeview.after(CREATE_POLL_MS, self._readme_created,
+                                     result, file_path, folder_id)
+
+    def _readme_created(self, result: queue.Queue, file_path: Path, folder_id: str) -> None:
+        try:
+            error = result.get_nowait()
+        except queue.Empty:
+            self.dir_tree.treeview.after(CREATE_POLL_MS, self._readme_created,
+                                         result, file_path, folder_id)
+            return
+        get_listing_cache().invalidate(file_path.parent)
+        if error is not None:
+            logger.warning(f"Unable to create {file_path}: {error}")
+            messagebox.showerror("Create README", f"Unable to create {file_path}:\n{error}")
+            return
         self.dir_tree.insert_item(file_path.name, file_path, folder_id, position=0)
         logger.info(f"{file_path.name} created at {file_path}")
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+import hashlib
+import logging
+from pathlib import Path
+import sqlite3
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS readme (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    encoding TEXT,
+    hash TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+'''
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+@dataclass
+class ReadmeRecord:
+    path: str
+    size: int | None
+    mtime: float | None
+    encoding: str | None
+    hash: str | None
+
+
+class ReadmeIndex:
+    '''On-disk index of the readme files of a project, stored in SQLite.
+       It holds the path of every readme file, and once a file has been read,
+       also its size, modification time, encoding and content hash.
+
+       The index is kept next to the list file (all_readme_files.lst) and
+       imports the list file whenever the list file changed, for instance
+       after a scan. Opening the index does not read the list file otherwise.
+       A connection can only be used by the thread that opened the index.
+    '''
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    @staticmethod
+    def index_file_for(list_file: Path) -> Path:
+        return list_file.with_suffix('.db')
+
+    @classmethod
+    def open_for(cls, list_file: Path) -> 'ReadmeIndex':
+        '''Open the index of a list file, importing the list file when
+           the index does not have its latest version.
+        '''
+        index = cls(cls.index_file_for(list_file))
+        index.sync_with_list_file(list_file)
+        return index
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'ReadmeIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _get_meta(self, key: str) -> str | None:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def sync_with_list_file(self, list_file: Path) -> bool:
+        '''Import the list file if it changed since the last import.
+           Return True if the list file was imported.
+        '''
+        try:
+            list_mtime = str(list_file.stat().st_mtime_ns)
+        except OSError:
+            return False
+        if self._get_meta('list_mtime') == list_mtime:
+            return False
+
+        logger.info(f"Importing {list_file} into {self.db_file}")
+        with open(list_file, 'r') as file:
+            self.replace_all(line.rstrip('\n') for line in file if line.strip())
+        with self.connection:
+            self._set_meta('list_mtime', list_mtime)
+        return True
+
+    def count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM readme').fetchone()[0]
+
+    def paths(self) -> Iterator[str]:
+        '''Iterate over all readme paths in sorted order'''
+        for (path,) in self.connection.execute('SELECT path FROM readme ORDER BY path'):
+            yield path
+
+    def get(self, path: str) -> ReadmeRecord | None:
+        row = self.connection.execute(
+            'SELECT path, size, mtime, encoding, hash FROM readme WHERE path = ?',
+            (path,)).fetchone()
+        return ReadmeRecord(*row) if row else None
+
+    def replace_all(self, paths: Iterable[str]) -> None:
+        '''Replace the set of readme files; the information of files that
+           are already in the index is kept.
+        '''
+        with self.connection:
+            self.connection.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS scanned (path TEXT PRIMARY KEY) WITHOUT ROWID')
+            self.connection.execute('DELETE FROM scanned')
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO scanned (path) VALUES (?)', ((p,) for p in paths))
+            self.connection.execute(
+                'DELETE FROM readme WHERE path NOT IN (SELECT path FROM scanned)')
+            self.connection.execute(
+                'INSERT OR IGNORE INTO readme (path) SELECT path FROM scanned')
+            self.connection.execute('DELETE FROM scanned')
+
+    def add(self, paths: Iterable[str]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO readme (path) VALUES (?)', ((p,) for p in paths))
+
+    def remove(self, paths: Iterable[str]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM readme WHERE path = ?', ((p,) for p in paths))
+
+    def record_content(self, path: str, size: int, mtime: float,
+                       encoding: str | None, digest: str) -> None:
+        '''Store the information found when reading a readme file'''
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO readme (path, size, mtime, encoding, hash) '
+                'VALUES (?, ?, ?, ?, ?)', (path, size, mtime, encoding, digest))
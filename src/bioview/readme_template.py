@@ -0,0 +1,223 @@
+'''Readme templates with placeholders, like {{date}} or {{file_list}}.
+
+   A template is parsed once into its text and placeholders, and parsed again only
+   when the template file changes. The file list is streamed: the folder is listed
+   with a single scandir into sorted runs of at most SORT_WINDOW files, kept in
+   spooled temporary files, and the runs are merged while the list is written.
+   A folder with very many files is therefore never held in memory as a whole.
+'''
+from dataclasses import dataclass, field
+from datetime import datetime
+import functools
+import heapq
+from importlib.resources import files
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import Callable, Iterable, Iterator, TextIO
+from bioview.config import get_config
+from bioview.datasets import dataset_extensions, describe, group_datasets, split_name
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+FILE_LIST = 'file_list'
+# Templates without a {{file_list}} get the file list after the line starting with this
+LEGACY_FILE_LIST = 'file list'
+PLACEHOLDERS = {
+    'date': 'the date of today',
+    'user': 'the login name of the user',
+    'folder': 'the path of the folder',
+    'folder_name': 'the name of the folder',
+    FILE_LIST: 'a line per subfolder and dataset, with its size and date',
+    'file_count': 'the number of files in the folder',
+    'total_size': 'the size of the files in the folder',
+    'date_range': 'the dates of the oldest and newest file in the folder',
+}
+DATE_FORMAT = '%Y-%m-%d'
+SIZE_UNITS = ['bytes', 'kB', 'MB', 'GB', 'TB']
+SORT_WINDOW = 10000         # files sorted in memory at once
+SPOOL_SIZE = 1 << 20        # a sorted run moves from memory to disk above this size
+
+# A listed entry: (0 for a folder or 1 for a file, lower case stem, name, size, mtime_ns)
+Record = tuple[int, str, str, int, int]
+
+logger = logging.getLogger(__name__)
+
+
+class Template:
+    '''A parsed template: the literal text and the placeholders, in order'''
+
+    def __init__(self, text: str):
+        self.parts: list[tuple[str, bool]] = []     # (text or placeholder name, is placeholder)
+        has_file_list = any(match.group(1) == FILE_LIST for match in PLACEHOLDER.finditer(text))
+        for line in text.splitlines(keepends=True):
+            start = 0
+            for match in PLACEHOLDER.finditer(line):
+                self._add_text(line[start:match.start()])
+                if match.group(1) in PLACEHOLDERS:
+                    self.parts.append((match.group(1), True))
+                else:
+                    logger.warning(f"Unknown placeholder {match.group(0)} in template")
+                    self._add_text(match.group(0))
+                start = match.end()
+            self._add_text(line[start:])
+            if not has_file_list and line.lower().startswith(LEGACY_FILE_LIST):
+                self.parts.append((FILE_LIST, True))
+                self._add_text('\n')
+
+    def _add_text(self, text: str) -> None:
+        if text:
+            self.parts.append((text, False))
+
+    @property
+    def placeholders(self) -> set[str]:
+        return {text for text, is_placeholder in self.parts if is_placeholder}
+
+    def render(self, file: TextIO,
+               values: dict[str, str | Callable[[TextIO], None]]) -> None:
+        '''Write the template; a value can be a function that writes itself to the file.
+           Placeholders without a value are left out.
+        '''
+        for text, is_placeholder in self.parts:
+            if not is_placeholder:
+                file.write(text)
+                continue
+            value = values.get(text)
+            if callable(value):
+                value(file)
+            elif value is not None:
+                file.write(value)
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_template_file(path: str, mtime_ns: int) -> Template:
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        return Template(file.read())
+
+
+def load_template(template_name: str | None = None) -> Template:
+    '''The parsed template, by default the active template'''
+    path = files('animations').joinpath(template_name or get_config().active_template)
+    return _parse_template_file(str(path), os.stat(path).st_mtime_ns)
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in SIZE_UNITS[:-1]:
+        if value < 1000:
+            break
+        value /= 1000
+    else:
+        unit = SIZE_UNITS[-1]
+    return f"{size} bytes" if unit == 'bytes' else f"{value:.1f} {unit}"
+
+
+def format_date(mtime_ns: int) -> str:
+    return datetime.fromtimestamp(mtime_ns / 1e9).strftime(DATE_FORMAT)
+
+
+@dataclass
+class FolderListing:
+    '''The entries of a folder, from `list_folder`: the totals of the files, and the
+       entries in sorted runs. Close it to remove the temporary files.
+    '''
+    folder: Path
+    file_count: int = 0
+    total_size: int = 0
+    oldest_ns: int | None = None
+    newest_ns: int | None = None
+    runs: list[tempfile.SpooledTemporaryFile] = field(default_factory=list)
+
+    def __enter__(self) -> 'FolderListing':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for run in self.runs:
+            run.close()
+        self.runs = []
+
+    @property
+    def date_range(self) -> str:
+        if self.oldest_ns is None:
+            return ''
+        oldest, newest = format_date(self.oldest_ns), format_date(self.newest_ns)
+        return oldest if oldest == newest else f"{oldest} to {newest}"
+
+    def _add_run(self, records: list[Record]) -> None:
+        run = tempfile.SpooledTemporaryFile(SPOOL_SIZE, mode='w+', encoding='utf-8')
+        for record in sorted(records):
+            run.write(json.dumps(record) + '\n')
+        self.runs.append(run)
+
+    def _read_run(self, run: tempfile.SpooledTemporaryFile) -> Iterator[Record]:
+        run.seek(0)
+        for line in run:
+            yield tuple(json.loads(line))
+
+    def records(self) -> Iterator[Record]:
+        '''The entries sorted on (folders first, stem, name), merged from the runs'''
+        return heapq.merge(*(self._read_run(run) for run in self.runs))
+
+
+def list_folder(folder: Path, exclude: Iterable[str] = ()) -> FolderListing:
+    '''List the folder with a single scandir, keeping at most SORT_WINDOW entries
+       in memory. Raises OSError when the folder cannot be listed.
+    '''
+    exclude = set(exclude)
+    extensions = dataset_extensions()
+    listing = FolderListing(folder)
+    window: list[Record] = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name in exclude:
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                    st = None if is_dir else entry.stat()
+                    size, mtime_ns = (0, 0) if st is None else (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    is_dir, size, mtime_ns = False, 0, 0
+                if is_dir:
+                    window.append((0, entry.name.lower(), entry.name, 0, 0))
+                else:
+                    stem, _ = split_name(entry.name, extensions)
+                    window.append((1, stem.lower(), entry.name, size, mtime_ns))
+                    listing.file_count += 1
+                    listing.total_size += size
+                    if mtime_ns:
+                        listing.oldest_ns = min(listing.oldest_ns or mtime_ns, mtime_ns)
+                        listing.newest_ns = max(listing.newest_ns or mtime_ns, mtime_ns)
+                if len(window) >= SORT_WINDOW:
+                    listing._add_run(window)
+                    window = []
+        if window:
+            listing._add_run(window)
+    except BaseException:
+        listing.close()
+        raise
+    return listing
+
+
+def write_listing(file: TextIO, listing: FolderListing) -> None:
+    '''Write a line per subfolder and per dataset, with the size and the date of the
+       latest change. The files with the same stem follow each other in the sorted
+       runs, so the datasets are grouped per stem.
+    '''
+    for (kind, _), records in itertools.groupby(listing.records(), key=lambda r: r[:2]):
+        if kind == 0:
+            for record in records:
+                file.write(f"{record[2]}/\n")
+            continue
+        stats = {name: (size, mtime_ns) for _, _, name, size, mtime_ns in records}
+        for dataset in group_datasets(stats):
+            size = sum(stats[name][0] for name in dataset.files)
+            newest = max(stats[name][1] for name in dataset.files)
+            line = f"{describe(dataset)}  {format_size(size)}"
+            file.write(f"{line}  {format_date(newest)}\n" if newest else f"{line}\n")
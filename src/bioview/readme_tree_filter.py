@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+from typing import Iterable
+
+
+class ReadmeTreeFilter:
+    '''The part of the directory tree shown in the readme-only view: the readme
+       files and the folders that have a readme file somewhere below them.
+       It is computed from the list of readme files, the disk is not read.
+       Per folder it keeps the number of readme files below it (the ancestor set)
+       and the names of the children to show, so a folder is listed in constant time.
+    '''
+
+    def __init__(self, root: Path, readmes: Iterable[str] = ()):
+        self.root = str(root)
+        self._prefix = os.path.join(self.root, '')
+        self.readme_count: dict[str, int] = {}
+        self.children: dict[str, dict[str, bool]] = {}
+        self.add(readmes)
+
+    def __contains__(self, folder: Path | str) -> bool:
+        '''Check if the folder has readme files below it'''
+        return str(folder) in self.readme_count
+
+    def entries(self, folder: Path | str) -> list[tuple[str, bool]]:
+        '''The name of every child to show in the folder and whether it is a folder, sorted'''
+        return sorted(self.children.get(str(folder), {}).items())
+
+    def add(self, readmes: Iterable[str]) -> None:
+        for path in readmes:
+            if not path.startswith(self._prefix):
+                continue
+            folder, name = os.path.split(path)
+            siblings = self.children.setdefault(folder, {})
+            if name in siblings:
+                continue
+            siblings[name] = False
+            while True:
+                self.readme_count[folder] = self.readme_count.get(folder, 0) + 1
+                parent, name = os.path.split(folder)
+                if folder == self.root or parent == folder:
+                    break
+                self.children.setdefault(parent, {})[name] = True
+                folder = parent
+
+    def remove(self, readmes: Iterable[str]) -> None:
+        for path in readmes:
+            folder, name = os.path.split(path)
+            siblings = self.children.get(folder, {})
+            if siblings.get(name) is not False:
+                continue        # not a known readme file
+            del siblings[name]
+            while True:
+                count = self.readme_count.pop(folder) - 1
+                parent, name = os.path.split(folder)
+                if count:
+                    self.readme_count[folder] = count
+                else:
+                    self.children.pop(folder, None)
+                    if folder != self.root and parent != folder:
+                        self.children[parent].pop(name, None)
+                if folder == self.root or parent == folder:
+                    break
+                folder = parent
@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+import logging
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from bioview.config import ScanProfile
+from bioview.scan_readmefiles import find_readme_files, is_readme_name
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReadmeChanges:
+    '''Net changes to the readme files of a project after a burst of events.
+       Readme files in removed folders are not listed separately. Removals
+       are applied before additions: a folder that is removed and created
+       again is first removed and then added with the readme files it has now.
+    '''
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    removed_folders: list[str] = field(default_factory=list)
+    touched_folders: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.removed_folders)
+
+    def is_removed(self, path: str) -> bool:
+        '''Check if path is removed, directly or because its folder is removed'''
+        return path in self.removed or any(
+            path.startswith(os.path.join(folder, '')) for folder in self.removed_folders)
+
+
+class ChangeCoalescer:
+    '''Combine bursts of file system events, like the events of copying a whole
+       folder, into one set of changes. The changes are ready when no events
+       arrived for `quiet` seconds, or when the first pending event is older
+       than `max_delay` seconds.
+       Only the last state of a readme file counts: a readme file that is
+       created and deleted again within a burst is reported as removed. Created
+       and moved folders are scanned for readme files when the changes are
+       collected.
+    '''
+
+    def __init__(self, quiet: float = 0.5, max_delay: float = 5.0):
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self._reset()
+
+    def _reset(self) -> None:
+        self._exists: dict[str, bool] = {}
+        self._new_folders: set[str] = set()
+        self._removed_folders: set[str] = set()
+        self._touched: set[str] = set()
+        self.first_event = self.last_event = None
+
+    def _event(self) -> None:
+        now = time.monotonic()
+        self.last_event = now
+        if self.first_event is None:
+            self.first_event = now
+
+    def created(self, path: str, is_directory: bool) -> None:
+        self._event()
+        self._touched.add(os.path.dirname(path))
+        if is_directory:
+            self._new_folders.add(path)
+        elif is_readme_name(os.path.basename(path)):
+            self._exists[path] = True
+
+    def deleted(self, path: str, is_directory: bool) -> None:
+        self._event()
+        self._touched.add(os.path.dirname(path))
+        if is_directory:
+            self._new_folders.discard(path)
+            self._removed_folders.add(path)
+            self._touched.add(path)
+        elif is_readme_name(os.path.basename(path)):
+            self._exists[path] = False
+
+    def moved(self, src: str, dest: str, is_directory: bool) -> None:
+        self.deleted(src, is_directory)
+        self.created(dest, is_directory)
+
+    def ready(self, now: float | None = None) -> bool:
+        if self.first_event is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.last_event >= self.quiet or now - self.first_event >= self.max_delay
+
+    def collect(self, profile: ScanProfile | None = None) -> ReadmeChanges:
+        '''Return the pending changes and start a new burst'''
+        changes = ReadmeChanges(removed_folders=sorted(self._removed_folders),
+                                touched_folders=self._touched)
+        for path, exists in self._exists.items():
+            (changes.added if exists else changes.removed).append(path)
+        for folder in sorted(self._new_folders):
+            changes.added.extend(find_readme_files(Path(folder), profile=profile))
+            changes.touched_folders.add(folder)
+        self._reset()
+        return changes
+
+
+class ReadmeWatcher:
+    '''Watch a work folder for changes to readme files with watchdog.
+
+       Events are filtered on readme file names (folder events are all kept,
+       because they affect the readme files inside) and on the exclude rules
+       of the scan profile. Bursts of events are combined by a ChangeCoalescer;
+       the resulting ReadmeChanges are put on the `changes` queue, to be
+       applied by the GUI.
+    '''
+
+    def __init__(self, folder: Path, profile: ScanProfile | None = None,
+                 quiet: float = 0.5, max_delay: float = 5.0):
+        self.folder = folder
+        self.profile = profile or ScanProfile(exclude=[])
+        self.coalescer = ChangeCoalescer(quiet, max_delay)
+        self.changes: queue.Queue[ReadmeChanges] = queue.Queue()
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def is_excluded(self, path: str) -> bool:
+        try:
+            parts = Path(path).relative_to(self.folder).parts
+        except ValueError:
+            return True
+        rel = ''
+        for part in parts:
+            rel = os.path.join(rel, part)
+            if self.profile.is_excluded(part, rel):
+                return True
+        return False
+
+    def start(self) -> None:
+        # watchdog is only needed when watching, so it is imported here
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ('created', 'deleted', 'moved'):
+                    watcher._on_event(event.event_type, event.src_path,
+                                      getattr(event, 'dest_path', ''), event.is_directory)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), path=str(self.folder), recursive=True)
+        self._observer.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.folder} for changes")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    def _on_event(self, event_type: str, src: str, dest: str, is_directory: bool) -> None:
+        '''Called in the observer thread: keep only events that may change readme files'''
+        src, dest = os.fsdecode(src), os.fsdecode(dest)
+        if not is_directory and not (is_readme_name(os.path.basename(src))
+                                     or is_readme_name(os.path.basename(dest))):
+            return
+        self._events.put((event_type, src, dest, is_directory))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._handle(*self._events.get(timeout=0.1))
+            except queue.Empty:
+                pass
+            # Also checked after every event: under a steady stream of events the
+            # get never times out, and max_delay must still be kept
+            if self.coalescer.ready():
+                self._publish()
+
+    def _handle(self, event_type: str, src: str, dest: str, is_directory: bool) -> None:
+        if event_type == 'moved':
+            if self.is_excluded(src):
+                event_type, src = 'created', dest
+            elif self.is_excluded(dest):
+                event_type = 'deleted'
+        if self.is_excluded(src):
+            return
+        if event_type == 'created':
+            self.coalescer.created(src, is_directory)
+        elif event_type == 'deleted':
+            self.coalescer.deleted(src, is_directory)
+        else:
+            self.coalescer.moved(src, dest, is_directory)
+
+    def _publish(self) -> None:
+        changes = self.coalescer.collect(self.profile)
+        if changes:
+            logger.info(f"Readme files changed: {len(changes.added)} added, "
+                        f"{len(changes.removed)} removed, "
+                        f"{len(changes.removed_folders)} folders removed")
+            self.changes.put(changes)
@@ -0,0 +1,205 @@
+'''Writing new readme files, without a user interface: used by the readme creation
+   in the directory tree, and to generate readme files for many folders at once.
+'''
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+import getpass
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Callable, Iterable, TextIO
+from bioview.config import ScanProfile
+from bioview.dir_listing_cache import get_listing_cache
+from bioview.doc_coverage import is_ignored
+from bioview.readme_template import (DATE_FORMAT, FILE_LIST, FolderListing, Template,
+                                     format_size, list_folder, load_template, write_listing)
+from bioview.scan_readmefiles import (DEFAULT_JOBS, VisitedFolders, WorkStealingWalker,
+                                      is_readme_name)
+
+README_NAME = 'readme.txt'
+
+logger = logging.getLogger(__name__)
+
+
+class ReadmeContent(Enum):
+    EMPTY = 1
+    WITH_FILE_LIST = 2
+    TEMPLATE = 3
+    TEMPLATE_WITH_FILE_LIST = 4
+
+
+@dataclass
+class GenerateResult:
+    folder: str
+    readme: str
+    status: str             # 'created', 'exists', 'would create' or 'error'
+    error: str | None = None
+
+
+def current_user() -> str:
+    '''The login name; also without a terminal, like in a cron job'''
+    try:
+        return os.getlogin()
+    except OSError:
+        return getpass.getuser()
+
+
+def write_header(file: TextIO) -> None:
+    file.write(f"This {file.name} file was generated on {
+        date.today().strftime(DATE_FORMAT)} by {current_user()}\n\n")
+
+
+def template_values(folder: Path, listing: FolderListing | None = None) -> dict:
+    '''The values of the placeholders for a readme file in the folder; the file list
+       and its totals only with a listing
+    '''
+    values = {'date': date.today().strftime(DATE_FORMAT), 'user': current_user(),
+              'folder': str(folder), 'folder_name': folder.name}
+    if listing is not None:
+        values.update({FILE_LIST: lambda file: write_listing(file, listing),
+                       'file_count': str(listing.file_count),
+                       'total_size': format_size(listing.total_size),
+                       'date_range': listing.date_range})
+    return values
+
+
+def write_readme(file: TextIO, content: ReadmeContent, folder: Path,
+                 listing: FolderListing | None = None,
+                 template: Template | None = None) -> None:
+    '''Write a readme file for the folder; the listing is needed for a file list'''
+    write_header(file)
+    if content in [ReadmeContent.TEMPLATE, ReadmeContent.TEMPLATE_WITH_FILE_LIST]:
+        (template or load_template()).render(file, template_values(folder, listing))
+    elif content == ReadmeContent.WITH_FILE_LIST and listing is not None:
+        write_listing(file, listing)
+        file.write("\n")
+
+
+def needs_file_list(content: ReadmeContent) -> bool:
+    return content in [ReadmeContent.WITH_FILE_LIST, ReadmeContent.TEMPLATE_WITH_FILE_LIST]
+
+
+def create_readme_file(readme: Path, content: ReadmeContent, folder: Path | None = None,
+                       template: Template | None = None, mode: str = 'x') -> None:
+    '''Write a readme file, listing the folder (by default the folder of the readme)
+       before the file is opened. Names that are not valid UTF-8 are written with
+       a question mark. When writing fails, the partly written readme file
+       is removed and the error is raised; FileExistsError in mode 'x' when the
+       readme file exists.
+    '''
+    folder = folder or readme.parent
+    listing = None
+    if needs_file_list(content):
+        listing = list_folder(folder, exclude=[readme.name])
+    try:
+        with open(readme, mode, encoding='utf-8', errors='replace') as file:
+            try:
+                write_readme(file, content, folder, listing, template)
+            except BaseException:
+                file.close()
+                os.remove(readme)
+                raise
+    finally:
+        if listing is not None:
+            listing.close()
+
+
+def generate_readme(folder: Path, content: ReadmeContent, template: Template | None = None,
+                    dry_run: bool = False) -> GenerateResult:
+    '''Create the readme file of one folder, unless the folder already has one.
+       The file is opened in exclusive mode, so a run never overwrites a readme file,
+       also not one created at the same moment by someone else.
+    '''
+    readme = folder / README_NAME
+    if dry_run:
+        return GenerateResult(str(folder), str(readme),
+                              'exists' if readme.exists() else 'would create')
+    try:
+        create_readme_file(readme, content, folder, template)
+    except FileExistsError:
+        return GenerateResult(str(folder), str(readme), 'exists')
+    except Exception as e:
+        logger.warning(f"Unable to create {readme}: {e}")
+        return GenerateResult(str(folder), str(readme), 'error', str(e))
+    get_listing_cache().invalidate(folder)
+    return GenerateResult(str(folder), str(readme), 'created')
+
+
+def generate_readmes(folders: Iterable[Path], content: ReadmeContent,
+                     template: Template | None = None, jobs: int = DEFAULT_JOBS,
+                     dry_run: bool = False,
+                     on_result: Callable[[GenerateResult], None] | None = None,
+                     cancel: threading.Event | None = None) -> list[GenerateResult]:
+    '''Create the readme files of many folders with `jobs` threads. The template is
+       parsed once. Running it again only creates the readme files that are still missing.
+       `on_result` is called with every result, in the order they finish.
+    '''
+    uses_template = content in [ReadmeContent.TEMPLATE, ReadmeContent.TEMPLATE_WITH_FILE_LIST]
+    if template is None and uses_template:
+        template = load_template()
+    results = []
+    with ThreadPoolExecutor(max(1, jobs)) as pool:
+        futures = [pool.submit(generate_readme, Path(folder), content, template, dry_run)
+                   for folder in folders]
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                for waiting in futures:
+                    waiting.cancel()
+            if future.cancelled():
+                continue
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    logger.info(f"Generated readme files: {counts}")
+    return results
+
+
+def folders_without_readme(root: Path, jobs: int = DEFAULT_JOBS,
+                           profile: ScanProfile | None = None,
+                           cancel: threading.Event | None = None) -> list[str]:
+    '''Return the folders below root that contain data files but no readme file, sorted'''
+    profile = profile or ScanProfile(exclude=[])
+    prefix_len = len(os.path.join(str(root), ''))
+    found = [[] for _ in range(max(1, jobs))]
+    visited = VisitedFolders()
+
+    def visit(item: tuple[str, int], worker: int) -> list[tuple[str, int]]:
+        path, depth = item
+        rel = path[prefix_len:]
+        if profile.follow_symlinks:
+            try:
+                if not visited.first_visit(path, os.stat(path)):
+                    return []
+            except OSError as e:
+                logger.warning(f"Unable to scan {path}: {e}")
+                return []
+        has_readme = has_data = False
+        subfolders = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if profile.is_excluded(entry.name, os.path.join(rel, entry.name)):
+                        continue
+                    if entry.is_dir(follow_symlinks=profile.follow_symlinks):
+                        subfolders.append(entry.name)
+                    elif is_readme_name(entry.name):
+                        has_readme = True
+                    elif not is_ignored(entry.name):
+                        has_data = True
+        except OSError as e:
+            logger.warning(f"Unable to scan {path}: {e}")
+        if has_data and not has_readme:
+            found[worker].append(path)
+        if profile.max_depth is not None and depth >= profile.max_depth:
+            return []
+        return [(os.path.join(path, name), depth + 1) for name in subfolders]
+
+    WorkStealingWalker(visit, jobs, cancel).run((str(root), 0))
+    return sorted(path for part in found for path in part)
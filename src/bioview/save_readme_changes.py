@@ -2,6 +2,9 @@ import datetime
 import logging
 import os
 from pathlib import Path
+import shutil
+import tempfile
+from bioview.backup_store import BackupStore
 
 log = logging.getLogger(__name__)
 
@@ -10,33 +13,41 @@ def needs_backup(filename: Path) -> bool:
     '''Check if the file needs a backup.
       A backup is needed if the last modification was not done today'''
     today = datetime.date.today()
-    backup_date = os.path.getmtime(filename)
+    try:
+        backup_date = os.path.getmtime(filename)
+    except FileNotFoundError:
+        return False
     backup_date = datetime.date.fromtimestamp(backup_date)
     return backup_date != today
 
 
-def rotate_backups_for(filename: Path) -> None:
-    log.info(f"Issued backup rotation for {filename}")
-    for i in range(4, 0, -1):
-        old_backup = filename.with_suffix(f'.txt.{i}')  # f"{filename}.{i}"
-        new_backup = filename.with_suffix(f'.txt.{i+1}')  # f"{filename}.{i+1}"
-        if i == 4 and os.path.exists(new_backup):
-            os.remove(new_backup)
-        if os.path.exists(old_backup):
-            os.rename(old_backup, new_backup)
-
-        # Turn current file into a new backup file with version number 1
-        backup_filename = filename.with_suffix('.txt.1')  # f"{filename}.1"
-        os.rename(filename, backup_filename)
-
-
-def save_readme_changes(filename: Path, text: str) -> None:
-    '''Save the changes to the readme file and create a backup
-      of the previous version.
-      Rename existing backup files by incrementing their version number'''
-    if needs_backup(filename):
-        rotate_backups_for(filename)
+def save_readme_changes(filename: Path, text: str, store: BackupStore | None = None) -> None:
+    '''Save the changes to the readme file. The first time the file is
+      changed on a day, the previous version is added to the backup store'''
+    if store is not None and needs_backup(filename):
+        log.info(f"Backup of {filename}")
+        store.backup(filename)
 
     # Save the current changes to the file
-    with open(filename, 'w', encoding='utf-8') as file:
-        file.write(text)
+    write_atomic(filename, text)
+
+
+def write_atomic(filename: Path, text: str) -> None:
+    '''Write the text to a temporary file next to the file, and rename it
+      over the file: the file is never left partly written'''
+    fd, temp = tempfile.mkstemp(prefix=f'.{filename.name}.', suffix='.tmp',
+                                dir=filename.parent)
+    try:
+        with open(fd, 'w', encoding='utf-8') as file:
+            file.write(text)
+        try:
+            shutil.copymode(filename, temp)
+        except FileNotFoundError:
+            pass
+        os.replace(temp, filename)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
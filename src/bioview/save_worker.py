@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import queue
+import threading
+from bioview.backup_store import BackupStore
+from bioview.save_readme_changes import save_readme_changes
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SaveResult:
+    filename: Path
+    error: str | None = None
+
+
+class SaveWorker:
+    '''Save readme files in a background thread, so the editor never waits for the disk.
+       Saves of a file that are still waiting are coalesced: only the latest text is
+       written. The outcome of every write is put in the `results` queue, to be
+       picked up by the Tk thread.
+    '''
+
+    def __init__(self):
+        self.results: queue.Queue[SaveResult] = queue.Queue()
+        self._pending: dict[Path, tuple[str, BackupStore | None]] = {}
+        self._writing: tuple[Path, str] | None = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, filename: Path, text: str, store: BackupStore | None = None) -> None:
+        with self._condition:
+            self._pending[filename] = (text, store)
+            self._condition.notify()
+
+    def pending_text(self, filename: Path) -> str | None:
+        '''The latest text of the file that is not written yet, None if there is none'''
+        with self._condition:
+            if filename in self._pending:
+                return self._pending[filename][0]
+            if self._writing is not None and self._writing[0] == filename:
+                return self._writing[1]
+            return None
+
+    @property
+    def busy(self) -> bool:
+        with self._condition:
+            return bool(self._pending) or self._writing is not None
+
+    def stop(self, timeout: float | None = None) -> None:
+        '''Write the waiting saves and stop the thread'''
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                filename = next(iter(self._pending))
+                text, store = self._pending.pop(filename)
+                self._writing = (filename, text)
+            try:
+                save_readme_changes(filename, text, store)
+                result = SaveResult(filename)
+            except OSError as e:
+                logger.error(f"Unable to save {filename}: {e}")
+                result = SaveResult(filename, str(e))
+            except Exception as e:
+                logger.exception(f"Unable to save {filename}: {e}")
+                result = SaveResult(filename, str(e) or type(e).__name__)
+            # The result first: when busy turns False, the result is in the queue
+            self.results.put(result)
+            with self._condition:
+                self._writing = None
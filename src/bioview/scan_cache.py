@@ -0,0 +1,63 @@
+import json
+import logging
+from pathlib import Path
+
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+# One entry per folder: the folder mtime (in ns), the names of the readme files
+# and the names of the subfolders found when the folder was last listed.
+CacheEntry = tuple[int, list[str], list[str]]
+
+
+class ScanCache:
+    '''Results of a previous scan per folder, used to rescan incrementally.
+       Folders are stored relative to the root folder of the scan, the root
+       folder itself has key ''. Symbolic links to folders are only listed as
+       subfolders when the scan follows them.
+    '''
+
+    def __init__(self, root: Path, folders: dict[str, CacheEntry] = None,
+                 follow_symlinks: bool = False):
+        self.root = root
+        self.folders = folders if folders is not None else {}
+        self.follow_symlinks = follow_symlinks
+
+    @staticmethod
+    def cache_file_for(list_file: Path) -> Path:
+        '''The cache is stored next to the list file'''
+        return list_file.with_suffix('.cache')
+
+    @classmethod
+    def load(cls, cache_file: Path, root: Path, follow_symlinks: bool = False) -> 'ScanCache':
+        '''Load the cache; return an empty cache if it does not exist,
+           cannot be read or belongs to a different root folder or symlink setting.
+        '''
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            if cache_file.exists():
+                logger.warning(f"Ignoring unreadable scan cache {cache_file}: {e}")
+            return cls(root, follow_symlinks=follow_symlinks)
+
+        if (data.get('version') != CACHE_VERSION or Path(data.get('root', '')) != root
+                or data.get('follow_symlinks', False) != follow_symlinks):
+            return cls(root, follow_symlinks=follow_symlinks)
+        folders = {rel: (mtime, readmes, subfolders)
+                   for rel, (mtime, readmes, subfolders) in data['folders'].items()}
+        return cls(root, folders, follow_symlinks)
+
+    def save(self, cache_file: Path) -> None:
+        data = {'version': CACHE_VERSION, 'root': str(self.root),
+                'follow_symlinks': self.follow_symlinks, 'folders': self.folders}
+        with open(cache_file, 'w', encoding='utf-8') as file:
+            json.dump(data, file, separators=(',', ':'))
+
+    def get(self, rel: str, mtime: int) -> CacheEntry | None:
+        '''Return the cached entry of a folder, only if the folder did not change'''
+        entry = self.folders.get(rel)
+        if entry is not None and entry[0] == mtime:
+            return entry
+        return None
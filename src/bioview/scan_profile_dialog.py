@@ -0,0 +1,57 @@
+import tkinter as tk
+from tkinter import ttk
+from bioview.config import ScanProfile
+
+
+class ScanProfileDialog(tk.Toplevel):
+    '''Modal dialog to edit the scan profile of a work folder.
+       After the dialog is closed, `result` holds the new profile,
+       or None if the dialog was cancelled.
+    '''
+    result: ScanProfile | None = None
+
+    def __init__(self, parent, folder, profile: ScanProfile):
+        super().__init__(parent)
+        self.title("Scan settings")
+        self.resizable(False, False)
+        self.transient(parent)
+
+        frame = ttk.Frame(self, padding=10)
+        frame.grid(row=0, column=0, sticky='nsew')
+
+        ttk.Label(frame, text=f"Scan settings for {folder}").grid(
+            row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 10))
+
+        ttk.Label(frame, text="Exclude (separate with ;)").grid(row=1, column=0, sticky=tk.W)
+        self.exclude = tk.StringVar(value='; '.join(profile.exclude))
+        ttk.Entry(frame, textvariable=self.exclude, width=50).grid(
+            row=1, column=1, sticky=tk.EW)
+
+        ttk.Label(frame, text="Maximum depth (empty: no limit)").grid(
+            row=2, column=0, sticky=tk.W)
+        self.max_depth = tk.StringVar(
+            value='' if profile.max_depth is None else str(profile.max_depth))
+        ttk.Spinbox(frame, from_=0, to=100, textvariable=self.max_depth, width=5).grid(
+            row=2, column=1, sticky=tk.W)
+
+        self.follow_symlinks = tk.BooleanVar(value=profile.follow_symlinks)
+        ttk.Checkbutton(frame, text="Follow symbolic links",
+                        variable=self.follow_symlinks).grid(row=3, column=1, sticky=tk.W)
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=4, column=0, columnspan=2, sticky=tk.E, pady=(10, 0))
+        ttk.Button(buttons, text="OK", command=self._ok).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Cancel", command=self.destroy).pack(side="left")
+
+        self.bind("<Return>", lambda event: self._ok())
+        self.bind("<Escape>", lambda event: self.destroy())
+        self.grab_set()
+        self.wait_window()
+
+    def _ok(self) -> None:
+        exclude = [p.strip() for p in self.exclude.get().split(';') if p.strip()]
+        depth = self.max_depth.get().strip()
+        self.result = ScanProfile(exclude=exclude,
+                                  max_depth=int(depth) if depth.isdigit() else None,
+                                  follow_symlinks=self.follow_symlinks.get())
+        self.destroy()
@@ -1,7 +1,289 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import logging
+import os
+import queue
+import sys
+import threading
+import time
 from pathlib import Path
+from timeit import timeit
+from typing import Any, Callable, Iterable, Iterator
+from bioview.config import ScanProfile
+from bioview.scan_cache import ScanCache
 
+README_PATTERN = '*readme*.txt'
+DEFAULT_JOBS = 8
 
-def scan_readme_files(folder: Path, output_file: Path, silent: bool = True) -> None:
+logger = logging.getLogger(__name__)
+
+
+def is_readme_name(name: str) -> bool:
+    '''Check if a file name is recognized as a readme file name.
+       Case sensitivity follows the platform, like `Path.glob`.
+    '''
+    return fnmatch.fnmatch(name, README_PATTERN)
+
+
+class VisitedFolders:
+    '''The folders reached in a walk that follows symbolic links to folders.
+       A folder can then be reached by several paths, and through a loop by an
+       endless number of them. It is identified by (st_dev, st_ino), and the
+       first path that reaches it owns it; other paths are not walked.
+       Can be used from several threads.
+    '''
+
+    def __init__(self):
+        self._owners: dict[tuple[int, int], str] = {}
+        self._keys: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def first_visit(self, path: str, st: os.stat_result) -> bool:
+        '''Return True unless the folder was reached before through another path'''
+        key = (st.st_dev, st.st_ino)
+        with self._lock:
+            owner = self._owners.setdefault(key, path)
+            if owner == path:
+                self._keys[path] = key
+            return owner == path
+
+    def release(self, path: str) -> None:
+        '''Forget the folder at path, for instance when it was removed'''
+        with self._lock:
+            key = self._keys.pop(path, None)
+            if key is not None:
+                del self._owners[key]
+
+
+class WorkStealingWalker:
+    '''Walk a directory tree with a pool of threads.
+
+       Every worker owns a deque of folders still to visit. It takes work from the
+       back of its own deque (depth first) and when it runs out, it steals from the
+       front of the deque of another worker: those are the folders closest to the
+       root, and usually the largest subtrees.
+       The `visit` callable lists a single folder and returns the subfolders
+       that need to be walked as well. It receives the index of the worker, so
+       results can be collected per worker without locking.
+       Folders can be passed as any object `visit` understands, for instance a
+       path together with its depth.
+       Setting the `cancel` event stops the walk after the folders being visited.
+    '''
+
+    def __init__(self, visit: Callable[[Any, int], Iterable[Any]], jobs: int = DEFAULT_JOBS,
+                 cancel: threading.Event | None = None):
+        self.visit = visit
+        self.jobs = max(1, jobs)
+        self.cancel = cancel or threading.Event()
+        self._queues = [deque() for _ in range(self.jobs)]
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def run(self, root: Any) -> None:
+        self._pending = 1
+        self._queues[0].append(root)
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            workers = [pool.submit(self._work, index) for index in range(self.jobs)]
+        for worker in workers:
+            worker.result()     # re-raise errors from the workers
+
+    def _steal(self, index: int) -> Any | None:
+        for offset in range(1, self.jobs):
+            victim = self._queues[(index + offset) % self.jobs]
+            try:
+                return victim.popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _work(self, index: int) -> None:
+        own = self._queues[index]
+        while not self._done.is_set():
+            if self.cancel.is_set():
+                self._done.set()
+                break
+            try:
+                folder = own.pop()
+            except IndexError:
+                folder = self._steal(index)
+                if folder is None:
+                    self._done.wait(0.001)
+                    continue
+            try:
+                subfolders = list(self.visit(folder, index))
+            except BaseException:
+                self._done.set()    # do not leave the other workers waiting
+                raise
+            # register the new work before finishing the current folder,
+            # so the pending count only reaches zero when everything is done
+            with self._lock:
+                self._pending += len(subfolders) - 1
+                if self._pending == 0:
+                    self._done.set()
+            own.extend(subfolders)
+
+
+def list_folder(path: str, follow_symlinks: bool = False) -> tuple[list[str], list[str]]:
+    '''List a single folder. Return the names of the readme files
+       and the names of the subfolders in it.
+    '''
+    readmes, subfolders = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subfolders.append(entry.name)
+                elif is_readme_name(entry.name):
+                    readmes.append(entry.name)
+    except OSError as e:
+        logger.warning(f"Unable to scan {path}: {e}")
+    return readmes, subfolders
+
+
+class ScanStats:
+    '''Progress counters of a running scan, safe to read from another thread'''
+
+    def __init__(self):
+        self.folders = 0
+        self.readmes = 0
+        self.unchanged = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, readmes: int, unchanged: bool) -> None:
+        with self._lock:
+            self.folders += 1
+            self.readmes += readmes
+            self.unchanged += unchanged
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        '''The number of folders visited per second'''
+        return self.folders / max(self.elapsed, 1e-3)
+
+
+def _scan(folder: Path, jobs: int, cache: ScanCache | None, stats: ScanStats,
+          report: Callable[[list[str]], None], profile: ScanProfile | None = None,
+          cancel: threading.Event | None = None) -> None:
+    '''Walk the tree below folder and report the readme files per folder.
+       If a cache is passed, only folders with a changed modification time are
+       listed again, the results of the other folders are taken from the cache.
+       Afterwards the cache holds the results of this scan; when the scan is
+       cancelled, the folders not visited keep their previous results.
+
+       The profile excludes folders and files from the scan, limits the depth and
+       determines if symbolic links to folders are followed. Following links, every
+       folder is visited only once, identified by (st_dev, st_ino); this also
+       protects against loops.
+    '''
+    jobs = max(1, jobs)
+    profile = profile or ScanProfile(exclude=[])
+    root = str(folder)
+    prefix_len = len(os.path.join(root, ''))
+    listed = [{} for _ in range(jobs)]
+    visited = VisitedFolders()
+
+    def visit(item: tuple[str, int], worker: int) -> list[tuple[str, int]]:
+        path, depth = item
+        rel = path[prefix_len:]
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            logger.warning(f"Unable to scan {path}: {e}")
+            return []
+        if profile.follow_symlinks and not visited.first_visit(path, st):
+            logger.info(f"Skipping {path}: folder already visited")
+            return []
+
+        entry = cache.get(rel, st.st_mtime_ns) if cache is not None else None
+        unchanged = entry is not None
+        if not unchanged:
+            entry = (st.st_mtime_ns, *list_folder(path, profile.follow_symlinks))
+        listed[worker][rel] = entry
+
+        _, readmes, subfolders = entry
+        readmes = [os.path.join(path, name) for name in readmes
+                   if not profile.is_excluded(name, os.path.join(rel, name))]
+        stats.add(len(readmes), unchanged)
+        if readmes:
+            report(readmes)
+        if profile.max_depth is not None and depth >= profile.max_depth:
+            return []
+        return [(os.path.join(path, name), depth + 1) for name in subfolders
+                if not profile.is_excluded(name, os.path.join(rel, name))]
+
+    walker = WorkStealingWalker(visit, jobs, cancel)
+    walker.run((root, 0))
+
+    if cache is not None:
+        folders = {rel: entry for part in listed for rel, entry in part.items()}
+        if walker.cancel.is_set():
+            folders = {**cache.folders, **folders}
+        cache.folders = folders
+    logger.info(f"Scanned {stats.folders} folders, {stats.unchanged} unchanged, "
+                f"{stats.readmes} readme files in {stats.elapsed:.1f} seconds")
+
+
+def find_readme_files(folder: Path, jobs: int = DEFAULT_JOBS,
+                      cache: ScanCache | None = None,
+                      profile: ScanProfile | None = None) -> list[str]:
+    '''Find all readme files below folder, using `jobs` threads to list the folders.
+       The result is sorted to make it independent of the order of the scan.
+       See `_scan` for the use of the cache and the profile.
+    '''
+    found = []
+    _scan(folder, jobs, cache, ScanStats(), found.extend, profile)
+    return sorted(found)
+
+
+def iter_readme_batches(folder: Path, jobs: int = DEFAULT_JOBS,
+                        cache: ScanCache | None = None, stats: ScanStats | None = None,
+                        interval: float = 0.1, profile: ScanProfile | None = None,
+                        cancel: threading.Event | None = None) -> Iterator[list[str]]:
+    '''Find all readme files below folder, like `find_readme_files`, but yield
+       the readme files while the scan runs: in batches of the files found
+       during `interval` seconds. The files are not sorted.
+       Setting the cancel event stops the scan; the files found so far are
+       still yielded.
+    '''
+    found = queue.Queue()
+    errors = []
+
+    def run():
+        try:
+            _scan(folder, jobs, cache, stats or ScanStats(), found.put, profile, cancel)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            found.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    batch = []
+    deadline = time.monotonic() + interval
+    while (paths := found.get()) is not None:
+        batch.extend(paths)
+        if time.monotonic() >= deadline:
+            yield batch
+            batch = []
+            deadline = time.monotonic() + interval
+    if batch:
+        yield batch
+    if errors:
+        raise errors[0]
+
+
+def scan_readme_files(folder: Path, output_file: Path, silent: bool = True,
+                      jobs: int = DEFAULT_JOBS, incremental: bool = True,
+                      on_batch: Callable[[list[str]], None] | None = None,
+                      stats: ScanStats | None = None, profile: ScanProfile | None = None,
+                      cancel: threading.Event | None = None) -> bool:
     """
     Recursively scan for filenames that contain 'readme' and have a '.txt' extension
     starting at the folder passed as a parameter. The resulting list of files is
@@ -11,17 +293,66 @@ def scan_readme_files(folder: Path, output_file: Path, silent: bool = True) -> N
     :param output_file: The file to write the list of readme files to.
     :param silent: If True, no confirmation is asked and output file will be
       overwritten if it already exist. If False, a confirmation is asked if needed.
+    :param jobs: The number of threads used to list the folders.
+    :param incremental: If True, only the folders that changed since the previous
+      scan are listed again. The scan results per folder are stored next to the
+      output file.
+    :param on_batch: Called with every batch of readme files while the scan runs.
+    :param stats: Updated with the progress of the scan.
+    :param profile: Exclude rules, maximum depth and symlink handling of the scan.
+    :param cancel: Set this event to stop the scan. A cancelled scan does not
+      overwrite the output file, but still updates the cache.
+    :return: True if the scan completed and the output file was written.
     """
-    gen = folder.glob('**/*readme*.txt')
-    files = [str(file) for file in gen]
-
     if not silent:
         if output_file.exists():
             print(f"File {output_file} already exists. Overwrite? [y/n]")
             overwrite = input()
             if overwrite.lower() != 'y':
-                return
+                return False
+
+    follow_symlinks = profile.follow_symlinks if profile else False
+    cache_file = ScanCache.cache_file_for(output_file)
+    cache = (ScanCache.load(cache_file, folder, follow_symlinks) if incremental
+             else ScanCache(folder, follow_symlinks=follow_symlinks))
+    files = []
+    for batch in iter_readme_batches(folder, jobs, cache, stats, profile=profile,
+                                     cancel=cancel):
+        files.extend(batch)
+        if on_batch is not None:
+            on_batch(batch)
+    cache.save(cache_file)
+
+    if cancel is not None and cancel.is_set():
+        logger.info(f"Scan of {folder} cancelled, {output_file} is not updated")
+        return False
 
     with open(output_file, 'w') as file:
-        for f in files:
+        for f in sorted(files):
             file.write(f + '\n')
+    return True
+
+
+def glob_readme_files(folder: Path) -> list[str]:
+    '''The original serial scan, kept as reference for the benchmark.'''
+    return sorted(str(file) for file in folder.glob('**/' + README_PATTERN))
+
+
+def benchmark(folder: Path, jobs_list: Iterable[int] = (1, 4, 8, 16)) -> None:
+    '''Compare the serial glob scan with the parallel scan for a number of thread counts.'''
+    reference = glob_readme_files(folder)
+    st = timeit(lambda: glob_readme_files(folder), number=1)
+    print(f'glob: {st:.3f} seconds, {len(reference)} readme files')
+    for jobs in jobs_list:
+        result = []
+        st = timeit(lambda: result.extend(find_readme_files(folder, jobs)), number=1)
+        same = 'same' if result == reference else 'DIFFERENT'
+        print(f'scandir, {jobs} threads: {st:.3f} seconds, {same} result')
+    cache = ScanCache(folder)
+    find_readme_files(folder, max(jobs_list), cache)
+    st = timeit(lambda: find_readme_files(folder, max(jobs_list), cache), number=1)
+    print(f'incremental rescan, {max(jobs_list)} threads: {st:.3f} seconds')
+
+
+if __name__ == '__main__':
+    benchmark(Path(sys.argv[1]) if len(sys.argv) > 1 else Path.cwd())
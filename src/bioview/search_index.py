@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+from dataclasses import dataclass
+import itertools
+import logging
+import os
+from pathlib import Path
+import queue
+import re
+import sqlite3
+import threading
+from typing import Iterable
+from bioview.load_readme import read_file_contents
+
+BATCH_SIZE = 500        # files indexed per transaction
+MAX_RESULTS = 1000
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS readme_text USING fts5(
+    path UNINDEXED,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS readme_text_state (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    docid INTEGER
+) WITHOUT ROWID;
+'''
+
+
+def query_terms(text: str) -> list[str]:
+    '''Split the text typed in the search box in search terms'''
+    return re.findall(r'\w+', text)
+
+
+def to_fts_query(terms: list[str]) -> str:
+    '''All terms must occur in a readme file, each term also matches as prefix'''
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+@dataclass
+class SearchHit:
+    path: str
+    rank: float
+
+
+class SearchIndex:
+    '''Full text index of the contents of the readme files, using the FTS5
+       extension of SQLite. It is stored in the same database as the ReadmeIndex.
+
+       For every indexed file the mtime and size are kept; updating the index
+       only reads the files that changed since they were indexed.
+       Like the ReadmeIndex, an instance can only be used by the thread that
+       created it. The index is built by the SearchIndexer in a background
+       thread, while the GUI searches with its own instance.
+    '''
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM readme_text_state').fetchone()[0]
+
+    def _stale(self, path: str) -> tuple[os.stat_result | None, int | None]:
+        '''Return the status of the file if it is new or changed since it was indexed,
+           and the docid of its outdated entry, which is also returned for a file that
+           no longer exists. Only reads the database.
+        '''
+        row = self.connection.execute(
+            'SELECT mtime_ns, size, docid FROM readme_text_state WHERE path = ?',
+            (path,)).fetchone()
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, None if row is None else row[2]
+        if row is None:
+            return st, None
+        if row[:2] == (st.st_mtime_ns, st.st_size):
+            return None, None
+        return st, row[2]
+
+    @staticmethod
+    def _read(path: str) -> str | None:
+        try:
+            return read_file_contents(Path(path))
+        except OSError as e:
+            logger.warning(f"Unable to index {path}: {e}")
+            return None
+
+    def _add(self, path: str, st: os.stat_result, body: str) -> None:
+        docid = self.connection.execute(
+            'INSERT INTO readme_text (path, body) VALUES (?, ?)', (path, body)).lastrowid
+        self.connection.execute(
+            'INSERT INTO readme_text_state (path, mtime_ns, size, docid) VALUES (?, ?, ?, ?)',
+            (path, st.st_mtime_ns, st.st_size, docid))
+
+    def _remove(self, path: str, docid: int) -> None:
+        self.connection.execute('DELETE FROM readme_text WHERE rowid = ?', (docid,))
+        self.connection.execute('DELETE FROM readme_text_state WHERE path = ?', (path,))
+
+    def update_files(self, paths: Iterable[str],
+                     cancel: threading.Event | None = None, jobs: int = 1) -> None:
+        '''Index the files that are new or changed, and remove files that no longer exist.
+           With more than one job, the files are read by a pool of threads.
+           The files of a batch are read before its transaction starts, so the
+           database is only locked while the batch is written.
+        '''
+        paths = iter(paths)
+        with ThreadPoolExecutor(jobs) if jobs > 1 else contextlib.nullcontext() as pool:
+            read = pool.map if pool is not None else map
+            while cancel is None or not cancel.is_set():
+                batch = list(itertools.islice(paths, BATCH_SIZE))
+                if not batch:
+                    break
+                checked = [(path, *self._stale(path)) for path in batch]
+                stale = [(path, st) for path, st, _ in checked if st is not None]
+                bodies = list(read(self._read, [path for path, _ in stale]))
+                with self.connection:
+                    for path, _, docid in checked:
+                        if docid is not None:
+                            self._remove(path, docid)
+                    for (path, st), body in zip(stale, bodies):
+                        if body is not None:
+                            self._add(path, st, body)
+
+    def update_all(self, paths: Iterable[str],
+                   cancel: threading.Event | None = None, jobs: int = 1) -> None:
+        '''Make the index hold exactly the files in paths'''
+        paths = list(paths)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS wanted (path TEXT PRIMARY KEY) WITHOUT ROWID')
+            self.connection.execute('DELETE FROM wanted')
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO wanted (path) VALUES (?)', ((p,) for p in paths))
+            self.connection.execute(
+                'DELETE FROM readme_text WHERE rowid IN (SELECT docid FROM readme_text_state '
+                'WHERE path NOT IN (SELECT path FROM wanted))')
+            self.connection.execute(
+                'DELETE FROM readme_text_state WHERE path NOT IN (SELECT path FROM wanted)')
+            self.connection.execute('DELETE FROM wanted')
+        self.update_files(paths, cancel, jobs)
+
+    def search(self, terms: list[str], limit: int = MAX_RESULTS) -> list[SearchHit]:
+        '''Return the readme files containing all terms, the most relevant first (bm25)'''
+        if not terms:
+            return []
+        rows = self.connection.execute(
+            'SELECT path, rank FROM readme_text WHERE readme_text MATCH ? '
+            'ORDER BY rank LIMIT ?', (to_fts_query(terms), limit))
+        return [SearchHit(path, rank) for path, rank in rows]
+
+
+class SearchIndexer:
+    '''Build and update the search index in a background thread.
+       Requests are handled in order; a request for the full list
+       cancels a running full update, as it is replaced by the new one.
+    '''
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._requests = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def index_all(self, paths: Iterable[str]) -> None:
+        self._cancel.set()
+        self._requests.put(('all', list(paths)))
+
+    def index_files(self, paths: Iterable[str]) -> None:
+        self._requests.put(('files', list(paths)))
+
+    def wait(self) -> None:
+        '''Wait until all requests are handled'''
+        self._requests.join()
+
+    def stop(self) -> None:
+        self._cancel.set()
+        self._requests.put(None)
+
+    def _run(self) -> None:
+        try:
+            index = SearchIndex(self.db_file)
+        except sqlite3.Error as e:
+            logger.warning(f"Full text search is not available: {e}")
+            index = None
+        while (request := self._requests.get()) is not None:
+            kind, paths = request
+            try:
+                if index is None:
+                    pass
+                elif kind == 'all':
+                    self._cancel.clear()
+                    index.update_all(paths, self._cancel)
+                    logger.info(f"Search index holds {index.count()} readme files")
+                else:
+                    index.update_files(paths)
+            except sqlite3.Error as e:
+                logger.warning(f"Unable to update the search index: {e}")
+            finally:
+                self._requests.task_done()
+        self._requests.task_done()
+        if index is not None:
+            index.close()
@@ -0,0 +1,48 @@
+import logging
+import time
+from bioview import STARTED
+
+STARTUP_TARGET = 0.3    # seconds until the window is visible
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimeline:
+    '''Record the duration of the startup phases of the application.
+       Times are measured from the first import of the bioview package.
+    '''
+
+    def __init__(self):
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        '''Mark the end of a startup phase'''
+        self.marks.append((phase, time.perf_counter()))
+
+    def phases(self) -> list[tuple[str, float]]:
+        '''Return the duration of every phase in seconds'''
+        durations = []
+        previous = STARTED
+        for phase, moment in self.marks:
+            durations.append((phase, moment - previous))
+            previous = moment
+        return durations
+
+    def elapsed(self, phase: str) -> float:
+        '''Return the time from the start until the end of phase'''
+        for name, moment in self.marks:
+            if name == phase:
+                return moment - STARTED
+        raise KeyError(phase)
+
+    def report(self, visible_phase: str = "window visible") -> None:
+        '''Log the startup timeline and warn if the window took too long to show'''
+        lines = [f"{phase:<16}{duration * 1000:8.1f} ms" for phase, duration in self.phases()]
+        logger.info("Startup timeline:\n" + "\n".join(lines))
+        try:
+            visible = self.elapsed(visible_phase)
+        except KeyError:
+            return
+        if visible > STARTUP_TARGET:
+            logger.warning(f"Window visible after {visible * 1000:.0f} ms, "
+                           f"target is {STARTUP_TARGET * 1000:.0f} ms")
@@ -0,0 +1,88 @@
+from bisect import bisect_right
+import re
+from typing import Iterable, Iterator
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class TextMatcher:
+    '''Find all occurrences of many patterns in a text in a single pass.
+
+       Patterns only match at the start of a word. One small regular expression
+       finds the word starts that begin with the first character of a pattern;
+       at those positions the candidate lengths of the patterns with that first
+       character are looked up in a set, the longest first. The cost depends on
+       the length of the text, hardly on the number of patterns.
+       With `whole_words` a pattern must also end at the end of a word, where a
+       following extension like '.txt' also counts as part of the word.
+    '''
+
+    def __init__(self, patterns: Iterable[str], nocase: bool = False, whole_words: bool = True):
+        self._fold = str.lower if nocase else str
+        self._patterns = {self._fold(pattern): pattern for pattern in patterns if pattern}
+        self.whole_words = whole_words
+        lengths: dict[str, set[int]] = {}
+        for pattern in self._patterns:
+            lengths.setdefault(pattern[0], set()).add(len(pattern))
+        self._lengths = {char: sorted(values, reverse=True) for char, values in lengths.items()}
+        first_chars = ''.join(re.escape(char) for char in sorted(self._lengths))
+        self._starts = re.compile(f'(?<!\\w)[{first_chars}]') if first_chars else None
+
+    def _ends_word(self, text: str, end: int) -> bool:
+        following = text[end:end + 2]
+        if not following:
+            return True
+        if following[0] == '.':
+            return len(following) == 1 or not _is_word_char(following[1])
+        return not _is_word_char(following[0])
+
+    def finditer(self, text: str) -> Iterator[tuple[int, int, str]]:
+        '''Yield start, end and the pattern of every match in the text'''
+        if self._starts is None:
+            return
+        folded = self._fold(text)
+        if len(folded) != len(text):    # rare case conversions that change the length
+            folded = text
+        patterns, lengths = self._patterns, self._lengths
+        position = 0
+        for start in self._starts.finditer(folded):
+            start = start.start()
+            if start < position:
+                continue        # inside the previous match
+            for length in lengths[folded[start]]:
+                end = start + length
+                pattern = patterns.get(folded[start:end])
+                if pattern is not None and (not self.whole_words or self._ends_word(text, end)):
+                    yield start, end, pattern
+                    position = end
+                    break
+
+    def find(self, text: str) -> tuple[list[tuple[int, int]], list[str]]:
+        '''Return the spans of all matches and the patterns found, each pattern once'''
+        spans, found = [], {}
+        for start, end, pattern in self.finditer(text):
+            spans.append((start, end))
+            found[pattern] = None
+        return spans, list(found)
+
+
+class TextIndexer:
+    '''Convert character offsets in a text to Tk text indices (line.column)'''
+
+    def __init__(self, text: str):
+        self._line_starts = [0]
+        self._line_starts.extend(match.end() for match in re.finditer('\n', text))
+
+    def index(self, offset: int) -> str:
+        line = bisect_right(self._line_starts, offset)
+        return f'{line}.{offset - self._line_starts[line - 1]}'
+
+    def ranges(self, spans: Iterable[tuple[int, int]]) -> list[str]:
+        '''Flatten the spans into start and end indices, as taken by Text.tag_add'''
+        indices = []
+        for start, end in spans:
+            indices.append(self.index(start))
+            indices.append(self.index(end))
+        return indices
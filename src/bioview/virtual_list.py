@@ -0,0 +1,204 @@
+import tkinter as tk
+from tkinter import font as tkfont
+from typing import Callable, Sequence
+
+SELECT_BACKGROUND = '#0078d7'
+SELECT_FOREGROUND = 'white'
+PADDING = 4
+
+
+class VirtualListbox(tk.Canvas):
+    '''Listbox for very large lists: only the visible rows are rendered.
+
+       The rows come from a sequence (the model) that supports `len` and
+       indexing, for instance a PathStore. The formatter turns a model item
+       into the text shown. Selection works like a tk.Listbox in EXTENDED
+       mode (click, shift-click, control-click, dragging and the arrow keys)
+       and is kept as model indices. Changes to the selection generate a
+       <<ListboxSelect>> event.
+       The vertical scrollbar is driven by `yscrollcommand` and `yview`, like
+       a tk.Listbox, horizontal scrolling uses the canvas scroll region.
+    '''
+
+    def __init__(self, parent, formatter: Callable[[str], str] = str,
+                 yscrollcommand: Callable[[float, float], None] | None = None, **kwargs):
+        kwargs.setdefault('background', 'white')
+        kwargs.setdefault('takefocus', True)
+        super().__init__(parent, **kwargs)
+        self.formatter = formatter
+        self.yscrollcommand = yscrollcommand
+        self.font = tkfont.nametofont('TkDefaultFont')
+        self.row_height = self.font.metrics('linespace') + 2
+        self.model: Sequence[str] = ()
+        self.first = 0
+        self.selection: set[int] = set()
+        self.anchor = 0
+        self.active = 0
+
+        self.bind('<Configure>', lambda event: self.redraw())
+        self.bind('<Button-1>', self._click)
+        self.bind('<Shift-Button-1>', self._shift_click)
+        self.bind('<Control-Button-1>', self._control_click)
+        self.bind('<B1-Motion>', self._drag)
+        self.bind('<MouseWheel>', self._wheel)
+        self.bind('<Button-4>', lambda event: self.yview('scroll', -3, 'units'))
+        self.bind('<Button-5>', lambda event: self.yview('scroll', 3, 'units'))
+        self.bind('<Up>', lambda event: self._move(self.active - 1, extend=False))
+        self.bind('<Down>', lambda event: self._move(self.active + 1, extend=False))
+        self.bind('<Shift-Up>', lambda event: self._move(self.active - 1, extend=True))
+        self.bind('<Shift-Down>', lambda event: self._move(self.active + 1, extend=True))
+        self.bind('<Prior>', lambda event: self._move(self.active - self._page(), extend=False))
+        self.bind('<Next>', lambda event: self._move(self.active + self._page(), extend=False))
+        self.bind('<Home>', lambda event: self._move(0, extend=False))
+        self.bind('<End>', lambda event: self._move(self.size() - 1, extend=False))
+        self.bind('<Control-a>', self._select_all)
+
+    # Model
+    # -----
+    def set_model(self, model: Sequence[str]) -> None:
+        '''Show a new list, the selection is cleared'''
+        self.model = model
+        self.first = 0
+        self.selection.clear()
+        self.anchor = self.active = 0
+        self.redraw()
+
+    def refresh(self) -> None:
+        '''Redraw after the model changed, for instance when items were appended'''
+        self.first = max(0, min(self.first, self.size() - self._page()))
+        self.selection = {i for i in self.selection if i < self.size()}
+        self.redraw()
+
+    def size(self) -> int:
+        return len(self.model)
+
+    # Listbox compatible selection
+    # ----------------------------
+    def curselection(self) -> tuple[int, ...]:
+        return tuple(sorted(self.selection))
+
+    def selection_clear(self, first: int = 0, last=tk.END) -> None:
+        self.selection.clear()
+        self.redraw()
+
+    def selection_set(self, index: int) -> None:
+        self.selection.add(index)
+        self.anchor = self.active = index
+        self.redraw()
+
+    def see(self, index: int) -> None:
+        '''Scroll to make the row at index visible'''
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self._page():
+            self.first = index - self._page() + 1
+        self.redraw()
+
+    # Scrolling
+    # ---------
+    def _page(self) -> int:
+        return max(1, self.winfo_height() // self.row_height)
+
+    def yview(self, *args):
+        '''Scrollbar interface: without arguments return the visible fraction'''
+        size = max(1, self.size())
+        if not args:
+            return self.first / size, min(1.0, (self.first + self._page()) / size)
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * size)
+        elif args[0] == 'scroll':
+            amount = int(args[1]) * (self._page() if args[2] == 'pages' else 1)
+            self.first += amount
+        self.first = max(0, min(self.first, self.size() - self._page()))
+        self.redraw()
+
+    def _wheel(self, event: tk.Event) -> None:
+        self.yview('scroll', -3 if event.delta > 0 else 3, 'units')
+
+    # Rendering
+    # ---------
+    def redraw(self) -> None:
+        self.delete('all')
+        width = self.winfo_width()
+        last = min(self.size(), self.first + self._page() + 1)
+        for index in range(self.first, last):
+            y = (index - self.first) * self.row_height
+            selected = index in self.selection
+            if selected:
+                self.create_rectangle(0, y, width, y + self.row_height,
+                                      fill=SELECT_BACKGROUND, outline='', tags='selection')
+            self.create_text(PADDING, y + 1, anchor='nw', font=self.font,
+                             text=self.formatter(self.model[index]),
+                             fill=SELECT_FOREGROUND if selected else 'black')
+
+        # allow horizontal scrolling of the visible rows, the selection spans the width
+        bbox = self.bbox('all')
+        right = max(width, bbox[2] + PADDING) if bbox else width
+        self.configure(scrollregion=(0, 0, right, self.winfo_height()))
+        for rect in self.find_withtag('selection'):
+            x0, y0, _, y1 = self.coords(rect)
+            self.coords(rect, x0, y0, right, y1)
+        if self.yscrollcommand is not None:
+            self.yscrollcommand(*self.yview())
+
+    # Mouse and keyboard selection
+    # ----------------------------
+    def _index_at(self, y: int) -> int | None:
+        index = self.first + int(y // self.row_height)
+        return index if 0 <= index < self.size() else None
+
+    def _changed(self) -> None:
+        self.redraw()
+        self.event_generate('<<ListboxSelect>>')
+
+    def _click(self, event: tk.Event) -> None:
+        self.focus_set()
+        index = self._index_at(event.y)
+        if index is None:
+            return
+        self.selection = {index}
+        self.anchor = self.active = index
+        self._changed()
+
+    def _shift_click(self, event: tk.Event) -> None:
+        index = self._index_at(event.y)
+        if index is not None:
+            self._select_range(index)
+
+    def _control_click(self, event: tk.Event) -> None:
+        index = self._index_at(event.y)
+        if index is None:
+            return
+        self.selection ^= {index}
+        self.anchor = self.active = index
+        self._changed()
+
+    def _drag(self, event: tk.Event) -> None:
+        index = self._index_at(min(max(event.y, 0), self.winfo_height() - 1))
+        if index is not None and index != self.active:
+            self.see(index)
+            self._select_range(index)
+
+    def _select_range(self, index: int) -> None:
+        low, high = sorted((self.anchor, index))
+        self.selection = set(range(low, high + 1))
+        self.active = index
+        self._changed()
+
+    def _move(self, index: int, extend: bool) -> str:
+        if self.size() == 0:
+            return 'break'
+        index = max(0, min(index, self.size() - 1))
+        self.see(index)
+        if extend:
+            self._select_range(index)
+        else:
+            self.selection = {index}
+            self.anchor = self.active = index
+            self._changed()
+        return 'break'
+
+    def _select_all(self, event: tk.Event) -> str:
+        self.selection = set(range(self.size()))
+        self._changed()
+        return 'break'
@@ -0,0 +1,85 @@
+import os
+import time
+from bioview.backup_store import BackupStore
+
+
+def test_revisions_are_deduplicated(tmp_path):
+    store = BackupStore(tmp_path)
+    readme = tmp_path / 'a' / 'readme.txt'
+
+    first = store.add(readme, b'version 1')
+    assert store.add(readme, b'version 1') is None      # same as the latest
+    store.add(readme, b'version 2')
+    store.add(tmp_path / 'b' / 'readme.txt', b'version 1')
+
+    assert [revision.hash for revision in store.revisions(readme)][0] == first.hash
+    assert len(store.revisions(readme)) == 2
+    assert len(list((store.folder / 'objects').glob('*/*'))) == 2
+
+
+def test_retention_and_garbage_collection(tmp_path):
+    store = BackupStore(tmp_path, retention=2)
+    readme = tmp_path / 'readme.txt'
+    for i in range(4):
+        store.add(readme, f'version {i}'.encode())
+
+    assert [store.read(revision) for revision in store.revisions(readme)] == [b'version 2',
+                                                                              b'version 3']
+    old = time.time() - 2 * 3600
+    for object_file in (store.folder / 'objects').glob('*/*'):
+        os.utime(object_file, (old, old))
+    assert store.collect_garbage() == 2
+    assert len(list((store.folder / 'objects').glob('*/*'))) == 2
+
+
+def test_restore(tmp_path):
+    store = BackupStore(tmp_path)
+    readme = tmp_path / 'readme.txt'
+    readme.write_bytes(b'version 1')
+    store.backup(readme)
+    readme.write_bytes(b'version 2')
+
+    store.restore(readme, store.revisions(readme)[0])
+
+    assert readme.read_bytes() == b'version 1'
+    assert [store.read(revision) for revision in store.revisions(readme)] == [b'version 1',
+                                                                              b'version 2']
+
+
+def test_migrate_legacy_backups(tmp_path):
+    readme = tmp_path / 'readme.txt'
+    readme.write_bytes(b'current')
+    for i in (1, 2, 3):
+        (tmp_path / f'readme.txt.{i}').write_bytes(f'backup {i}'.encode())
+    (tmp_path / 'other.txt.1').write_bytes(b'not a readme backup')
+
+    store = BackupStore(tmp_path)
+    store.maintain([str(readme)])
+
+    assert [store.read(revision) for revision in store.revisions(readme)] == [
+        b'backup 3', b'backup 2', b'backup 1']
+    assert sorted(os.listdir(tmp_path)) == ['.bioview_backups', 'other.txt.1', 'readme.txt']
+    assert (store.folder / 'migrated').exists()
+
+
+def test_migration_waits_for_readme_list(tmp_path):
+    readme = tmp_path / 'readme.txt'
+    readme.write_bytes(b'current')
+    (tmp_path / 'readme.txt.1').write_bytes(b'backup 1')
+    store = BackupStore(tmp_path)
+
+    store.maintain([])      # no list of readme files yet
+    assert not store.folder.exists()
+
+    store.maintain([str(readme)])
+    assert [store.read(revision) for revision in store.revisions(readme)] == [b'backup 1']
+    assert (store.folder / 'migrated').exists()
+
+
+def test_maintain_without_backups_creates_no_store(tmp_path):
+    readme = tmp_path / 'readme.txt'
+    readme.write_bytes(b'current')
+
+    BackupStore(tmp_path).maintain([str(readme)])
+
+    assert os.listdir(tmp_path) == ['readme.txt']
@@ -0,0 +1,74 @@
+import json
+import subprocess
+import sys
+import pytest
+from bioview import cli
+
+
+@pytest.fixture
+def work_folder(tmp_path):
+    for name, text in {'a': 'Raster of the land cover, see cover.tif',
+                       'b': 'Locations of the field plots'}.items():
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'readme.txt').write_text(text)
+    (tmp_path / 'a' / 'cover.tif').write_bytes(b'')
+    (tmp_path / 'b' / 'plots.csv').write_bytes(b'')
+    return tmp_path
+
+
+def run(capsys, *args) -> list[dict]:
+    assert cli.main(list(args)) == 0
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_scan(capsys, work_folder):
+    lines = run(capsys, 'scan', str(work_folder), '--jobs', '2')
+
+    readmes = [str(work_folder / name / 'readme.txt') for name in 'ab']
+    assert sorted(line['path'] for line in lines) == readmes
+    assert (work_folder / 'all_readme_files.lst').read_text().split() == readmes
+
+
+def test_search_and_export(capsys, work_folder):
+    run(capsys, 'scan', str(work_folder))
+
+    lines = run(capsys, 'search', 'rast', '--folder', str(work_folder))
+    assert [line['path'] for line in lines] == [str(work_folder / 'a' / 'readme.txt')]
+
+    lines = run(capsys, 'export', str(work_folder), '--refresh', '-j', '2')
+    assert [line['path'] for line in lines] == [str(work_folder / name / 'readme.txt')
+                                                for name in 'ab']
+    assert all(line['hash'] and line['encoding'] for line in lines)
+
+
+def test_coverage(capsys, work_folder):
+    lines = run(capsys, 'coverage', str(work_folder), '-o', str(work_folder / 'report.json'))
+
+    by_folder = {line['folder']: line for line in lines}
+    assert by_folder[str(work_folder / 'a')]['undocumented'] == []
+    assert by_folder[str(work_folder / 'b')]['undocumented'] == ['plots.csv']
+    assert (work_folder / 'report.json').exists()
+
+
+def test_search_without_scan(capsys, tmp_path):
+    assert cli.main(['search', 'raster', '--folder', str(tmp_path)]) == 1
+
+
+def test_no_gui_imports():
+    code = 'import sys, bioview.cli; print("tkinter" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_generate(capsys, work_folder):
+    (work_folder / 'c').mkdir()
+    (work_folder / 'c' / 'samples.csv').write_bytes(b'')
+
+    lines = run(capsys, 'generate', str(work_folder), '--dry-run')
+    assert lines == [{'folder': str(work_folder / 'c'),
+                      'readme': str(work_folder / 'c' / 'readme.txt'),
+                      'status': 'would create', 'error': None}]
+
+    lines = run(capsys, 'generate', str(work_folder), '--content', 'list')
+    assert [line['status'] for line in lines] == ['created']
+    assert 'samples.csv' in (work_folder / 'c' / 'readme.txt').read_text()
@@ -0,0 +1,90 @@
+import os
+import sys
+from unittest import mock
+import pytest
+from bioview.content_cache import ContentCache
+
+
+@pytest.fixture
+def readmes(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f'readme_{i}.txt'
+        path.write_text(f'readme {i} ' * 10)
+        paths.append(path)
+    return paths
+
+
+def counting_loader():
+    return mock.Mock(side_effect=lambda path: path.read_text())
+
+
+def test_second_get_is_a_hit(readmes):
+    loader = counting_loader()
+    cache = ContentCache(loader=loader)
+
+    assert cache.get(readmes[0]) == cache.get(readmes[0])
+    assert loader.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_file_is_read_again(readmes):
+    loader = counting_loader()
+    cache = ContentCache(loader=loader)
+    cache.get(readmes[0])
+    readmes[0].write_text('changed')
+    st = os.stat(readmes[0])
+    os.utime(readmes[0], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert cache.get(readmes[0]) == 'changed'
+    assert loader.call_count == 2
+    assert cache.size == sys.getsizeof('changed')
+
+
+def test_least_recently_used_is_evicted(readmes):
+    loader = counting_loader()
+    entry_size = sys.getsizeof(readmes[0].read_text())
+    cache = ContentCache(max_bytes=2 * entry_size, loader=loader)
+    cache.get(readmes[0])
+    cache.get(readmes[1])
+    cache.get(readmes[0])
+    cache.get(readmes[2])       # evicts readme 1
+
+    cache.get(readmes[0])
+    assert loader.call_count == 3
+    cache.get(readmes[1])
+    assert loader.call_count == 4
+    assert cache.size <= cache.max_bytes
+
+
+def test_invalidate(readmes):
+    loader = counting_loader()
+    cache = ContentCache(loader=loader)
+    cache.get(readmes[0])
+    cache.invalidate(str(readmes[0]))
+
+    cache.get(readmes[0])
+    assert loader.call_count == 2
+
+
+def test_invalidate_after_eviction(readmes):
+    entry_size = sys.getsizeof(readmes[0].read_text())
+    cache = ContentCache(max_bytes=2 * entry_size, loader=counting_loader())
+    for readme in readmes[:3]:      # evicts readme 0
+        cache.get(readme)
+
+    cache.invalidate(str(readmes[0]))
+    cache.invalidate(str(readmes[1]))
+    assert cache.size == entry_size
+
+
+def test_prefetch(readmes):
+    loader = counting_loader()
+    cache = ContentCache(loader=loader)
+    cache.prefetch(readmes[1:3])
+    cache.shutdown(wait=True)
+
+    assert cache.get(readmes[1]) == readmes[1].read_text()
+    assert cache.get(readmes[2]) == readmes[2].read_text()
+    assert cache.hits == 2
+    assert loader.call_count == 2
@@ -0,0 +1,54 @@
+from bioview.datasets import DatasetRule, dataset_patterns, describe, group_datasets
+
+
+def by_name(datasets):
+    return {dataset.name: dataset for dataset in datasets}
+
+
+def test_shapefile_and_single_files():
+    names = ['roads.shp', 'roads.shx', 'roads.dbf', 'roads.prj', 'roads.shp.xml',
+             'notes.docx', 'roads.csv']
+    datasets = by_name(group_datasets(names))
+
+    assert sorted(datasets) == ['notes.docx', 'roads.csv', 'roads.shp']
+    roads = datasets['roads.shp']
+    assert roads.kind == 'shapefile'
+    assert roads.stem == 'roads'
+    assert sorted(roads.files) == sorted(names[:5])
+    assert not datasets['notes.docx'].is_multi_file
+
+
+def test_envi_needs_header():
+    datasets = by_name(group_datasets(['scene.hdr', 'scene', 'ndvi.img', 'ndvi.hdr',
+                                       'dem.img', 'dem.rrd']))
+
+    assert datasets['scene'].kind == 'ENVI raster'
+    assert sorted(datasets['scene'].files) == ['scene', 'scene.hdr']
+    assert datasets['ndvi.img'].kind == 'ENVI raster'
+    assert datasets['dem.img'].kind == 'ERDAS Imagine'
+
+
+def test_geotiff_sidecars_and_case():
+    datasets = by_name(group_datasets(['Map.TIF', 'Map.tif.aux.xml', 'map.tfw', 'other.tif']))
+
+    assert sorted(datasets) == ['Map.TIF', 'other.tif']
+    assert len(datasets['Map.TIF'].files) == 3
+    assert datasets['other.tif'].files == ['other.tif']
+
+
+def test_custom_rules():
+    rules = [DatasetRule('LAS tile', ('.las',), members=('.lax',))]
+    datasets = group_datasets(['tile_1.las', 'tile_1.lax', 'roads.shp', 'roads.dbf'], rules)
+
+    assert [dataset.name for dataset in datasets] == ['roads.dbf', 'roads.shp', 'tile_1.las']
+
+
+def test_patterns_and_description():
+    datasets = group_datasets(['roads.shp', 'roads.dbf', 'roads.shx', 'a.shp', 'a.dbf',
+                               'table.csv'])
+    patterns = dataset_patterns(datasets)
+
+    assert sorted(patterns) == ['a.shp', 'roads', 'roads.shp', 'table.csv']
+    assert patterns['roads'] is patterns['roads.shp']
+    assert describe(patterns['roads']) == 'roads.shp (shapefile, 3 files)'
+    assert describe(patterns['table.csv']) == 'table.csv'
@@ -0,0 +1,88 @@
+import os
+import mock
+import pytest
+from bioview.dir_listing_cache import DirListingCache, ListingEntry
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'data.csv').write_bytes(b'1234')
+    return tmp_path
+
+
+def test_list(folder):
+    entries = sorted(DirListingCache().entries(folder))
+
+    assert [(entry.name, entry.is_dir) for entry in entries] == [('data.csv', False),
+                                                                 ('sub', True)]
+
+
+def test_list_without_stat(folder):
+    class Entry:
+        def __init__(self, entry):
+            self.name = entry.name
+            self.is_dir = entry.is_dir
+
+        def stat(self):
+            raise AssertionError('stat called')
+
+    scandir = os.scandir
+
+    class Scandir:
+        def __init__(self, path):
+            self.entries = scandir(path)
+
+        def __enter__(self):
+            return (Entry(entry) for entry in self.entries)
+
+        def __exit__(self, *exc):
+            self.entries.close()
+
+    with mock.patch('os.scandir', Scandir):
+        assert len(DirListingCache().entries(folder)) == 2
+
+
+def test_listing_reused_until_folder_changes(folder):
+    cache = DirListingCache()
+    cache.entries(folder)
+
+    with mock.patch('bioview.dir_listing_cache.scan_folder', return_value=[]) as scan:
+        assert len(cache.entries(folder)) == 2
+        scan.assert_not_called()
+
+        (folder / 'readme.txt').write_text('')
+        st = os.stat(folder)
+        os.utime(folder, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.entries(folder) == []
+        scan.assert_called_once()
+
+
+def test_invalidate(folder):
+    cache = DirListingCache()
+    cache.entries(folder)
+    cache.entries(folder / 'sub')
+
+    cache.invalidate_tree(folder)
+    assert len(cache) == 0
+
+    cache.entries(folder)
+    (folder / 'readme.txt').write_text('')
+    cache.invalidate(folder)    # also when the modification time did not change
+    assert len(cache.entries(folder)) == 3
+
+
+def test_save_and_load(folder, tmp_path_factory):
+    cache_file = tmp_path_factory.mktemp('cache') / 'listings.json'
+    cache = DirListingCache(max_folders=1)
+    cache.entries(folder / 'sub')
+    cache.entries(folder)
+    assert len(cache) == 1      # the least recently used folder is dropped
+    cache.save(cache_file)
+
+    loaded = DirListingCache()
+    loaded.load(cache_file)
+    with mock.patch('bioview.dir_listing_cache.scan_folder') as scan:
+        entries = loaded.entries(folder)
+    scan.assert_not_called()
+    assert all(isinstance(entry, ListingEntry) for entry in entries)
@@ -2,7 +2,8 @@ import pytest
 from unittest import mock
 from pathlib import Path
 import tkinter as tk
-from bioview.dirtree import DirTree
+from bioview.dir_listing_cache import DirListingCache
+from bioview.dirtree import DirTree, list_directory
 
 
 @pytest.fixture(scope='module')
@@ -11,46 +12,29 @@ def dir_tree():
     return DirTree(win)
 
 
-@mock.patch('bioview.dirtree.Path.exists')
-@mock.patch('bioview.dirtree.Path.iterdir')
-def test_safe_iterdir_success(mock_iterdir, mock_exists, dir_tree):
-    # Mock the path.exists() to return True
-    mock_exists.return_value = True
-    # Mock the path.iterdir() to return a list of Path objects
-    files = [Path('/path/to/file1'), Path('/path/to/file2')]
-    mock_iterdir.return_value = files
+@pytest.fixture
+def listing_cache():
+    cache = DirListingCache()
+    with mock.patch('bioview.dirtree.get_listing_cache', return_value=cache):
+        yield cache
 
-    result = dir_tree._safe_iterdir(Path('/path/to/dir'))
 
-    assert len(result) == 2
-    for p, q in zip(result, files):
-        assert p == q
-    mock_exists.assert_called_once()
-    mock_iterdir.assert_called_once()
+def test_list_directory_uses_cache(tmp_path, listing_cache):
+    (tmp_path / 'readme.txt').write_text('')
+    assert list_directory(tmp_path) == [('readme.txt', False)]
 
+    with mock.patch('bioview.dir_listing_cache.scan_folder') as scan:
+        assert list_directory(tmp_path) == [('readme.txt', False)]
+    scan.assert_not_called()
 
-@mock.patch('bioview.dirtree.Path.exists')
-def test_safe_iterdir_path_not_exists(mock_exists, dir_tree):
-    # Mock the path.exists() to return False
-    mock_exists.return_value = False
 
-    result = dir_tree._safe_iterdir(Path('/path/to/dir'))
-    assert len(result) == 0
-    mock_exists.assert_called_once()
+def test_list_directory_path_not_exists(tmp_path, listing_cache):
+    assert list_directory(tmp_path / 'missing') == []
 
 
-@mock.patch('bioview.dirtree.Path.exists')
-@mock.patch('bioview.dirtree.Path.iterdir')
-def test_safe_iterdir_permission_error(mock_iterdir, mock_exists, dir_tree):
-    # Mock the path.exists() to return True
-    mock_exists.return_value = True
-    # Mock the path.iterdir() to raise PermissionError
-    mock_iterdir.side_effect = PermissionError
-
-    result = dir_tree._safe_iterdir(Path('/path/to/dir'))
-    assert len(result) == 0
-    mock_exists.assert_called_once()
-    mock_iterdir.assert_called_once()
+def test_list_directory_permission_error(tmp_path, listing_cache):
+    with mock.patch('bioview.dir_listing_cache.scan_folder', side_effect=PermissionError):
+        assert list_directory(tmp_path) == []
 
 
 def test_insert_manually(dir_tree):
@@ -67,3 +51,27 @@ def test_insert_manually_twice(dir_tree):
     id = dir_tree.insert_item(name='readme.txt', path=Path('/path/to/dir'), position=0)
     assert id is not None
     assert id == id0
+
+
+def test_path_index(dir_tree):
+    '''Test that items are found by path and by name, also after deleting them'''
+    folder = Path('/path/to/folder')
+    folder_id = dir_tree.insert_item(name='folder', path=folder)
+    file_id = dir_tree.insert_item(name='data.csv', path=folder / 'data.csv', parent=folder_id)
+
+    assert dir_tree.get_item_id(folder / 'data.csv') == file_id
+    assert dir_tree.insert_item(name='data.csv', path=folder / 'data.csv',
+                                parent=folder_id) == file_id
+    assert dir_tree.child_ids[folder_id] == {'data.csv': file_id}
+
+    dir_tree.delete_item(folder_id)
+    assert dir_tree.get_item_id(folder) == ''
+    assert dir_tree.get_item_id(folder / 'data.csv') == ''
+    assert file_id not in dir_tree.fsobjects
+
+
+def test_list_directory(tmp_path):
+    (tmp_path / 'folder').mkdir()
+    (tmp_path / 'readme.txt').write_text('')
+
+    assert sorted(list_directory(tmp_path)) == [('folder', True), ('readme.txt', False)]
@@ -0,0 +1,90 @@
+import csv
+import json
+import os
+from bioview.config import ScanProfile
+from bioview.doc_coverage import check_coverage, mentioned_filenames, write_csv, write_report
+import pytest
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    plots = root / 'plots'
+    plots.mkdir(parents=True)
+    for name in ['plots.csv', 'plots_2020.csv', 'map.tif']:
+        (plots / name).write_text('data')
+    (plots / 'readme.txt').write_text(
+        'plots.csv: all plots\nplots_2020.csv: plots of 2020\nold_plots.xlsx was removed\n'
+        'See www.example.org/data.html and version 1.5\n')
+    (plots / 'readme.txt.1').write_text('backup')
+    undocumented = root / 'soil'
+    undocumented.mkdir()
+    (undocumented / 'samples.csv').write_text('data')
+    (root / 'backup').mkdir()
+    (root / 'backup' / 'old.csv').write_text('data')
+    return root
+
+
+def test_mentioned_filenames():
+    text = ('Files: plots.csv, map_2020.tif and b.txt (too short). '
+            'Mail me@example.com, see http://host/page.html or C:\\data\\file.txt, pi is 3.14')
+    assert mentioned_filenames(text) == {'plots.csv', 'map_2020.tif'}
+
+
+def test_check_coverage(project):
+    report = check_coverage(project, jobs=2, profile=ScanProfile())
+    folders = {folder.folder: folder for folder in report.folders}
+
+    plots = folders[str(project / 'plots')]
+    assert plots.readmes == ['readme.txt']
+    assert plots.datasets == 3
+    assert plots.undocumented == ['map.tif']
+    assert plots.dangling == ['old_plots.xlsx']
+    assert plots.percentage == pytest.approx(66.67, abs=0.01)
+
+    soil = folders[str(project / 'soil')]
+    assert soil.undocumented == ['samples.csv']
+    assert soil.percentage == 0
+    assert folders[str(project)].percentage is None
+    assert str(project / 'backup') not in folders     # excluded by the default profile
+    assert (report.datasets, report.documented) == (4, 2)
+
+
+def test_write_csv_and_json(project, tmp_path):
+    report = check_coverage(project, profile=ScanProfile())
+    write_csv(report, tmp_path / 'coverage.csv')
+    write_report(report, tmp_path / 'coverage.json')
+
+    with open(tmp_path / 'coverage.csv', newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert [row['percentage'] for row in rows] == ['66.7', '0.0']
+    assert rows[0]['dangling'] == 'old_plots.xlsx'
+
+    with open(tmp_path / 'coverage.json') as file:
+        data = json.load(file)
+    assert data['percentage'] == 50.0
+    assert data['folders'][1]['undocumented'] == ['samples.csv']
+
+
+def test_multi_file_datasets_count_once(tmp_path):
+    folder = tmp_path / 'roads'
+    folder.mkdir()
+    for name in ['roads.shp', 'roads.shx', 'roads.dbf', 'rivers.shp', 'rivers.dbf']:
+        (folder / name).write_text('data')
+    (folder / 'readme.txt').write_text('The roads shapefile holds all roads')
+
+    report = check_coverage(folder, jobs=1)
+
+    assert report.folders[0].datasets == 2
+    assert report.folders[0].undocumented == ['rivers.shp']
+
+
+def test_follow_symlinks_checks_every_folder_once(project):
+    (project / 'plots' / 'loop').symlink_to(project, target_is_directory=True)
+    (project / 'soil' / 'up').symlink_to(project / 'plots', target_is_directory=True)
+
+    report = check_coverage(project, jobs=2, profile=ScanProfile(follow_symlinks=True))
+
+    # a folder reached through two paths is checked once, under either path
+    assert sorted(os.path.realpath(folder.folder) for folder in report.folders) == [
+        str(project / name) for name in ['', 'plots', 'soil']]
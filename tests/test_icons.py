@@ -0,0 +1,45 @@
+import os
+from unittest import mock
+import pytest
+from bioview import icons
+
+pytest.importorskip('PIL')
+
+
+@pytest.fixture
+def caches(tmp_path, monkeypatch):
+    cache, fallback = tmp_path / 'icons', tmp_path / 'fallback'
+    monkeypatch.setattr(icons, 'ICON_CACHE', cache)
+    monkeypatch.setattr(icons, 'FALLBACK_ICON_CACHE', fallback)
+    return cache, fallback
+
+
+def test_icon_is_rendered_once(caches):
+    from PIL import Image
+
+    target = icons.icon_file('search.png', 16)
+
+    assert target == caches[0] / 'search-16.png'
+    assert Image.open(target).size == (16, 16)
+    with mock.patch('bioview.icons._render') as render:
+        assert icons.icon_file('search.png', 16) == target
+    render.assert_not_called()
+
+
+def test_icon_rendered_again_when_source_is_newer(caches):
+    target = icons.icon_file('search.png', 16)
+    os.utime(target, (0, 0))
+
+    with mock.patch('bioview.icons._render') as render:
+        icons.icon_file('search.png', 16)
+    render.assert_called_once()
+
+
+def test_fallback_when_cache_is_not_writable(caches):
+    cache, fallback = caches
+    cache.write_text('')        # a file, so no folder can be made here
+
+    target = icons.icon_file('search.png', 16)
+
+    assert target == fallback / 'search-16.png'
+    assert target.exists()
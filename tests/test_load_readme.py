@@ -1,40 +1,84 @@
-from pathlib import Path
+import os
 import mock
 import bioview.load_readme as load_readme
+from bioview.save_readme_changes import save_readme_changes
 
 
-@mock.patch('builtins.open')
-@mock.patch('bioview.load_readme.Path.stat')
-@mock.patch('bioview.load_readme.CharsetDetector.get_charset')
-def test_loadReadmeFile_with_valid_encoding(mock_get_charset, mock_stat, mock_open):
-    # Mock the file contents and encoding
-    file_contents = "This is a test file."
-    encoding = "utf-8-sig"
-    mock_get_charset.return_value = encoding
-    mock_stat.return_value.st_size = 20
-    mock_open.return_value.__enter__.return_value.read.return_value = file_contents
+def test_loadReadmeFile_with_valid_encoding(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes(b'\xef\xbb\xbfThis is a test file.')
 
     # Call the method
-    actual_contents = load_readme.read_file_contents(Path("test_file.txt"))
+    actual_contents = load_readme.read_file_contents(filename)
 
-    # Assert that the textfield contains the expected contents
-    assert actual_contents == file_contents
+    # Assert that the byte order mark is removed
+    assert actual_contents == "This is a test file."
 
 
-@mock.patch('builtins.open')
-@mock.patch('bioview.load_readme.Path.stat')
-@mock.patch('bioview.load_readme.CharsetDetector.get_charset')
-def test_loadReadmeFile_with_invalid_encoding(mock_get_charset, mock_stat, mock_open):
-    # Mock the file contents and encoding
-    file_contents = "This is a test file."
-    encoding = None
-    mock_open.return_value.__enter__.return_value.read.return_value = file_contents
-    mock_get_charset.return_value = encoding
-    mock_stat.return_value.st_size = 20
+def test_loadReadmeFile_with_invalid_encoding(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes(b'caf\xe9 \xff')
 
-    # Call the method
-    actual_contents = load_readme.read_file_contents(Path("test_file.txt"))
+    # Call the method, no encoding can decode the file
+    with mock.patch('bioview.load_readme.locale.getencoding', return_value='utf-8'):
+        actual_contents = load_readme.read_file_contents(filename)
+
+    # Assert that invalid characters are replaced
+    assert actual_contents == "caf� �"
+
+
+def test_load_readme_file_reads_once(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes('Ünïcode readme'.encode('utf-16'))
+
+    with mock.patch('builtins.open', wraps=open) as mock_open:
+        text, encoding = load_readme.load_readme_file(filename)
+
+    mock_open.assert_called_once_with(filename, 'rb')
+    assert text == 'Ünïcode readme'
+    assert encoding == 'UTF-16'
+
+
+def test_locale_fallback_is_remembered(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes('café'.encode('cp1252'))
+
+    with mock.patch('bioview.load_readme.locale.getencoding', return_value='cp1252'):
+        assert load_readme.load_readme_file(filename) == ('café', 'cp1252')
+
+    assert load_readme.known_encoding(filename, os.stat(filename)) == 'cp1252'
+    # the remembered encoding is tried first, also without the locale
+    with mock.patch('bioview.load_readme.locale.getencoding', return_value='utf-8'):
+        assert load_readme.load_readme_file(filename) == ('café', 'cp1252')
+
+
+def test_empty_file(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes(b'')
+
+    assert load_readme.read_file_contents(filename) == ''
+
+
+def test_decode_contents_hint():
+    assert load_readme.decode_contents('ß'.encode('latin-1'), 'latin-1') == ('ß', 'latin-1')
+    assert load_readme.decode_contents(b'plain', 'no-such-codec') == ('plain', 'UTF-8')
+
+
+def test_detected_encoding_without_codec():
+    with mock.patch('bioview.load_readme.detect_encoding', return_value='ISO-10646-UCS-4'), \
+            mock.patch('locale.getencoding', return_value='ascii'):
+        text, encoding = load_readme.decode_contents(b'caf\xe9')
+
+    assert (text, encoding) == ('caf\ufffd', 'utf-8')
+
+
+def test_crlf_file_loads_and_saves_without_carriage_returns(tmp_path):
+    filename = tmp_path / 'readme.txt'
+    filename.write_bytes(b'line one\r\nline two\r\nold mac\rend\r\n')
+
+    text, _ = load_readme.load_readme_file(filename)
+    assert text == 'line one\nline two\nold mac\nend\n'
 
-    # Assert that the textfield contains the error message
-    expected_contents = "Error: Unable to decode file."
-    assert actual_contents == expected_contents
+    save_readme_changes(filename, text)
+    assert b'\r\r' not in filename.read_bytes()
+    assert load_readme.load_readme_file(filename)[0] == text
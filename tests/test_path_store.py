@@ -0,0 +1,74 @@
+import pytest
+from unittest import mock
+from bioview.path_store import PathStore
+
+PATHS = ['/data/a/readme.txt', '/data/b/readme.txt', '/data/a/project_readme.txt',
+         'readme.txt', '/data/b/sub/readme.txt']
+
+
+def test_paths_round_trip():
+    store = PathStore(PATHS)
+
+    assert len(store) == len(PATHS)
+    assert list(store) == PATHS
+    assert [store[i] for i in range(len(store))] == PATHS
+    assert store[-1] == PATHS[-1]
+
+
+def test_folders_and_names_are_interned():
+    store = PathStore(sorted(PATHS * 100))
+
+    assert len(store) == 500
+    # the folders of the paths: '', '/data/a/', '/data/b/' and '/data/b/sub/',
+    # and their parents '/', '/data/' and '/data/b/'
+    assert len(store._parent) == 7
+    assert len(store._chars) == len('/data/a/b/sub/b/')
+    assert len(store._names) == 2
+
+
+def test_append_and_index():
+    store = PathStore(PATHS)
+    store.append('/data/c/readme.txt')
+
+    assert store.index('/data/c/readme.txt') == len(PATHS)
+    assert store.index('/data/b/readme.txt') == 1
+    assert '/data/a/readme.txt' in store
+    assert '/data/c/project_readme.txt' not in store
+    with pytest.raises(ValueError):
+        store.index('/data/x/readme.txt')
+
+
+def test_remove_returns_positions():
+    store = PathStore(PATHS)
+
+    removed = store.remove(['/data/a/readme.txt', '/data/b/sub/readme.txt', '/unknown'])
+
+    assert removed == [4, 0]
+    assert list(store) == [PATHS[1], PATHS[2], PATHS[3]]
+
+
+def test_missing_and_bulk_remove():
+    paths = [f'/data/p{i:05}/readme.txt' for i in range(100)]
+    store = PathStore(paths)
+
+    assert store.missing([paths[3], '/new/readme.txt', paths[3], '/new/readme.txt']) == \
+        ['/new/readme.txt']
+    assert store.remove(paths[10:60]) == list(range(59, 9, -1))
+    assert list(store) == paths[:10] + paths[60:]
+    assert store.index(paths[60]) == 10
+
+
+def test_undecodable_names_round_trip():
+    path = '/data/caf\udce9/readme.txt'
+    store = PathStore([path])
+    store.append('/data/other/readme.txt')
+
+    assert list(store) == [path, '/data/other/readme.txt']
+
+
+def test_lookup_remembers_folders():
+    store = PathStore([f"/data/project/site{i}/readme.txt" for i in range(3)])
+    assert store[1] == '/data/project/site1/readme.txt'
+
+    with mock.patch.object(store, '_chars', None):      # the components are not read again
+        assert store[1] == '/data/project/site1/readme.txt'
@@ -0,0 +1,115 @@
+import os
+import shutil
+import pytest
+from bioview.config import ScanProfile
+from bioview.poll_watcher import PollingChangeDetector
+from bioview.scan_cache import ScanCache
+from bioview.scan_readmefiles import find_readme_files
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    for i in range(3):
+        folder = root / f'data{i}' / 'sub'
+        folder.mkdir(parents=True)
+        (folder / 'readme.txt').write_text('readme')
+        (folder / 'data.csv').write_text('1,2,3')
+    return root
+
+
+def touch_folder(folder, step=1):
+    '''Make sure the folder mtime changes, also on file systems with a coarse resolution'''
+    st = os.stat(folder)
+    os.utime(folder, ns=(st.st_atime_ns, st.st_mtime_ns + step * 1_000_000_000))
+
+
+def built(project, **kwargs):
+    detector = PollingChangeDetector(project, **kwargs)
+    while detector.sweeps == 0:
+        assert not detector.poll()
+    return detector
+
+
+def test_first_sweep_builds_snapshot(project):
+    detector = built(project)
+
+    assert len(detector.folders) == 7
+    assert not detector.poll()
+
+
+def test_detects_added_and_removed_readmes(project):
+    detector = built(project)
+    (project / 'data0' / 'sub' / 'readme.txt').unlink()
+    (project / 'data1' / 'notes_readme.txt').write_text('readme')
+    (project / 'data2' / 'sub' / 'more.csv').write_text('4,5,6')
+    for folder in ['data0/sub', 'data1', 'data2/sub']:
+        touch_folder(project / folder)
+
+    changes = detector.poll()
+
+    assert changes.added == [os.path.join(str(project / 'data1'), 'notes_readme.txt')]
+    assert changes.removed == [os.path.join(str(project / 'data0' / 'sub'), 'readme.txt')]
+
+
+def test_detects_new_and_removed_folders(project):
+    detector = built(project)
+    shutil.rmtree(project / 'data0')
+    new = project / 'data3' / 'sub'
+    new.mkdir(parents=True)
+    (new / 'readme.txt').write_text('readme')
+    touch_folder(project)
+
+    changes = detector.poll()
+
+    assert changes.added == [os.path.join(str(new), 'readme.txt')]
+    assert changes.removed == [os.path.join(str(project / 'data0' / 'sub'), 'readme.txt')]
+    assert 'data0' not in detector.folders
+    assert os.path.join('data3', 'sub') in detector.folders
+
+
+def test_budget_spreads_sweep(project):
+    detector = built(project, budget=3)
+    (project / 'data2' / 'sub' / 'readme_2.txt').write_text('readme')
+    touch_folder(project / 'data2' / 'sub')
+
+    polls = [detector.poll() for _ in range(3)]
+
+    assert sum(len(changes.added) for changes in polls) == 1
+    assert not polls[0]
+
+
+def test_start_from_scan_cache(project):
+    cache = ScanCache(project)
+    find_readme_files(project, cache=cache)
+    detector = PollingChangeDetector.from_cache(cache)
+    (project / 'data1' / 'readme.txt').write_text('readme')
+    touch_folder(project / 'data1')
+
+    changes = detector.poll()
+
+    assert changes.added == [os.path.join(str(project / 'data1'), 'readme.txt')]
+
+
+def test_profile_excludes(project):
+    detector = built(project, profile=ScanProfile(exclude=['data1'], max_depth=1))
+    (project / 'data1' / 'readme.txt').write_text('readme')
+    (project / 'data2' / 'sub' / 'readme_2.txt').write_text('readme')
+    touch_folder(project / 'data1')
+    touch_folder(project / 'data2' / 'sub')
+
+    assert not detector.poll()
+
+
+def test_follow_symlinks_polls_every_folder_once(project):
+    (project / 'data0' / 'loop').symlink_to(project, target_is_directory=True)
+    (project / 'data1' / 'sub' / 'up').symlink_to(project / 'data1', target_is_directory=True)
+
+    detector = built(project, profile=ScanProfile(exclude=[], follow_symlinks=True))
+    assert len(detector.folders) == 7
+
+    shutil.rmtree(project / 'data2')
+    touch_folder(project)
+    changes = detector.poll()
+    assert changes.removed == [str(project / 'data2' / 'sub' / 'readme.txt')]
+    assert len(detector.folders) == 5
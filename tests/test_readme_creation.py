@@ -1,6 +1,4 @@
-from pathlib import Path
 from unittest import mock
-from mock import call
 import pytest
 from bioview.readme_creation import ReadmeCreator, ReadmeContent
 from bioview.dirtree import DirTree
@@ -10,7 +8,9 @@ from bioview.dirtree import DirTree
 
 @pytest.fixture
 def dir_tree():
-    return mock.Mock(spec=DirTree)
+    dir_tree = mock.Mock(spec=DirTree)
+    dir_tree.treeview = mock.Mock()
+    return dir_tree
 
 
 @pytest.fixture
@@ -18,42 +18,53 @@ def readme_creator(dir_tree):
     return ReadmeCreator(dir_tree)
 
 
-@mock.patch('builtins.open')
-@mock.patch('bioview.readme_creation.files')
-def test_copy_from_template(mock_files, mock_open, readme_creator):
-    template_content = [
-        "Header\n",
-        "File list:\n",
-        "Footer\n"
-    ]
-    mock_files.return_value.joinpath.return_value = Path("readme_template.txt")
-    mock_open.return_value.__enter__.return_value.readlines.return_value = template_content
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / 'data'
+    folder.mkdir()
+    for i in range(3):
+        (folder / f"file{i}.txt").write_bytes(b'')
+    return folder
+
+
+def create_readme(readme_creator, dir_tree, folder, content, template_text):
+    '''Create the readme file with ReadmeCreator, like the context menu does,
+       and return its text after the header
+    '''
+    template = folder.parent / 'readme_template.txt'
+    template.write_text(template_text)
+    readme = folder / 'readme.txt'
+    dir_tree.get_selected_path.return_value = folder
+    dir_tree.get_selected_id.return_value = 'I001'
 
-    file_mock = mock.Mock()
-    file_list = [Path(f"/path/to/file{i}.txt") for i in range(3)]
+    with mock.patch('bioview.readme_template.files') as mock_files, \
+            mock.patch.object(readme_creator, 'init_readme_file', return_value=readme):
+        mock_files.return_value.joinpath.return_value = template
+        readme_creator.create_readme(content)
+        # wait for the background thread, then let the Tk callback run
+        args = dir_tree.treeview.after.call_args.args[2:]
+        error = args[0].get(timeout=5)
+        args[0].put(error)
+        readme_creator._readme_created(*args)
 
-    readme_creator.copy_from_template(file_mock, file_list)
+    assert error is None
+    dir_tree.insert_item.assert_called_once_with('readme.txt', readme, 'I001', position=0)
+    return readme.read_text().split('\n\n', 1)[1]
 
-    file_mock.write.assert_any_call("Header\n")
-    file_mock.write.assert_any_call("File list:\n")
-    for f in file_list:
-        file_mock.write.assert_any_call(f"{f.name}\n")
-    file_mock.write.assert_any_call("Footer\n")
 
+def test_create_readme_from_template_with_file_list(readme_creator, dir_tree, folder):
+    text = create_readme(readme_creator, dir_tree, folder,
+                         ReadmeContent.TEMPLATE_WITH_FILE_LIST,
+                         "Header\nFile list:\nFooter\n")
 
-@mock.patch('builtins.open')
-@mock.patch('bioview.readme_creation.files')
-def test_copy_from_template_no_file_list(mock_files, mock_open, readme_creator):
-    template_content = [
-        "Header\n",
-        "Footer\n"
-    ]
-    mock_files.return_value.joinpath.return_value = Path("readme_template.txt")
-    mock_open.return_value.__enter__.return_value.readlines.return_value = template_content
+    lines = text.splitlines()
+    assert lines[:2] == ["Header", "File list:"]
+    assert [line.split()[0] for line in lines[2:5]] == [f"file{i}.txt" for i in range(3)]
+    assert lines[-1] == "Footer"
 
-    file_mock = mock.Mock()
-    file_list = []
 
-    readme_creator.copy_from_template(file_mock, file_list)
+def test_create_readme_from_template_without_file_list(readme_creator, dir_tree, folder):
+    text = create_readme(readme_creator, dir_tree, folder, ReadmeContent.TEMPLATE,
+                         "Header\nFooter\n")
 
-    file_mock.write.assert_has_calls([call("Header\n"), call("Footer\n")])
+    assert text == "Header\nFooter\n"
@@ -0,0 +1,48 @@
+import os
+import pytest
+from bioview.readme_index import ReadmeIndex, content_hash
+
+
+@pytest.fixture
+def list_file(tmp_path):
+    list_file = tmp_path / 'all_readme_files.lst'
+    list_file.write_text('/data/b/readme.txt\n/data/a/readme.txt\n')
+    return list_file
+
+
+def test_open_imports_list_file(list_file):
+    with ReadmeIndex.open_for(list_file) as index:
+        assert index.count() == 2
+        assert list(index.paths()) == ['/data/a/readme.txt', '/data/b/readme.txt']
+
+    assert ReadmeIndex.index_file_for(list_file).exists()
+
+
+def test_reopen_does_not_import_unchanged_list(list_file):
+    ReadmeIndex.open_for(list_file).close()
+
+    with ReadmeIndex(ReadmeIndex.index_file_for(list_file)) as index:
+        assert not index.sync_with_list_file(list_file)
+
+
+def test_changed_list_file_is_imported_and_keeps_content_info(list_file):
+    with ReadmeIndex.open_for(list_file) as index:
+        index.record_content('/data/a/readme.txt', 10, 1.5, 'UTF-8', content_hash(b'text'))
+
+    list_file.write_text('/data/a/readme.txt\n/data/c/readme.txt\n')
+    st = list_file.stat()
+    os.utime(list_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    with ReadmeIndex.open_for(list_file) as index:
+        assert list(index.paths()) == ['/data/a/readme.txt', '/data/c/readme.txt']
+        record = index.get('/data/a/readme.txt')
+        assert record.size == 10
+        assert record.encoding == 'UTF-8'
+        assert record.hash == content_hash(b'text')
+
+
+def test_add_and_remove(list_file):
+    with ReadmeIndex.open_for(list_file) as index:
+        index.add(['/data/c/readme.txt', '/data/a/readme.txt'])
+        index.remove(['/data/b/readme.txt'])
+
+        assert list(index.paths()) == ['/data/a/readme.txt', '/data/c/readme.txt']
@@ -0,0 +1,64 @@
+import io
+import os
+from unittest import mock
+import pytest
+from bioview.readme_template import Template, format_size, list_folder, write_listing
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / 'maps').mkdir()
+    for name, size in [('roads.shp', 1000), ('roads.dbf', 500), ('Notes.txt', 20),
+                       ('cover.tif', 2000000), ('cover.tfw', 10)]:
+        (tmp_path / name).write_bytes(b'x' * size)
+        os.utime(tmp_path / name, (1700000000, 1700000000))
+    os.utime(tmp_path / 'Notes.txt', (1600000000, 1600000000))
+    return tmp_path
+
+
+def render(template: Template, values: dict) -> str:
+    out = io.StringIO()
+    template.render(out, values)
+    return out.getvalue()
+
+
+def test_placeholders():
+    template = Template('By {{ user }} on {{date}}\n{{unknown}} {{file_count}}\n')
+
+    assert template.placeholders == {'user', 'date', 'file_count'}
+    assert render(template, {'user': 'ann', 'date': '2024-05-01'}) == \
+        'By ann on 2024-05-01\n{{unknown}} \n'
+
+
+def test_legacy_file_list_line():
+    template = Template('Header\nFile list (names):\nFooter\n')
+
+    text = render(template, {'file_list': lambda file: file.write('a.csv\n')})
+    assert text == 'Header\nFile list (names):\na.csv\n\nFooter\n'
+    # an explicit placeholder replaces the legacy line
+    assert Template('File list:\n{{file_list}}').parts[-1] == ('file_list', True)
+
+
+@pytest.mark.parametrize('window', [2, 100])
+def test_streamed_file_list(folder, window):
+    with mock.patch('bioview.readme_template.SORT_WINDOW', window):
+        with list_folder(folder, exclude=['readme.txt']) as listing:
+            out = io.StringIO()
+            write_listing(out, listing)
+
+            assert len(listing.runs) == (3 if window == 2 else 1)
+            assert listing.file_count == 5
+            assert listing.total_size == 2001530
+            assert listing.date_range.count(' to ') == 1
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == 'maps/'
+    assert lines[1].startswith('cover.tif (GeoTIFF, 2 files)  2.0 MB  ')
+    assert lines[2].startswith('Notes.txt  20 bytes  ')
+    assert lines[3].startswith('roads.shp (shapefile, 2 files)  1.5 kB  ')
+    assert len(lines) == 4
+
+
+def test_format_size():
+    assert [format_size(size) for size in [999, 1000, 1234567, 10**16]] == \
+        ['999 bytes', '1.0 kB', '1.2 MB', '10000.0 TB']
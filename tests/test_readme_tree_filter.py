@@ -0,0 +1,45 @@
+import os
+from pathlib import Path
+from bioview.readme_tree_filter import ReadmeTreeFilter
+
+ROOT = Path('/work')
+
+
+def path(*parts: str) -> str:
+    return os.path.join(str(ROOT), *parts)
+
+
+def test_entries():
+    tree_filter = ReadmeTreeFilter(ROOT, [path('a', 'b', 'readme.txt'), path('readme.txt'),
+                                          path('a', 'c', 'readme.txt'), '/other/readme.txt'])
+
+    assert tree_filter.entries(ROOT) == [('a', True), ('readme.txt', False)]
+    assert tree_filter.entries(ROOT / 'a') == [('b', True), ('c', True)]
+    assert tree_filter.entries(ROOT / 'a' / 'b') == [('readme.txt', False)]
+    assert tree_filter.entries(ROOT / 'x') == []
+    assert '/other' not in tree_filter
+    assert ROOT / 'a' in tree_filter
+    assert ROOT / 'x' not in tree_filter
+    assert tree_filter.readme_count[str(ROOT)] == 3
+
+
+def test_add_twice():
+    tree_filter = ReadmeTreeFilter(ROOT, [path('a', 'readme.txt')])
+    tree_filter.add([path('a', 'readme.txt')])
+
+    assert tree_filter.readme_count == {path('a'): 1, str(ROOT): 1}
+
+
+def test_remove():
+    tree_filter = ReadmeTreeFilter(ROOT, [path('a', 'b', 'readme.txt'),
+                                          path('a', 'c', 'readme.txt')])
+
+    tree_filter.remove([path('a', 'b', 'readme.txt'), path('a', 'b', 'unknown.txt')])
+
+    assert tree_filter.entries(ROOT / 'a') == [('c', True)]
+    assert ROOT / 'a' / 'b' not in tree_filter
+    assert tree_filter.readme_count[str(ROOT)] == 1
+
+    tree_filter.remove([path('a', 'c', 'readme.txt')])
+    assert tree_filter.readme_count == {}
+    assert tree_filter.entries(ROOT) == []
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import pytest
+from bioview.config import ScanProfile
+from bioview.readme_watcher import ChangeCoalescer, ReadmeChanges, ReadmeWatcher
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    for name in ['a', 'b']:
+        (root / name).mkdir(parents=True)
+        (root / name / 'readme.txt').write_text('readme')
+    return root
+
+
+def test_coalescer_keeps_last_state(project):
+    coalescer = ChangeCoalescer()
+    readme = str(project / 'a' / 'readme.txt')
+    other = str(project / 'b' / 'readme.txt')
+
+    coalescer.created(readme, False)
+    coalescer.deleted(readme, False)
+    coalescer.deleted(other, False)
+    coalescer.created(str(project / 'a' / 'data.csv'), False)
+    changes = coalescer.collect()
+
+    assert changes.added == []
+    assert changes.removed == [readme, other]
+    assert changes.touched_folders == {str(project / 'a'), str(project / 'b')}
+
+
+def test_coalescer_scans_new_folders(project):
+    coalescer = ChangeCoalescer()
+    coalescer.moved(str(project / 'old'), str(project / 'a'), True)
+    changes = coalescer.collect()
+
+    assert changes.removed_folders == [str(project / 'old')]
+    assert changes.added == [os.path.join(str(project / 'a'), 'readme.txt')]
+    assert changes.is_removed(os.path.join(str(project / 'old'), 'readme.txt'))
+    assert not changes.is_removed(os.path.join(str(project / 'older'), 'readme.txt'))
+
+
+def test_coalescer_ready_after_quiet_period():
+    coalescer = ChangeCoalescer(quiet=0.5, max_delay=5)
+    assert not coalescer.ready()
+
+    coalescer.created('readme.txt', False)
+    now = coalescer.last_event
+    assert not coalescer.ready(now + 0.1)
+    assert coalescer.ready(now + 0.6)
+
+    coalescer.collect()
+    assert not coalescer.ready(now + 0.6)
+
+
+def test_coalescer_ready_after_max_delay():
+    coalescer = ChangeCoalescer(quiet=0.5, max_delay=2)
+    coalescer.created('readme.txt', False)
+    first = coalescer.first_event
+    coalescer.last_event = first + 1.9      # events keep coming
+
+    assert coalescer.ready(first + 2.1)
+
+
+def test_empty_changes_are_false():
+    assert not ReadmeChanges(touched_folders={'a'})
+    assert ReadmeChanges(removed_folders=['a'])
+
+
+def test_watcher_excludes(project):
+    watcher = ReadmeWatcher(project, ScanProfile(exclude=['.git', 'a/backup']))
+
+    assert watcher.is_excluded(str(project / '.git' / 'readme.txt'))
+    assert watcher.is_excluded(str(project / 'a' / 'backup' / 'readme.txt'))
+    assert not watcher.is_excluded(str(project / 'b' / 'backup' / 'readme.txt'))
+    assert watcher.is_excluded(str(project.parent / 'readme.txt'))
+
+
+def test_watcher_reports_new_readme(project):
+    watcher = ReadmeWatcher(project, quiet=0.1)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        (project / 'b' / 'notes_readme.txt').write_text('readme')
+        (project / 'b' / 'data.csv').write_text('1,2,3')
+        changes = watcher.changes.get(timeout=5)
+    finally:
+        watcher.stop()
+
+    assert changes.added == [str(project / 'b' / 'notes_readme.txt')]
+
+
+def test_watcher_publishes_within_max_delay_under_steady_events(project):
+    watcher = ReadmeWatcher(project, quiet=1, max_delay=0.5)
+    thread = threading.Thread(target=watcher._run, daemon=True)
+    thread.start()
+    try:
+        start = time.monotonic()
+        while watcher.changes.empty() and time.monotonic() - start < 3:
+            watcher._on_event('created', str(project / 'b' / 'readme.txt'), '', False)
+            time.sleep(0.05)
+        elapsed = time.monotonic() - start
+    finally:
+        watcher.stop()
+        thread.join()
+
+    assert not watcher.changes.empty()
+    assert elapsed < 0.5 + 0.5
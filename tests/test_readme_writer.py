@@ -0,0 +1,111 @@
+import io
+import os
+from unittest import mock
+import pytest
+from bioview.config import ScanProfile
+from bioview.readme_template import Template, list_folder
+from bioview.readme_writer import (ReadmeContent, current_user, folders_without_readme,
+                                   generate_readmes, write_readme)
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name in ('a', 'b', 'c', 'c/d'):
+        (tmp_path / name).mkdir()
+    (tmp_path / 'a' / 'roads.shp').write_bytes(b'')
+    (tmp_path / 'a' / 'roads.dbf').write_bytes(b'')
+    (tmp_path / 'b' / 'plots.csv').write_bytes(b'')
+    (tmp_path / 'b' / 'readme.txt').write_text('Plots')
+    (tmp_path / 'c' / 'd' / 'samples.csv').write_bytes(b'')
+    return tmp_path
+
+
+def test_folders_without_readme(project):
+    assert folders_without_readme(project, jobs=2) == [str(project / 'a'),
+                                                       str(project / 'c' / 'd')]
+
+
+def test_generate_readmes(project):
+    folders = [project / 'a', project / 'b']
+    template = Template('Title: {{folder_name}}\nFile list:\nMethods:\n')
+
+    preview = generate_readmes(folders, ReadmeContent.TEMPLATE_WITH_FILE_LIST, template,
+                               jobs=2, dry_run=True)
+    assert sorted(result.status for result in preview) == ['exists', 'would create']
+    assert not (project / 'a' / 'readme.txt').exists()
+
+    reported = []
+    results = generate_readmes(folders, ReadmeContent.TEMPLATE_WITH_FILE_LIST, template,
+                               jobs=2, on_result=reported.append)
+    assert sorted(result.status for result in results) == ['created', 'exists']
+    assert sorted(reported, key=lambda result: result.folder) == sorted(
+        results, key=lambda result: result.folder)
+    text = (project / 'a' / 'readme.txt').read_text()
+    assert 'Title: a\nFile list:\nroads.shp (shapefile, 2 files)  0 bytes  ' in text
+    assert text.endswith('\n\nMethods:\n')
+    assert (project / 'b' / 'readme.txt').read_text() == 'Plots'
+
+    # running again does not change anything
+    results = generate_readmes(folders, ReadmeContent.EMPTY, jobs=2)
+    assert [result.status for result in results] == ['exists', 'exists']
+    assert (project / 'a' / 'readme.txt').read_text() == text
+
+
+def test_current_user_without_terminal():
+    with mock.patch('bioview.readme_writer.os.getlogin', side_effect=OSError), \
+            mock.patch('bioview.readme_writer.getpass.getuser', return_value='cron'):
+        assert current_user() == 'cron'
+
+
+def test_folders_without_readme_follows_links_once(project):
+    (project / 'c' / 'loop').symlink_to(project, target_is_directory=True)
+    (project / 'a' / 'up').symlink_to(project / 'c', target_is_directory=True)
+
+    profile = ScanProfile(exclude=[], follow_symlinks=True)
+    found = folders_without_readme(project, jobs=2, profile=profile)
+    # a folder reached through two paths is reported once, under either path
+    assert sorted(os.path.realpath(folder) for folder in found) == [
+        str(project / 'a'), str(project / 'c' / 'd')]
+
+
+def test_failed_folder_does_not_stop_the_others(project):
+    folders = [project / 'a', project / 'c' / 'd']
+    content = ReadmeContent.WITH_FILE_LIST
+
+    with mock.patch('bioview.readme_writer.write_listing',
+                    side_effect=[UnicodeEncodeError('utf-8', '', 0, 1, 'surrogate'), None]):
+        results = generate_readmes(folders, content, jobs=1)
+
+    assert sorted(result.status for result in results) == ['created', 'error']
+    failed = next(result for result in results if result.status == 'error')
+    assert not os.path.exists(failed.readme)    # no partial readme file left behind
+
+    results = generate_readmes(folders, content, jobs=1)
+    assert sorted(result.status for result in results) == ['created', 'exists']
+
+
+def test_undecodable_file_name(tmp_path):
+    name = os.fsdecode(b'caf\xe9.csv')
+    try:
+        (tmp_path / name).write_bytes(b'')
+    except (OSError, UnicodeEncodeError):
+        pytest.skip('the file system does not accept the name')
+
+    results = generate_readmes([tmp_path], ReadmeContent.WITH_FILE_LIST, jobs=1)
+
+    assert [result.status for result in results] == ['created']
+    assert 'caf?.csv' in (tmp_path / 'readme.txt').read_text(encoding='utf-8')
+
+
+def test_file_list_groups_datasets(tmp_path):
+    for name in ['roads.shp', 'roads.dbf', 'roads.shx', 'notes.txt']:
+        (tmp_path / name).write_bytes(b'')
+    out = io.StringIO()
+    out.name = 'readme.txt'
+
+    with list_folder(tmp_path) as listing:
+        write_readme(out, ReadmeContent.WITH_FILE_LIST, tmp_path, listing)
+
+    lines = out.getvalue().split('\n\n', 1)[1].strip().splitlines()
+    assert [line.split('  ')[0] for line in lines] == ['notes.txt',
+                                                       'roads.shp (shapefile, 3 files)']
@@ -3,74 +3,69 @@ import datetime
 from pathlib import Path
 from unittest import mock
 import pytest
+from bioview.backup_store import BackupStore
 from bioview.save_readme_changes import save_readme_changes
 
 
 @pytest.fixture
-def mock_os():
-    with mock.patch('os.path.getmtime') as mock_getmtime, \
-            mock.patch('os.path.exists') as mock_exists, \
-            mock.patch('os.remove') as mock_remove, \
-            mock.patch('os.rename') as mock_rename:
-        yield mock_getmtime, mock_exists, mock_remove, mock_rename
+def readme(tmp_path) -> Path:
+    filename = tmp_path / 'readme.txt'
+    filename.write_text('Old content')
+    return filename
 
 
-@pytest.fixture
-def mock_open():
-    with mock.patch('builtins.open', mock.mock_open()) as mock_open:
-        yield mock_open
+def set_yesterday(filename: Path) -> None:
+    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
+    os.utime(filename, (yesterday, yesterday))
+
+
+def test_save_readme_changes_new_backup(readme, tmp_path):
+    store = BackupStore(tmp_path)
+    set_yesterday(readme)
+
+    save_readme_changes(readme, 'New content', store)
+
+    assert readme.read_text() == 'New content'
+    revisions = store.revisions(readme)
+    assert len(revisions) == 1
+    assert store.read(revisions[0]) == b'Old content'
+    # no numbered backups next to the readme file
+    assert sorted(os.listdir(tmp_path)) == ['.bioview_backups', 'readme.txt']
 
 
-def test_save_readme_changes_new_backup(mock_os, mock_open):
-    mock_getmtime, mock_exists, mock_remove, mock_rename = mock_os
-    mock_getmtime.return_value = (
-        datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
-    mock_exists.side_effect = lambda x: (x.suffix == '.1')
+def test_save_readme_changes_no_backup_needed(readme, tmp_path):
+    store = BackupStore(tmp_path)
 
-    filename = Path('readme.txt')
-    text = 'New content'
+    with mock.patch.object(store, 'backup') as backup:
+        save_readme_changes(readme, 'New content', store)
 
-    save_readme_changes(filename, text)
+    backup.assert_not_called()
+    assert readme.read_text() == 'New content'
 
-    mock_rename.assert_any_call(filename, filename.with_suffix('.txt.1'))
-    mock_open.assert_called_once_with(filename, 'w', encoding='utf-8')
-    mock_open().write.assert_called_once_with(text)
 
+def test_save_readme_changes_new_file(tmp_path):
+    store = BackupStore(tmp_path)
+    filename = tmp_path / 'readme.txt'
 
-def test_save_readme_changes_no_backup_needed(mock_os, mock_open):
-    mock_getmtime, mock_exists, mock_remove, mock_rename = mock_os
-    mock_getmtime.return_value = datetime.datetime.now().timestamp()
+    save_readme_changes(filename, 'New content', store)
 
-    filename = Path('readme.txt')
-    text = 'New content'
+    assert filename.read_text() == 'New content'
+    assert store.revisions(filename) == []
 
-    save_readme_changes(filename, text)
 
-    mock_rename.assert_not_called()
-    mock_open.assert_called_once_with(filename, 'w', encoding='utf-8')
-    mock_open().write.assert_called_once_with(text)
+def test_save_readme_changes_without_store(readme):
+    set_yesterday(readme)
 
+    save_readme_changes(readme, 'New content')
 
-def test_save_readme_changes_backup_rotation(mock_os, mock_open):
-    mock_getmtime, mock_exists, mock_remove, mock_rename = mock_os
-    mock_getmtime.return_value = (
-        datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
-    mock_exists.side_effect = lambda x: x.suffix == '.1' or x.suffix == '.2' or x.suffix == '.3' or x.suffix == '.4' or x.suffix == '.5'
+    assert readme.read_text() == 'New content'
+    assert not (readme.parent / '.bioview_backups').exists()
 
-    filename = Path('readme.txt')
-    text = 'New content'
 
-    save_readme_changes(filename, text)
+def test_save_readme_changes_is_atomic(readme, tmp_path):
+    with mock.patch('bioview.save_readme_changes.os.replace', side_effect=OSError('disk full')):
+        with pytest.raises(OSError):
+            save_readme_changes(readme, 'New content')
 
-    mock_remove.assert_called_once_with(filename.with_suffix(".txt.5"))
-    mock_rename.assert_any_call(filename.with_suffix(
-        ".txt.4"), filename.with_suffix(".txt.5"))
-    mock_rename.assert_any_call(filename.with_suffix(
-        ".txt.3"), filename.with_suffix(".txt.4"))
-    mock_rename.assert_any_call(filename.with_suffix(
-        ".txt.2"), filename.with_suffix(".txt.3"))
-    mock_rename.assert_any_call(filename.with_suffix(
-        ".txt.1"), filename.with_suffix(".txt.2"))
-    mock_rename.assert_any_call(filename, filename.with_suffix(".txt.1"))
-    mock_open.assert_called_once_with(filename, 'w', encoding='utf-8')
-    mock_open().write.assert_called_once_with(text)
+    assert readme.read_text() == 'Old content'
+    assert os.listdir(tmp_path) == ['readme.txt']   # the temporary file is removed
@@ -0,0 +1,61 @@
+import threading
+from unittest import mock
+from bioview.save_worker import SaveResult, SaveWorker
+
+
+def test_saves_are_written(tmp_path):
+    worker = SaveWorker()
+    worker.submit(tmp_path / 'readme.txt', 'New content')
+    worker.stop()
+
+    assert (tmp_path / 'readme.txt').read_text() == 'New content'
+    result = worker.results.get_nowait()
+    assert result.filename == tmp_path / 'readme.txt'
+    assert result.error is None
+
+
+def test_waiting_saves_are_coalesced(tmp_path):
+    first, second = tmp_path / 'first.txt', tmp_path / 'second.txt'
+    started, release = threading.Event(), threading.Event()
+    written = []
+
+    def save(filename, text, store):
+        if filename == first:
+            started.set()
+            release.wait()
+        written.append((filename, text))
+
+    with mock.patch('bioview.save_worker.save_readme_changes', side_effect=save):
+        worker = SaveWorker()
+        worker.submit(first, 'one')
+        started.wait()
+        for text in ('two', 'three', 'four'):
+            worker.submit(second, text)
+        assert worker.pending_text(first) == 'one'      # being written
+        assert worker.pending_text(second) == 'four'
+        release.set()
+        worker.stop()
+
+    assert written == [(first, 'one'), (second, 'four')]
+    assert not worker.busy
+
+
+def test_save_error_is_reported(tmp_path):
+    worker = SaveWorker()
+    worker.submit(tmp_path / 'missing' / 'readme.txt', 'New content')
+    worker.stop()
+
+    assert worker.results.get_nowait().error
+
+
+def test_unexpected_error_is_reported_and_worker_continues(tmp_path):
+    with mock.patch('bioview.save_worker.save_readme_changes',
+                    side_effect=[UnicodeEncodeError('utf-8', '', 0, 1, 'surrogate'), None]):
+        worker = SaveWorker()
+        worker.submit(tmp_path / 'first.txt', 'one')
+        assert worker.results.get(timeout=5).error
+        worker.submit(tmp_path / 'second.txt', 'two')
+        worker.stop()
+
+    assert worker.results.get_nowait() == SaveResult(tmp_path / 'second.txt')
+    assert not worker.busy
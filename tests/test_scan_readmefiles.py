@@ -0,0 +1,138 @@
+from pathlib import Path
+import threading
+from unittest import mock
+import pytest
+from bioview.config import ScanProfile
+from bioview.scan_cache import ScanCache
+from bioview.scan_readmefiles import (ScanStats, find_readme_files, glob_readme_files,
+                                      iter_readme_batches, list_folder, scan_readme_files)
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    for i in range(5):
+        for j in range(4):
+            folder = root / f'data{i}' / f'sub{j}'
+            folder.mkdir(parents=True)
+            (folder / 'data.csv').write_text('1,2,3')
+            if j % 2 == 0:
+                (folder / 'readme.txt').write_text('readme')
+        (root / f'data{i}' / f'project_readme_{i}.txt').write_text('readme')
+    (root / 'readme.md').write_text('not a readme file')
+    return root
+
+
+@pytest.mark.parametrize('jobs', [1, 3, 8])
+def test_find_readme_files_same_as_glob(project, jobs):
+    result = find_readme_files(project, jobs)
+
+    assert result == glob_readme_files(project)
+    assert len(result) == 15
+
+
+def test_find_readme_files_empty_folder(tmp_path):
+    assert find_readme_files(tmp_path, 4) == []
+
+
+def test_scan_readme_files_writes_list(project, tmp_path):
+    output_file = tmp_path / 'all_readme_files.lst'
+
+    scan_readme_files(project, output_file, jobs=4)
+
+    lines = output_file.read_text().splitlines()
+    assert lines == glob_readme_files(project)
+    assert all(Path(line).exists() for line in lines)
+
+
+def test_incremental_rescan_reuses_unchanged_folders(project, tmp_path):
+    output_file = tmp_path / 'all_readme_files.lst'
+    scan_readme_files(project, output_file, jobs=4)
+    assert ScanCache.cache_file_for(output_file).exists()
+
+    new_readme = project / 'data2' / 'sub1' / 'readme.txt'
+    new_readme.write_text('new readme')
+    with mock.patch('bioview.scan_readmefiles.list_folder', wraps=list_folder) as mock_list:
+        scan_readme_files(project, output_file, jobs=4)
+
+    listed = {Path(call.args[0]) for call in mock_list.call_args_list}
+    assert listed == {new_readme.parent}
+    lines = output_file.read_text().splitlines()
+    assert str(new_readme) in lines
+    assert lines == glob_readme_files(project)
+
+
+def test_full_rescan_ignores_cache(project, tmp_path):
+    output_file = tmp_path / 'all_readme_files.lst'
+    scan_readme_files(project, output_file, jobs=2)
+
+    with mock.patch('bioview.scan_readmefiles.list_folder', wraps=list_folder) as mock_list:
+        scan_readme_files(project, output_file, jobs=2, incremental=False)
+
+    assert mock_list.call_count == 26
+
+
+def test_cache_of_other_root_is_ignored(project, tmp_path):
+    cache_file = tmp_path / 'all_readme_files.cache'
+    ScanCache(project / 'data0', {'': (1, [], [])}).save(cache_file)
+
+    cache = ScanCache.load(cache_file, project)
+
+    assert cache.folders == {}
+
+
+def test_iter_readme_batches_streams_all_files(project):
+    stats = ScanStats()
+
+    batches = list(iter_readme_batches(project, jobs=4, stats=stats, interval=0))
+
+    assert len(batches) > 1
+    assert sorted(f for batch in batches for f in batch) == glob_readme_files(project)
+    assert stats.folders == 26
+    assert stats.readmes == 15
+
+
+def test_scan_readme_files_reports_batches(project, tmp_path):
+    output_file = tmp_path / 'all_readme_files.lst'
+    on_batch = mock.Mock()
+
+    scan_readme_files(project, output_file, jobs=4, on_batch=on_batch)
+
+    reported = sorted(f for call in on_batch.call_args_list for f in call.args[0])
+    assert reported == output_file.read_text().splitlines()
+
+
+def test_profile_excludes_and_limits_depth(project):
+    (project / '.git' / 'sub').mkdir(parents=True)
+    (project / '.git' / 'sub' / 'readme.txt').write_text('excluded')
+
+    excluded = find_readme_files(project, 4, profile=ScanProfile(exclude=['.git', 'sub1']))
+    assert not any('.git' in f for f in excluded)
+    assert excluded == [f for f in glob_readme_files(project) if '.git' not in f]
+
+    shallow = find_readme_files(project, 4, profile=ScanProfile(max_depth=1))
+    assert len(shallow) == 5
+    assert all(Path(f).parent.parent == project for f in shallow)
+
+
+def test_follow_symlinks_detects_loops(project):
+    (project / 'data0' / 'loop').symlink_to(project, target_is_directory=True)
+
+    not_followed = find_readme_files(project, 4, profile=ScanProfile(exclude=[]))
+    followed = find_readme_files(project, 4, profile=ScanProfile(exclude=[],
+                                                                 follow_symlinks=True))
+
+    assert not_followed == glob_readme_files(project)
+    assert len(followed) == len(not_followed)
+
+
+def test_cancelled_scan_keeps_list_file(project, tmp_path):
+    output_file = tmp_path / 'all_readme_files.lst'
+    output_file.write_text('previous list\n')
+    cancel = threading.Event()
+    cancel.set()
+
+    completed = scan_readme_files(project, output_file, jobs=2, cancel=cancel)
+
+    assert not completed
+    assert output_file.read_text() == 'previous list\n'
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+from unittest import mock
+import pytest
+from bioview.search_index import SearchIndex, SearchIndexer, query_terms, to_fts_query
+
+
+@pytest.fixture
+def readmes(tmp_path):
+    texts = {
+        'a': 'Raster data of the land cover, one raster per year',
+        'b': 'Vector locations of the field plots',
+        'c': 'Locations and raster of the soil samples',
+    }
+    paths = []
+    for name, text in texts.items():
+        path = tmp_path / name / 'readme.txt'
+        path.parent.mkdir()
+        path.write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def index(tmp_path, readmes):
+    with SearchIndex(tmp_path / 'all_readme_files.db') as index:
+        index.update_all(readmes)
+        yield index
+
+
+def test_query_terms():
+    assert query_terms(' raster, "land-cover" ') == ['raster', 'land', 'cover']
+    assert to_fts_query(['raster', 'land']) == '"raster"* "land"*'
+
+
+def test_search_all_terms_ranked(index, readmes):
+    hits = index.search(query_terms('raster'))
+    assert [hit.path for hit in hits] == [readmes[0], readmes[2]]
+
+    hits = index.search(query_terms('raster locations'))
+    assert [hit.path for hit in hits] == [readmes[2]]
+
+
+def test_search_prefix_and_case(index, readmes):
+    assert [hit.path for hit in index.search(['LOCATION'])] == [readmes[1], readmes[2]]
+    assert index.search([]) == []
+
+
+def test_update_reads_only_changed_files(index, readmes):
+    path = readmes[1]
+    with open(path, 'a') as file:
+        file.write(' with raster backgrounds')
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    index.update_files(readmes)
+
+    assert len(index.search(['raster'])) == 3
+    assert index.count() == 3
+
+
+def test_update_all_removes_files(index, readmes):
+    index.update_all(readmes[1:])
+
+    assert [hit.path for hit in index.search(['raster'])] == [readmes[2]]
+    assert index.count() == 2
+
+
+def test_deleted_file_is_removed(index, readmes):
+    os.remove(readmes[0])
+    index.update_files([readmes[0]])
+
+    assert [hit.path for hit in index.search(['raster'])] == [readmes[2]]
+
+
+def test_indexer_builds_in_background(tmp_path, readmes):
+    db_file = tmp_path / 'all_readme_files.db'
+    indexer = SearchIndexer(db_file)
+    indexer.index_all(readmes)
+    indexer.wait()
+    indexer.stop()
+
+    with SearchIndex(db_file) as index:
+        assert len(index.search(['soil'])) == 1
+
+
+def test_database_not_locked_while_reading_files(tmp_path, readmes):
+    db_file = tmp_path / 'all_readme_files.db'
+    other = sqlite3.connect(db_file, timeout=0.1)
+    other.execute('CREATE TABLE IF NOT EXISTS other (value)')
+    other.commit()
+
+    def read_and_write(path):
+        # another connection, like the GUI's readme index, can write meanwhile
+        with other:
+            other.execute('INSERT INTO other VALUES (1)')
+        return path.read_text()
+
+    with SearchIndex(db_file) as index:
+        with mock.patch('bioview.search_index.read_file_contents',
+                        side_effect=read_and_write):
+            index.update_all(readmes)
+        assert index.count() == 3
+    assert other.execute('SELECT COUNT(*) FROM other').fetchone()[0] == 3
+    other.close()
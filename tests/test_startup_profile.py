@@ -0,0 +1,36 @@
+import logging
+from unittest import mock
+import pytest
+from bioview.startup_profile import StartupTimeline
+
+
+@pytest.fixture
+def timeline():
+    timeline = StartupTimeline()
+    with mock.patch('bioview.startup_profile.STARTED', 10.0):
+        with mock.patch('time.perf_counter', side_effect=[10.1, 10.25, 10.5]):
+            for phase in ('imports', 'config', 'window visible'):
+                timeline.mark(phase)
+        yield timeline
+
+
+def test_phases(timeline):
+    phases = timeline.phases()
+
+    assert [phase for phase, _ in phases] == ['imports', 'config', 'window visible']
+    assert [duration for _, duration in phases] == pytest.approx([0.1, 0.15, 0.25])
+    assert timeline.elapsed('config') == pytest.approx(0.25)
+    with pytest.raises(KeyError):
+        timeline.elapsed('missing')
+
+
+def test_report_warns_when_window_is_late(timeline, caplog):
+    with caplog.at_level(logging.INFO, logger='bioview.startup_profile'):
+        timeline.report()
+    assert 'Startup timeline' in caplog.text
+    assert 'Window visible after 500 ms' in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger='bioview.startup_profile'):
+        timeline.report(visible_phase='imports')
+    assert 'Window visible' not in caplog.text
@@ -0,0 +1,60 @@
+import time
+from bioview.text_matcher import TextIndexer, TextMatcher
+
+
+def test_longest_pattern_wins():
+    text = 'See data.csv and data_2020.csv, not mydata.csv'
+    spans, found = TextMatcher(['data', 'data.csv', 'data_2020.csv']).find(text)
+
+    assert [text[start:end] for start, end in spans] == ['data.csv', 'data_2020.csv']
+    assert found == ['data.csv', 'data_2020.csv']
+
+
+def test_whole_words():
+    text = 'the map maps, map.tif and map.'
+    spans, found = TextMatcher(['map']).find(text)
+    assert [start for start, _ in spans] == [4, 26]
+    assert found == ['map']
+
+    spans, _ = TextMatcher(['map'], whole_words=False).find(text)
+    assert len(spans) == 4
+
+
+def test_nocase_reports_original_pattern():
+    text = 'RASTER layers and a Raster'
+    spans, found = TextMatcher(['raster'], nocase=True, whole_words=False).find(text)
+
+    assert len(spans) == 2
+    assert found == ['raster']
+    assert TextMatcher(['raster']).find(text) == ([], [])
+
+
+def test_special_characters_and_no_patterns():
+    text = 'files: plot (1).shp and a+b[2].txt'
+    _, found = TextMatcher(['plot (1).shp', 'a+b[2].txt']).find(text)
+
+    assert found == ['plot (1).shp', 'a+b[2].txt']
+    assert TextMatcher([]).find(text) == ([], [])
+
+
+def test_text_indices():
+    text = 'first line\nsecond\n\nfourth line'
+    indexer = TextIndexer(text)
+
+    assert indexer.index(0) == '1.0'
+    assert indexer.index(text.index('second')) == '2.0'
+    assert indexer.index(text.index('line', 12)) == '4.7'
+    assert indexer.ranges([(0, 5), (11, 17)]) == ['1.0', '1.5', '2.0', '2.6']
+
+
+def test_many_patterns_in_one_pass():
+    names = [f'plot_{i:05d}.csv' for i in range(10000)]
+    text = '\n'.join(f'{name}: measurements of plot {i}' for i, name in enumerate(names[::7]))
+
+    start = time.perf_counter()
+    spans, found = TextMatcher(names).find(text)
+    elapsed = time.perf_counter() - start
+
+    assert found == names[::7]
+    assert len(spans) == len(found)
+    assert elapsed < 1
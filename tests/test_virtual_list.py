@@ -0,0 +1,90 @@
+from unittest import mock
+import pytest
+import tkinter as tk
+from bioview.virtual_list import VirtualListbox
+
+ROWS = 5
+
+
+@pytest.fixture(scope='module')
+def win():
+    win = tk.Tk()
+    yield win
+    win.destroy()
+
+
+@pytest.fixture
+def listbox(win):
+    listbox = VirtualListbox(win, formatter=str.upper)
+    listbox.configure(height=ROWS * listbox.row_height)
+    listbox.pack()
+    win.update()
+    yield listbox
+    listbox.destroy()
+
+
+def click_row(handler, listbox, row):
+    handler(mock.Mock(y=row * listbox.row_height + 1))
+
+
+def shown_texts(listbox):
+    return [listbox.itemcget(item, 'text') for item in listbox.find_all()
+            if listbox.type(item) == 'text']
+
+
+def test_selection_maps_rows_to_model_indices(listbox):
+    listbox.set_model([f"file{i}" for i in range(100)])
+    listbox.yview('moveto', 0.5)
+    assert listbox.first == 50
+
+    click_row(listbox._click, listbox, 2)
+    assert listbox.curselection() == (52,)
+
+    click_row(listbox._shift_click, listbox, 4)
+    assert listbox.curselection() == (52, 53, 54)
+
+    click_row(listbox._control_click, listbox, 3)
+    assert listbox.curselection() == (52, 54)
+
+    click_row(listbox._click, listbox, 99)      # below the last row
+    assert listbox.curselection() == (52, 54)
+
+
+def test_rows_shown_are_formatted(listbox):
+    listbox.set_model([f"file{i}" for i in range(100)])
+    listbox.see(20)
+
+    texts = shown_texts(listbox)
+    assert texts[0] == f"FILE{20 - ROWS + 1}"
+    assert 'FILE20' in texts
+
+
+def test_refresh_after_model_grows(listbox):
+    model = ['a', 'b', 'c']
+    listbox.set_model(model)
+    listbox.selection_set(2)
+    assert listbox.yview() == (0.0, 1.0)
+
+    model.extend(f"file{i}" for i in range(97))
+    listbox.refresh()
+
+    assert listbox.size() == 100
+    assert listbox.curselection() == (2,)
+    assert listbox.yview() == (0.0, ROWS / 100)
+    listbox.see(99)
+    assert shown_texts(listbox)[-1] == 'FILE96'
+
+
+def test_refresh_after_model_shrinks(listbox):
+    model = [f"file{i}" for i in range(100)]
+    listbox.set_model(model)
+    listbox.see(99)
+    listbox.selection_set(1)
+    listbox.selection_set(98)
+
+    del model[10:]
+    listbox.refresh()
+
+    assert listbox.curselection() == (1,)
+    assert listbox.first == 10 - ROWS
+    assert shown_texts(listbox)[-1] == 'FILE9'